@@ -16,17 +16,22 @@ Thresholds:
 """
 
 import asyncio
-import json
 import os
+import sys
 from datetime import datetime
+from pathlib import Path
 import pytz
-from websockets import connect
-from termcolor import cprint
 import csv
 from collections import defaultdict
 
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.streaming import CombinedStream
+from src.streaming.renderer import TerminalRenderer
+from src.streaming.fast_decode import notional_at_least
+from src.utils.batch_writer import batch_writer
+
 # Configuration
-WEBSOCKET_URL = 'wss://fstream.binance.com/ws/!forceOrder@arr'
+STREAM_NAME = '!forceOrder@arr'
 CSV_FILE = 'binance_bigLiqs.csv'
 MIN_SIZE_USD = 100_000  # Only track liquidations above 100k USD
 
@@ -37,6 +42,67 @@ def format_size(size_usd):
     """Convert USD size to readable units (10k USD per unit)"""
     return size_usd / 10_000
 
+# Terminal output is drawn by a fixed-rate render task; handlers only queue lines
+renderer = TerminalRenderer()
+
+def handle_liquidation(event):
+    """Process one significant liquidation event routed from the combined stream"""
+    data = event['o']
+    
+    # Calculate liquidation size
+    qty = float(data['q'])
+    price = float(data['p'])
+    usd_size = qty * price
+    
+    # Only process large liquidations
+    if usd_size < MIN_SIZE_USD:
+        return
+    
+    # Format data
+    symbol = data['s'].replace('USDT', '')
+    side = data['S']
+    units = format_size(usd_size)
+    timestamp = datetime.fromtimestamp(
+        int(data['T']) / 1000, 
+        pytz.timezone('US/Central')
+    ).strftime('%H:%M:%S')
+    
+    # Update statistics
+    liq_stats[symbol]['count'] += 1
+    liq_stats[symbol]['volume'] += usd_size
+    
+    # Format output
+    liq_type = ' LONG LIQ' if side == 'BUY' else ' SHORT LIQ'
+    output = f"{timestamp} {liq_type} {symbol:<8} {units:>6.1f} units"
+    
+    # Display based on size
+    if usd_size > 1_000_000:  # > $1M
+        stars = ' ' * 3
+        renderer.emit(f"{stars}{output}{stars}", 'white', 'on_red', attrs=['bold', 'blink'])
+        renderer.emit(f"MEGA LIQUIDATION: ${usd_size:,.0f}")
+    elif usd_size > 500_000:  # > $500k
+        renderer.emit(output, 'white', 'on_yellow', attrs=['bold'])
+    elif usd_size > 250_000:  # > $250k
+        renderer.emit(output, 'white', 'on_blue', attrs=['bold'])
+    else:  # > $100k
+        renderer.emit(output, 'yellow', attrs=['bold'])
+    
+    # Log to CSV (written by the background batch writer)
+    batch_writer.write_line(CSV_FILE, f"{timestamp},{symbol},{side},{usd_size:.0f},{price},{units:.1f}")
+    
+    # Show summary every 50 liquidations
+    if sum(s['count'] for s in liq_stats.values()) % 50 == 0:
+        renderer.emit("\nTop Liquidated Assets:")
+        sorted_stats = sorted(
+            liq_stats.items(), 
+            key=lambda x: x[1]['volume'], 
+            reverse=True
+        )[:5]
+        for sym, stats in sorted_stats:
+            vol_units = format_size(stats['volume'])
+            renderer.emit(f"{sym:<8} Count: {stats['count']:>3} Volume: {vol_units:>6.1f} units")
+        renderer.emit("")
+
 async def binance_liquidation():
     """Monitor significant liquidation events on Binance Futures"""
     
@@ -48,70 +114,10 @@ async def binance_liquidation():
     print("\nMonitoring large liquidations (>$100k)...")
     print("Values shown in 10k USD units (e.g., 25 = $250,000)\n")
     
-    async with connect(WEBSOCKET_URL) as websocket:
-        while True:
-            try:
-                # Process liquidation data
-                data = json.loads(await websocket.recv())['o']
-                
-                # Calculate liquidation size
-                qty = float(data['q'])
-                price = float(data['p'])
-                usd_size = qty * price
-                
-                # Only process large liquidations
-                if usd_size < MIN_SIZE_USD:
-                    continue
-                
-                # Format data
-                symbol = data['s'].replace('USDT', '')
-                side = data['S']
-                units = format_size(usd_size)
-                timestamp = datetime.fromtimestamp(
-                    int(data['T']) / 1000, 
-                    pytz.timezone('US/Central')
-                ).strftime('%H:%M:%S')
-                
-                # Update statistics
-                liq_stats[symbol]['count'] += 1
-                liq_stats[symbol]['volume'] += usd_size
-                
-                # Format output
-                liq_type = ' LONG LIQ' if side == 'BUY' else ' SHORT LIQ'
-                output = f"{timestamp} {liq_type} {symbol:<8} {units:>6.1f} units"
-                
-                # Display based on size
-                if usd_size > 1_000_000:  # > $1M
-                    stars = ' ' * 3
-                    cprint(f"{stars}{output}{stars}", 'white', 'on_red', attrs=['bold', 'blink'])
-                    print(f"MEGA LIQUIDATION: ${usd_size:,.0f}")
-                elif usd_size > 500_000:  # > $500k
-                    cprint(output, 'white', 'on_yellow', attrs=['bold'])
-                elif usd_size > 250_000:  # > $250k
-                    cprint(output, 'white', 'on_blue', attrs=['bold'])
-                else:  # > $100k
-                    cprint(output, 'yellow', attrs=['bold'])
-                
-                # Log to CSV
-                with open(CSV_FILE, 'a', newline='') as f:
-                    f.write(f"{timestamp},{symbol},{side},{usd_size:.0f},{price},{units:.1f}\n")
-                
-                # Show summary every 50 liquidations
-                if sum(s['count'] for s in liq_stats.values()) % 50 == 0:
-                    print("\nTop Liquidated Assets:")
-                    sorted_stats = sorted(
-                        liq_stats.items(), 
-                        key=lambda x: x[1]['volume'], 
-                        reverse=True
-                    )[:5]
-                    for sym, stats in sorted_stats:
-                        vol_units = format_size(stats['volume'])
-                        print(f"{sym:<8} Count: {stats['count']:>3} Volume: {vol_units:>6.1f} units")
-                    print("")
-                
-            except Exception as e:
-                print(f"Error: {str(e)}")
-                await asyncio.sleep(5)
+    # Small liquidations are rejected from the raw frame before decoding
+    stream = CombinedStream()
+    stream.subscribe(STREAM_NAME, handle_liquidation, prefilter=notional_at_least(MIN_SIZE_USD))
+    await asyncio.gather(renderer.run(), stream.run())
 
 if __name__ == "__main__":
     try:
@@ -23,33 +23,29 @@ Color Coding System:
 
 # Import required libraries
 import asyncio  # For async/await functionality
-import json    # For parsing WebSocket messages
+import sys     # For making the repository packages importable
 from datetime import datetime, timedelta  # For timestamp handling
 import pytz    # For timezone conversion
-from websockets import connect  # For WebSocket connections
 from termcolor import cprint   # For colored terminal output
 import logging  # For error logging
 import csv     # For data export (if needed)
 from pathlib import Path  # For file path handling
-import random  # For potential jitter in reconnection attempts
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.streaming.funding_table import FundingTable  # One persistent mark price stream for every symbol
+from src.utils.batch_writer import batch_writer  # Background CSV writes
+from src.streaming.universe import resolve_symbols  # All-perpetuals mode
 
 # List of cryptocurrency trading pairs to monitor
 # Each pair is suffixed with 'usdt' as these are USDT-margined perpetual futures
-symbols = ['btcusdt', 'ethusdt', 'solusdt', 'bnbusdt', 'dogeusdt', 'wifiusdt', 'xrpusdt']
-
-# Base WebSocket URL for Binance Futures
-websocket_url_base = 'wss://fstream.binance.com/ws'
-
-# Shared counter to track when all symbols have reported their funding rates
-# Using a dict for mutability in async context
-shared_symobl_counter = {'count': 0}
-
-# Lock to prevent concurrent terminal output from different coroutines
-# Ensures clean, non-overlapping output in the terminal
-print_lock = asyncio.Lock()
+# Pass --all to report every USDT perpetual (the funding table covers all of them either way)
+symbols = resolve_symbols(['btcusdt', 'ethusdt', 'solusdt', 'bnbusdt', 'dogeusdt', 'wifiusdt', 'xrpusdt'],
+                          sys.argv)
 
 # Configuration constants
 CSV_FILE = 'funding_rates.csv'
+SNAPSHOT_FILE = 'funding_snapshots.csv'  # Whole-universe table snapshots
+REPORT_INTERVAL = timedelta(hours=6)
 
 class FundingRateLogger:
     def __init__(self):
@@ -66,102 +62,88 @@ class FundingRateLogger:
     def log_funding(self, timestamp: str, symbol: str, funding_rate: float, 
                    yearly_rate: float, mark_price: float) -> None:
         """
-        Log all funding rate data to CSV.
+        Log all funding rate data to CSV via the shared background writer.
         """
-        try:
-            with open(self.csv_path, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    timestamp,
-                    symbol,
-                    f"{funding_rate:.6f}",
-                    f"{yearly_rate:.2f}%",
-                    f"${mark_price:,.2f}"
-                ])
-        except Exception as e:
-            logging.error(f"Error saving to CSV: {str(e)}")
+        batch_writer.write_row(str(self.csv_path), [
+            timestamp,
+            symbol,
+            f"{funding_rate:.6f}",
+            f"{yearly_rate:.2f}%",
+            f"${mark_price:,.2f}"
+        ])
 
 # Initialize the funding rate logger
 funding_logger = FundingRateLogger()
 
-async def binance_funding_stream(symbol, shared_counter):
+def report_funding(entry, tz=pytz.timezone('US/Central')):
     """
-    Connects to Binance's WebSocket stream for a specific trading pair and monitors its funding rate.
-    Pulls data immediately and then every 6 hours.
+    Logs and prints one symbol's latest funding from the funding table.
     """
-    global print_lock
-    websocket_url = f"{websocket_url_base}/{symbol}@markPrice"
+    event_time = datetime.fromtimestamp(entry['time'] / 1000, tz)
+    event_time_str = event_time.strftime('%Y-%m-%d %H:%M:%S')
+    display_time = event_time.strftime('%H:%M:%S')
     
-    while True:
-        try:
-            async with connect(websocket_url) as websocket:
-                # Receive and parse the WebSocket message
-                message = await websocket.recv()
-                data = json.loads(message)
-                
-                # Process the data
-                event_time = datetime.fromtimestamp(data['E'] / 1000, pytz.timezone('US/Central'))
-                event_time_str = event_time.strftime('%Y-%m-%d %H:%M:%S')
-                display_time = event_time.strftime('%H:%M:%S')
-                
-                symbol_display = data['s'].replace('USDT', '')
-                funding_rate = float(data['r'])
-                yearly_funding_rate = (funding_rate * 3 * 365) * 100
-                mark_price = float(data['p'])
-                
-                # Log to CSV
-                funding_logger.log_funding(
-                    event_time_str,
-                    symbol_display,
-                    funding_rate,
-                    yearly_funding_rate,
-                    mark_price
-                )
-                
-                # Determine color coding
-                if yearly_funding_rate > 50:
-                    text_color, back_color = 'black', 'on_red'
-                elif yearly_funding_rate > 30:
-                    text_color, back_color = 'black', 'on_yellow'
-                elif yearly_funding_rate > 5:
-                    text_color, back_color = 'black', 'on_cyan'
-                elif yearly_funding_rate < -10:
-                    text_color, back_color = 'black', 'on_green'
-                elif yearly_funding_rate < -30:
-                    text_color, back_color = 'black', 'on_blue'
-                elif yearly_funding_rate < -50:
-                    text_color, back_color = 'black', 'on_magenta'
-                else:
-                    text_color, back_color = 'black', 'on_white'
-                
-                async with print_lock:
-                    cprint(f"{display_time} {symbol_display} {yearly_funding_rate:.2f}%", 
-                          text_color, back_color, attrs=['bold'])
-                    shared_counter['count'] += 1
-                    if shared_counter['count'] >= len(symbols):
-                        next_update = datetime.now(pytz.timezone('US/Central')) + \
-                                    timedelta(hours=6)
-                        next_update_str = next_update.strftime('%Y-%m-%d %H:%M:%S')
-                        cprint(f"{display_time} yrly fund - Next update at {next_update_str}", 
-                              'white', 'on_black')
-                        shared_counter['count'] = 0
-                        
-                        # Sleep for 6 hours before next update
-                        await asyncio.sleep(6 * 60 * 60)  # 6 hours in seconds
+    symbol_display = entry['symbol'].replace('USDT', '')
+    funding_rate = entry['funding_rate']
+    yearly_funding_rate = entry['annualized']
+    mark_price = entry['mark_price']
+    
+    # Log to CSV
+    funding_logger.log_funding(
+        event_time_str,
+        symbol_display,
+        funding_rate,
+        yearly_funding_rate,
+        mark_price
+    )
+    
+    # Determine color coding
+    if yearly_funding_rate > 50:
+        text_color, back_color = 'black', 'on_red'
+    elif yearly_funding_rate > 30:
+        text_color, back_color = 'black', 'on_yellow'
+    elif yearly_funding_rate > 5:
+        text_color, back_color = 'black', 'on_cyan'
+    elif yearly_funding_rate < -10:
+        text_color, back_color = 'black', 'on_green'
+    elif yearly_funding_rate < -30:
+        text_color, back_color = 'black', 'on_blue'
+    elif yearly_funding_rate < -50:
+        text_color, back_color = 'black', 'on_magenta'
+    else:
+        text_color, back_color = 'black', 'on_white'
+    
+    cprint(f"{display_time} {symbol_display} {yearly_funding_rate:.2f}%", 
+          text_color, back_color, attrs=['bold'])
 
-        except Exception as e:
-            logging.error(f"Error processing {symbol}: {str(e)}")
-            await asyncio.sleep(5)
+async def report_forever(table):
+    """
+    Prints every tracked symbol from the funding table, then waits 6 hours for the next cycle.
+    The table keeps updating in between, so each cycle reports current readings instantly.
+    """
+    await table.wait_ready()
+    while True:
+        for symbol in symbols:
+            entry = table.get(symbol)
+            if entry is None:
+                logging.warning(f"No funding data for {symbol}")
+                continue
+            report_funding(entry)
+        now = datetime.now(pytz.timezone('US/Central'))
+        next_update_str = (now + REPORT_INTERVAL).strftime('%Y-%m-%d %H:%M:%S')
+        cprint(f"{now.strftime('%H:%M:%S')} yrly fund - Next update at {next_update_str}", 
+              'white', 'on_black')
+        await asyncio.sleep(REPORT_INTERVAL.total_seconds())
 
 async def main():
     """
     Main entry point of the script.
-    Creates and runs concurrent tasks for monitoring each trading pair's funding rate.
+    Cold-starts the funding table from the bulk premium index, keeps it current from one
+    all-market mark price subscription, and reports from it on the 6 hour cycle.
     """
-    # Create a separate monitoring task for each symbol
-    tasks = [binance_funding_stream(symbol, shared_symobl_counter) for symbol in symbols]
-    # Run all monitoring tasks concurrently
-    await asyncio.gather(*tasks)
+    table = FundingTable(snapshot_path=SNAPSHOT_FILE)
+    await asyncio.gather(table.run(), report_forever(table))
 
 # Start the monitoring system
-asyncio.run(main())
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -53,23 +53,34 @@ Use Cases:
 """
 
 import asyncio
-import json
+import os
+import sys
+import time
 from datetime import datetime
 import pytz
-from websockets import connect
-from termcolor import cprint
 import logging
 import csv
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 from pathlib import Path
 
-# Configuration
-SYMBOLS = ['btcusdt', 'ethusdt', 'solusdt', 'bnbusdt', 'dogeusdt', 'wifiusdt', 'xrpusdt']
-WEBSOCKET_URL = 'wss://fstream.binance.com/ws'
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.streaming import CombinedStream
+from src.streaming.renderer import TerminalRenderer
+from src.streaming.sharded import ShardedStream, TradeEvents
+from src.streaming.universe import fetch_quote_volumes, resolve_symbols, shard_symbols
+from src.utils.batch_writer import batch_writer
+
+# Configuration (run with --all to monitor every USDT perpetual, sharded over CPU cores)
+SYMBOLS = resolve_symbols(['btcusdt', 'ethusdt', 'solusdt', 'bnbusdt', 'dogeusdt', 'wifiusdt', 'xrpusdt'],
+                          sys.argv)
+SHARDED = '--all' in sys.argv
 MIN_TRADE_SIZE = 500000  # $500k minimum
 MEGA_TRADE_SIZE = 30000000  # $30M for special highlighting
 CSV_FILE = 'large_trades.csv'
 
+# Alerts are drawn by a fixed-rate render task instead of printing on the hot path
+renderer = TerminalRenderer()
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -77,9 +88,27 @@ logging.basicConfig(
 )
 
 class TradeAggregator:
-    def __init__(self):
-        self.trade_buckets: Dict[Tuple[str, str, bool], float] = {}
+    """
+    Sums trade notional per (symbol, side) for each epoch second on a time wheel.
+
+    The wheel has `wheel_seconds` slots indexed by second % wheel_seconds, so
+    memory is fixed no matter how many seconds go by. Finished seconds are
+    flushed in order and their slot is reset in O(1), whether or not any
+    bucket reached MIN_TRADE_SIZE. Trades for a second that has already been
+    flushed or has left the wheel are counted in late_trades and are not
+    aggregated; large individual trades are still saved.
+    """
+
+    def __init__(self, wheel_seconds: int = 60, flush_delay: float = 1.0):
         self.tz = pytz.timezone('US/Central')
+        self.wheel_seconds = wheel_seconds
+        self.flush_delay = flush_delay  # grace period for trades still in flight (latency, clock skew)
+        self.slot_seconds: List[int] = [-1] * wheel_seconds
+        self.slots: List[Dict[Tuple[str, bool], float]] = [{} for _ in range(wheel_seconds)]
+        self.flushed_through = int(time.time()) - 1
+        self.late_trades = 0
+        self.overwritten_slots = 0
+        self._display_symbols: Dict[str, str] = {}
         self._setup_csv()
 
     def _setup_csv(self):
@@ -90,51 +119,67 @@ class TradeAggregator:
                 writer = csv.writer(f)
                 writer.writerow(['Timestamp', 'Symbol', 'Trade Type', 'Size USD', 'Price', 'Quantity'])
 
-    async def add_trade(self, symbol: str, timestamp: int, price: float, quantity: float, is_buyer_maker: bool) -> None:
-        """Add a trade to the aggregator with proper timezone handling."""
-        trade_time = datetime.fromtimestamp(timestamp / 1000, self.tz)
-        second = trade_time.strftime('%H:%M:%S')
+    def add(self, symbol: str, timestamp: int, price: float, quantity: float, is_buyer_maker: bool) -> None:
+        """Add a trade (timestamp in epoch ms) to its second's slot."""
         usd_size = price * quantity
-        
-        trade_key = (symbol.upper().replace('USDT', ''), second, is_buyer_maker)
-        self.trade_buckets[trade_key] = self.trade_buckets.get(trade_key, 0) + usd_size
+        display_symbol = self._display_symbols.get(symbol)
+        if display_symbol is None:
+            display_symbol = self._display_symbols[symbol] = symbol.upper().replace('USDT', '')
+
+        second = timestamp // 1000
+        index = second % self.wheel_seconds
+        slot_second = self.slot_seconds[index]
+        if second <= self.flushed_through or second < slot_second:
+            self.late_trades += 1
+        else:
+            if slot_second != second:
+                if slot_second > self.flushed_through:
+                    # The flusher fell a whole wheel behind; this second was never reported
+                    self.overwritten_slots += 1
+                self.slot_seconds[index] = second
+                self.slots[index] = {}
+            bucket = self.slots[index]
+            key = (display_symbol, is_buyer_maker)
+            bucket[key] = bucket.get(key, 0) + usd_size
 
         # Save large individual trades immediately
         if usd_size >= MIN_TRADE_SIZE:
+            trade_time = datetime.fromtimestamp(timestamp / 1000, self.tz)
             self._save_to_csv(trade_time.strftime('%Y-%m-%d %H:%M:%S'), 
-                            symbol.upper().replace('USDT', ''),
+                            display_symbol,
                             "SELL" if is_buyer_maker else "BUY",
                             usd_size,
                             price,
                             quantity)
 
+    async def add_trade(self, symbol: str, timestamp: int, price: float, quantity: float, is_buyer_maker: bool) -> None:
+        """Add a trade to the aggregator (coroutine form of add())."""
+        self.add(symbol, timestamp, price, quantity, is_buyer_maker)
+
     def _save_to_csv(self, timestamp: str, symbol: str, trade_type: str, 
                     usd_size: float, price: float, quantity: float) -> None:
-        """Save trade data to CSV file."""
-        try:
-            with open(self.csv_path, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([timestamp, symbol, trade_type, f"${usd_size:,.2f}", 
-                               f"${price:,.2f}", f"{quantity:,.8f}"])
-        except Exception as e:
-            logging.error(f"Error saving to CSV: {str(e)}")
+        """Queue trade data for the shared background CSV writer."""
+        batch_writer.write_row(str(self.csv_path), [timestamp, symbol, trade_type, f"${usd_size:,.2f}", 
+                                                    f"${price:,.2f}", f"{quantity:,.8f}"])
 
     async def check_and_print_trades(self) -> None:
-        """Check for and print large trades with proper formatting."""
-        current_time = datetime.now(self.tz).strftime('%H:%M:%S')
-        deletions = []
-
-        for (symbol, second, is_buyer_maker), usd_size in self.trade_buckets.items():
-            if second < current_time and usd_size >= MIN_TRADE_SIZE:
-                self._print_trade(symbol, second, usd_size, is_buyer_maker)
-                deletions.append((symbol, second, is_buyer_maker))
-
-        # Clean up processed trades
-        for key in deletions:
-            del self.trade_buckets[key]
+        """Print large buckets from every finished second, oldest first, and free their slots."""
+        now = int(time.time() - self.flush_delay)
+        for second in range(max(self.flushed_through + 1, now - self.wheel_seconds), now):
+            index = second % self.wheel_seconds
+            if self.slot_seconds[index] != second:
+                continue
+            label = None
+            for (symbol, is_buyer_maker), usd_size in self.slots[index].items():
+                if usd_size >= MIN_TRADE_SIZE:
+                    label = label or datetime.fromtimestamp(second, self.tz).strftime('%H:%M:%S')
+                    self._print_trade(symbol, label, usd_size, is_buyer_maker)
+            self.slots[index] = {}
+            self.slot_seconds[index] = -1
+        self.flushed_through = max(self.flushed_through, now - 1)
 
     def _print_trade(self, symbol: str, timestamp: str, usd_size: float, is_buyer_maker: bool) -> None:
-        """Format and print a trade with proper styling."""
+        """Format a trade with proper styling and queue it for the renderer."""
         trade_type = "SELL" if is_buyer_maker else "BUY"
         back_color = 'on_magenta' if is_buyer_maker else 'on_blue'
         
@@ -145,37 +190,28 @@ class TradeAggregator:
             size_str = f"{usd_size/1000000:.2f}M"
             text = f"{trade_type} {symbol} {timestamp} {size_str}"
             
-        cprint(text, 'white', back_color, attrs=['bold'])
+        renderer.emit(text, 'white', back_color, attrs=['bold'])
 
-async def connect_websocket(uri: str, max_retries: int = 5) -> connect:
-    """Connect to websocket with retry logic."""
-    for attempt in range(max_retries):
-        try:
-            return await connect(uri)
-        except Exception as e:
-            if attempt == max_retries - 1:
-                raise
-            wait_time = 2 ** attempt
-            logging.error(f"Connection attempt {attempt + 1} failed. Retrying in {wait_time}s... Error: {str(e)}")
-            await asyncio.sleep(wait_time)
-
-async def process_trades(websocket, symbol: str, aggregator: TradeAggregator) -> None:
-    """Process incoming trades from websocket stream."""
-    while True:
-        try:
-            message = await websocket.recv()
-            data = json.loads(message)
-            
-            await aggregator.add_trade(
-                symbol=symbol,
-                timestamp=data['T'],
-                price=float(data['p']),
-                quantity=float(data['q']),
-                is_buyer_maker=data['m']
-            )
-        except Exception as e:
-            logging.error(f"Error processing {symbol} trade: {str(e)}")
-            await asyncio.sleep(1)
+def trade_handler(aggregator: TradeAggregator):
+    """Build the combined-stream handler that feeds aggTrade payloads to the aggregator."""
+    def handle_trade(data: dict) -> None:
+        aggregator.add(
+            symbol=data['s'],
+            timestamp=data['T'],
+            price=float(data['p']),
+            quantity=float(data['q']),
+            is_buyer_maker=data['m']
+        )
+    return handle_trade
+
+async def consume_sharded(aggregator: TradeAggregator) -> None:
+    """Decode trades in worker processes (shards balanced by 24h volume) and aggregate them in order."""
+    volumes = fetch_quote_volumes()
+    shards = shard_symbols(SYMBOLS, os.cpu_count() or 1, volumes)
+    stream = ShardedStream([], TradeEvents(), shards=[[f"{symbol}@aggTrade" for symbol in shard]
+                                                      for shard in shards])
+    async for trade_time, symbol, price, quantity, is_buyer_maker, _ in stream.events():
+        aggregator.add(symbol, trade_time, price, quantity, is_buyer_maker)
 
 async def monitor_trades(aggregator: TradeAggregator) -> None:
     """Continuously monitor and print trades."""
@@ -189,21 +225,25 @@ async def monitor_trades(aggregator: TradeAggregator) -> None:
 
 async def main() -> None:
     """Main function to run the trade monitoring system."""
-    trade_aggregator = TradeAggregator()
+    # Merged shard output is also held back briefly for ordering, so allow extra grace there
+    trade_aggregator = TradeAggregator(flush_delay=2.0 if SHARDED else 1.0)
     
-    # Create tasks for each symbol
-    trade_tasks = []
-    for symbol in SYMBOLS:
-        uri = f"{WEBSOCKET_URL}/{symbol}@aggTrade"
-        websocket = await connect_websocket(uri)
-        trade_tasks.append(process_trades(websocket, symbol, trade_aggregator))
+    if SHARDED:
+        ingest = consume_sharded(trade_aggregator)
+    else:
+        # Subscribe every symbol over shared combined-stream connections
+        stream = CombinedStream()
+        handle_trade = trade_handler(trade_aggregator)
+        for symbol in SYMBOLS:
+            stream.subscribe(f"{symbol}@aggTrade", handle_trade)
+        ingest = stream.run()
     
     # Create monitoring task
     monitor_task = asyncio.create_task(monitor_trades(trade_aggregator))
     
     # Run all tasks
     try:
-        await asyncio.gather(monitor_task, *trade_tasks)
+        await asyncio.gather(monitor_task, renderer.run(), ingest)
     except KeyboardInterrupt:
         logging.info("Shutting down gracefully...")
     except Exception as e:
@@ -39,16 +39,20 @@ Output Color Coding:
 """
 
 import asyncio
-import json
 import os
+import sys
 from datetime import datetime
+from pathlib import Path
 import pytz
-from websockets import connect
-from termcolor import cprint
 import csv
 
-# WebSocket endpoint for Binance Futures liquidation feed
-websocket_url = 'wss://fstream.binance.com/ws/!forceOrder@arr'
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.streaming import CombinedStream
+from src.streaming.renderer import TerminalRenderer
+from src.utils.batch_writer import batch_writer
+
+# Binance Futures liquidation feed (all symbols)
+stream_name = '!forceOrder@arr'
 
 # CSV file for historical data storage and analysis
 filename = 'binance_liqs.csv'
@@ -62,87 +66,75 @@ if not os.path.isfile(filename):
             'order_last_filled_quantity', 'order_filled_accumulated_quantity',
             'order_trade_time', 'usd_size'
         ])+ "\n")
-    
-async def binance_liquidation(uri, filename):
+
+# Alerts are drawn by a fixed-rate render task; handlers only queue lines
+renderer = TerminalRenderer()
+
+def handle_liquidation(data):
     """
-    Monitors Binance Futures WebSocket for liquidation events.
-    
-    Args:
-        uri (str): WebSocket endpoint URL
-        filename (str): CSV file path for data storage
+    Processes one liquidation event routed from the combined stream.
     
     The function:
-    1. Maintains WebSocket connection to Binance
-    2. Processes incoming liquidation events
-    3. Formats and displays significant liquidations
-    4. Stores all liquidation data for analysis
+    1. Processes the liquidation event
+    2. Queues significant liquidations for the renderer
+    3. Stores all liquidation data for analysis
     """
-    async with connect(uri) as websocket:
-        while True:
-            try:
-                # Receive and parse liquidation event
-                message = await websocket.recv()
-                data = json.loads(message)
-                
-                # Extract order data from message
-                data = data['o']
-                
-                # Process trade details
-                symbol = data['s'].replace('USDT', '')
-                side = data['S']
-                timestamp = int(data['T'])
-                filled_quantity = float(data['q'])
-                price = float(data['p'])
-                usd_size = filled_quantity * price
-                
-                # Convert timestamp to Central time
-                cst = pytz.timezone('US/Central')
-                time_cst = datetime.fromtimestamp(timestamp / 1000, cst).strftime('%Y-%m-%d %H:%M:%S')
-                
-                # Display significant liquidations (> $3,000)
-                if usd_size > 3000:
-                    # Format liquidation type and symbol
-                    liquidation_type = 'L LIQ' if side == 'SELL' else 'S LIQ'
-                    symbol = symbol[:6]
-                    output = f"{liquidation_type} {symbol} {time_cst} ${usd_size:,.0f}"
-                    color = 'green' if side == 'SELL' else 'red'
-                    attrs = ['bold'] if usd_size > 10000 else []
-
-                    # Format based on liquidation size
-                    if usd_size > 250000:
-                        stars = '*' * 3
-                        attrs.append('blink')
-                        output = f'{stars} {output} {stars}'
-                        for _ in range(4):
-                            cprint(output, 'white', f'on_{color}', attrs=attrs)
-                            await asyncio.sleep(0.1)
-
-                    elif usd_size > 100000:
-                        stars = '*' * 1
-                        attrs.append('blink')
-                        output = f'{stars} {output} {stars}'
-                        for _ in range(2):
-                            cprint(output, 'white', f'on_{color}', attrs=attrs)
-                            await asyncio.sleep(0.1)
-
-                    elif usd_size > 25000:
-                        cprint(output, 'white', f'on_{color}')
-                    else:
-                        cprint(output, color, attrs=attrs)
-
-                    print('')  # Spacing between liquidations
-                
-                # Store liquidation data in CSV
-                msg_values = [str(data[key]) for key in ['s', 'S', 'o', 'f', 'q', 'p', 'ap', 'X', 'l', 'z', 'T']]
-                msg_values.append(str(usd_size))
-                with open(filename, 'a') as f:
-                    trade_info = ','.join(msg_values) + '\n'
-                    trade_info = trade_info.replace('USDT', '')
-                    f.write(trade_info)
-                
-            except Exception as e:
-                print(f"Error processing trade: {str(e)}")
-                await asyncio.sleep(5)
+    # Extract order data from message
+    data = data['o']
+    
+    # Process trade details
+    symbol = data['s'].replace('USDT', '')
+    side = data['S']
+    timestamp = int(data['T'])
+    filled_quantity = float(data['q'])
+    price = float(data['p'])
+    usd_size = filled_quantity * price
+    
+    # Convert timestamp to Central time
+    cst = pytz.timezone('US/Central')
+    time_cst = datetime.fromtimestamp(timestamp / 1000, cst).strftime('%Y-%m-%d %H:%M:%S')
+    
+    # Display significant liquidations (> $3,000)
+    if usd_size > 3000:
+        # Format liquidation type and symbol
+        liquidation_type = 'L LIQ' if side == 'SELL' else 'S LIQ'
+        symbol = symbol[:6]
+        output = f"{liquidation_type} {symbol} {time_cst} ${usd_size:,.0f}"
+        color = 'green' if side == 'SELL' else 'red'
+        attrs = ['bold'] if usd_size > 10000 else []
+
+        # Format based on liquidation size; big ones repeat within a single frame
+        if usd_size > 250000:
+            stars = '*' * 3
+            attrs.append('blink')
+            output = f'{stars} {output} {stars}'
+            renderer.emit(output, 'white', f'on_{color}', attrs=attrs, repeat=4)
+
+        elif usd_size > 100000:
+            stars = '*' * 1
+            attrs.append('blink')
+            output = f'{stars} {output} {stars}'
+            renderer.emit(output, 'white', f'on_{color}', attrs=attrs, repeat=2)
+
+        elif usd_size > 25000:
+            renderer.emit(output, 'white', f'on_{color}')
+        else:
+            renderer.emit(output, color, attrs=attrs)
+
+        renderer.emit('')  # Spacing between liquidations
+    
+    # Store liquidation data in CSV
+    msg_values = [str(data[key]) for key in ['s', 'S', 'o', 'f', 'q', 'p', 'ap', 'X', 'l', 'z', 'T']]
+    msg_values.append(str(usd_size))
+    trade_info = ','.join(msg_values).replace('USDT', '')
+    batch_writer.write_line(filename, trade_info)
+
+async def main():
+    """Reads the liquidation feed and runs the renderer alongside it"""
+    stream = CombinedStream()
+    stream.subscribe(stream_name, handle_liquidation)
+    await asyncio.gather(renderer.run(), stream.run())
 
 # Start the liquidation monitor
-asyncio.run(binance_liquidation(websocket_url, filename))
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -51,17 +51,27 @@ This data is valuable for:
 """
 
 import asyncio  # Import asyncio for handling asynchronous operations
-import json  # Import json for parsing JSON data
 import os  # Import os for interacting with the operating system
+import sys  # Import sys to make the repository packages importable
 from datetime import datetime  # Import datetime for handling date and time
+from pathlib import Path  # Import Path to locate the repository root
 import pytz  # Import pytz for timezone handling
-from websockets import connect  # Import connect for WebSocket connections
-from termcolor import cprint  # Import cprint for colored console output
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.streaming import CombinedStream, Pipeline  # One multiplexed connection; bounded processing stages
+from src.streaming.renderer import TerminalRenderer  # Fixed-rate terminal output
+from src.analysis.order_flow import OrderFlowTracker  # Rolling CVD/imbalance/VWAP windows
+from src.utils.batch_writer import batch_writer  # Background CSV writes
+from src.streaming.sharded import ShardedStream, TradeEvents  # Decoding spread over worker processes
+from src.streaming.universe import fetch_quote_volumes, resolve_symbols, shard_symbols  # All-perpetuals mode
 
 # List of symbols you want to track
-symbols = ['btcusdt', 'ethusdt', 'solusdt', 'bnbusdt', 'dogeusdt', 'wifiusdt', 'xrpusdt']
-websocket_url_base = 'wss://fstream.binance.com/ws'  # Base URL for Binance WebSocket API
+# Pass --all to track every USDT perpetual instead (streams are sharded over CPU cores)
+symbols = resolve_symbols(['btcusdt', 'ethusdt', 'solusdt', 'bnbusdt', 'dogeusdt', 'wifiusdt', 'xrpusdt'],
+                          sys.argv)
 trades_filename = 'binance_trades.csv'  # Filename for logging trades
+MIN_PRINT_USD = 14999  # Trades above this size are printed and logged
+DEPTH_REPORT_SECONDS = 60  # How often pipeline queue depths are shown
 
 # Check if the CSV file exists
 if not os.path.isfile(trades_filename):
@@ -69,70 +79,108 @@ if not os.path.isfile(trades_filename):
         # Write the header row for the CSV file
         f.write('Event Time,Symbol,Aggregate Trade ID,Price,Quantity,Trade Time,Is Buyer Maker\n')
 
-# Asynchronous function to handle the Binance trade stream
-async def binance_trade_stream(uri, symbol, filename):
-    async with connect(uri) as websocket:  # Establish a WebSocket connection
-        while True:  # Loop indefinitely to keep receiving messages
-            try:
-                message = await websocket.recv()  # Receive a message from the WebSocket
-                data = json.loads(message)  # Parse the JSON message
-                event_time = int(data['E'])  # Extract event time
-                agg_trade_id = int(data['a'])  # Extract aggregate trade ID
-                price = float(data['p'])  # Extract price of the trade
-                quantity = float(data['q'])  # Extract quantity of the trade
-                trade_time = int(data['T'])  # Extract trade time
-                is_buyer_maker = data['m']  # Determine if the buyer is the maker
-                cst = pytz.timezone('US/Central')  # Set timezone to US/Central
-                # Convert trade time to a readable format
-                readable_trade_time = datetime.fromtimestamp(trade_time / 1000, cst).strftime('%H:%M:%S')
-                usd_size = price * quantity  # Calculate the USD size of the trade
-                display_symbol = symbol.upper().replace('USDT', '')  # Format the symbol for display
-                
-                # Check if the USD size is greater than $14,999
-                if usd_size > 14999:
-                    trade_type = 'SELL' if is_buyer_maker else "BUY"  # Determine trade type
-                    color = 'red' if trade_type == 'SELL' else 'green'  # Set color based on trade type
-                    
-                    stars = ''  # Initialize stars for highlighting
-                    attrs = ['bold'] if usd_size >= 50000 else []  # Bold attribute for large trades
-                    repeat_count = 1  # Initialize repeat count for output
-                    # Determine star marking and color for very large trades
-                    if usd_size >= 500000:
-                        stars = '*' * 2
-                        repeat_count = 1
-                        color = 'magenta' if trade_type == 'SELL' else 'cyan'
-                    elif usd_size >= 100000:
-                        stars = '*' * 1
-                        repeat_count = 1
-                    # Prepare the output string for console display
-                    output = f"{stars} {trade_type} {display_symbol} {readable_trade_time} {usd_size:,.0f}"
-                    
-                    # Print the output to the console with color and attributes
-                    for _ in range(repeat_count):
-                        cprint(output, 'white', f'on_{color}', attrs=attrs)
-                    
-                    # Log the trade details to the CSV file
-                    with open(filename, 'a') as f:
-                        f.write(f"{event_time},{symbol.upper()},{agg_trade_id},{price},{quantity},"
-                                 f"{trade_time},{is_buyer_maker}\n")
-            except json.JSONDecodeError as e:
-                # Handle JSON decoding errors
-                print(f"Error decoding JSON for {symbol}: {e}")
-                await asyncio.sleep(5)  # Wait before retrying
-            except Exception as e:
-                # Handle unexpected errors
-                print(f"Unexpected error for {symbol}: {e}")
-                await asyncio.sleep(5)  # Wait before retrying
+# Terminal output is drawn by a fixed-rate render task so printing never delays ingestion
+renderer = TerminalRenderer()
+
+# Rolling order-flow windows (1s/10s/1m/5m) fed by every trade, not just the printed ones
+# Strategies query e.g. order_flow.window('BTCUSDT', '1m') in constant time
+order_flow = OrderFlowTracker()
+
+# Decoder: read price/size/side/time straight from the raw frame; only printed trades are fully decoded
+trade_events = TradeEvents(decode_above=MIN_PRINT_USD)
+
+def decode_trade(message):
+    events = trade_events.process(message)
+    return events[0] if events else None
+
+# Aggregator: every trade feeds the order-flow windows; printed ones move on to the sink
+def aggregate_trade(event):
+    trade_time, symbol, price, quantity, is_buyer_maker, data = event
+    order_flow.update(symbol, trade_time, price, quantity, is_buyer_maker)
+    return data
+
+# Raw frames -> decode -> aggregate -> sink, each stage behind its own bounded queue
+# A slow sink (terminal/CSV) drops its oldest alerts instead of holding up order flow or socket reads
+pipeline = Pipeline()
+pipeline.add_stage('decode', decode_trade, maxsize=10_000, policy='drop_oldest')
+pipeline.add_stage('aggregate', aggregate_trade, maxsize=10_000, policy='block')
+
+# Handle one aggTrade payload routed from the combined stream
+def handle_trade(data, filename=trades_filename):
+    event_time = int(data['E'])  # Extract event time
+    symbol = data['s']  # Extract symbol, e.g. BTCUSDT
+    agg_trade_id = int(data['a'])  # Extract aggregate trade ID
+    price = float(data['p'])  # Extract price of the trade
+    quantity = float(data['q'])  # Extract quantity of the trade
+    trade_time = int(data['T'])  # Extract trade time
+    is_buyer_maker = data['m']  # Determine if the buyer is the maker
+    cst = pytz.timezone('US/Central')  # Set timezone to US/Central
+    # Convert trade time to a readable format
+    readable_trade_time = datetime.fromtimestamp(trade_time / 1000, cst).strftime('%H:%M:%S')
+    usd_size = price * quantity  # Calculate the USD size of the trade
+    display_symbol = symbol.upper().replace('USDT', '')  # Format the symbol for display
+    
+    # Check if the USD size is greater than $14,999
+    if usd_size > MIN_PRINT_USD:
+        trade_type = 'SELL' if is_buyer_maker else "BUY"  # Determine trade type
+        color = 'red' if trade_type == 'SELL' else 'green'  # Set color based on trade type
+        
+        stars = ''  # Initialize stars for highlighting
+        attrs = ['bold'] if usd_size >= 50000 else []  # Bold attribute for large trades
+        repeat_count = 1  # Initialize repeat count for output
+        # Determine star marking and color for very large trades
+        if usd_size >= 500000:
+            stars = '*' * 2
+            repeat_count = 1
+            color = 'magenta' if trade_type == 'SELL' else 'cyan'
+        elif usd_size >= 100000:
+            stars = '*' * 1
+            repeat_count = 1
+        # Prepare the output string for console display
+        output = f"{stars} {trade_type} {display_symbol} {readable_trade_time} {usd_size:,.0f}"
+        
+        # Queue the output for the renderer with its color and attributes
+        renderer.emit(output, 'white', f'on_{color}', attrs=attrs, repeat=repeat_count)
+        
+        # Queue the trade details for the CSV file (written off the event loop)
+        batch_writer.write_line(filename, f"{event_time},{symbol.upper()},{agg_trade_id},{price},{quantity},"
+                                          f"{trade_time},{is_buyer_maker}")
+
+pipeline.add_stage('sink', handle_trade, maxsize=1_000, policy='drop_oldest')
+
+# Show per-stage queue depths (and drops) so a stage that falls behind is visible
+async def report_depths():
+    while True:
+        await asyncio.sleep(DEPTH_REPORT_SECONDS)
+        stats = pipeline.stats()
+        depths = ' '.join(f"{name}={stage['depth']}/{stage['high_water']}" for name, stage in stats.items())
+        dropped = sum(stage['dropped'] for stage in stats.values())
+        renderer.emit(f"pipeline depth (now/peak) {depths} dropped={dropped}", 'white')
+
+# Consume trades decoded by worker processes, one shard of symbols each, merged in trade-time order
+# The workers do the decoding, so their events enter the pipeline at the aggregate stage
+async def consume_sharded():
+    shards = shard_symbols(symbols, os.cpu_count() or 1, fetch_quote_volumes())  # Balance shards by 24h volume
+    stream = ShardedStream([], trade_events,
+                           shards=[[f"{symbol}@aggTrade" for symbol in shard] for shard in shards])
+    aggregate = pipeline.stage('aggregate').queue
+    async for event in stream.events():
+        await aggregate.put(event)
 
 # Main asynchronous function to manage trade streams
 async def main():
-    # Create a task for each symbol trade stream
-    tasks = []
+    pipeline.start()
+    if '--all' in sys.argv:
+        await asyncio.gather(renderer.run(), report_depths(), consume_sharded(), pipeline.join())
+        return
+
+    # Route every symbol's aggTrade stream over shared combined-stream connections
+    # Raw frames go straight into the decode stage; the dispatch task never waits on processing
+    stream = CombinedStream()
     for symbol in symbols:
-        stream_url = f"{websocket_url_base}/{symbol}@aggTrade"  # Construct the WebSocket URL for each symbol
-        tasks.append(binance_trade_stream(stream_url, symbol, trades_filename))  # Add the task to the list
+        stream.subscribe_raw(f"{symbol}@aggTrade", pipeline.put_nowait)
 
-    await asyncio.gather(*tasks)  # Run all tasks concurrently
+    await asyncio.gather(renderer.run(), report_depths(), stream.run(), pipeline.join())  # Run until interrupted
 
 # Entry point of the script
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+"""
+Process-wide indicator cache.
+
+SMABot, RSIBot, VWAPBot, trading_utils.calculate_technical_indicators and
+MarketAnalysis.process_ohlcv_data compute overlapping series (SMA_20,
+SMA_50, RSI-14) over the same symbol and timeframe. Routing them through one
+LRU cache computes each indicator once per candle instead of once per
+consumer.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64MB
+
+
+class IndicatorCache:
+    """
+    Thread-safe LRU cache of indicator series with hit/miss counters.
+
+    Memory is bounded both by entry count and by the total size of cached
+    arrays; the least recently used entries are evicted first. Concurrent
+    misses on the same key wait for the first caller instead of recomputing.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable):
+        """Return the cached value for `key`, calling compute() on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self._pending[key] = threading.Event()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            pending.wait()
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+
+        with self._lock:
+            self.misses += 1
+        try:
+            value = compute()
+            self._store(key, value)
+            return value
+        finally:
+            if owner:
+                with self._lock:
+                    self._pending.pop(key, None)
+                pending.set()
+
+    def _store(self, key, value):
+        size = getattr(value, 'nbytes', None)
+        if size is None:
+            size = sys.getsizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self.current_bytes > self.max_bytes):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+
+# Shared by every consumer in the process
+indicator_cache = IndicatorCache()
+
+
+def candle_key(df: pd.DataFrame) -> Tuple:
+    """
+    Identify the candle window of `df`.
+
+    Besides the last candle timestamp this includes the first timestamp and
+    length (EMA/VWAP depend on where the window starts), the last candle's
+    values (the still-open candle changes without a new timestamp) and a
+    checksum of the whole close and volume columns, so an older bar revised
+    by reconciliation misses instead of returning a stale series.
+    """
+    if 'timestamp' in df:
+        first_ts, last_ts = df['timestamp'].iloc[0], df['timestamp'].iloc[-1]
+    else:
+        first_ts, last_ts = df.index[0], df.index[-1]
+    last = df.iloc[-1]
+    fingerprint = tuple(float(last[col]) for col in ('high', 'low', 'close', 'volume') if col in df)
+    checksum = tuple(hash(df[col].to_numpy(dtype=np.float64).tobytes()) for col in ('close', 'volume') if col in df)
+    return (first_ts, last_ts, len(df), fingerprint, checksum)
+
+
+def cached_indicator(df: pd.DataFrame, symbol: Optional[str], timeframe: Optional[str],
+                     indicator: str, params: Tuple, compute: Callable[[], pd.Series],
+                     cache: IndicatorCache = indicator_cache) -> pd.Series:
+    """
+    Compute an indicator series for `df` through the shared cache.
+
+    Keyed by (symbol, timeframe, indicator, params, candle window); ccxt
+    ('BTC/USDT') and Binance ('BTCUSDT') symbols share entries. Without a
+    symbol and timeframe the series is computed directly. The returned series
+    is a private copy aligned to df.index.
+    """
+    if symbol is None or timeframe is None or df is None or df.empty:
+        return compute()
+    key = (symbol.replace('/', '').upper(), timeframe, indicator, tuple(params)) + candle_key(df)
+    series = cache.get_or_compute(key, compute)
+    return pd.Series(series.to_numpy(copy=True), index=df.index, name=series.name)
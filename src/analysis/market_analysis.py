@@ -1,8 +1,10 @@
+from bisect import bisect_left, insort
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Optional
 import ccxt
 from ..config import EXCHANGE_API_KEY, EXCHANGE_SECRET_KEY
+from .indicator_cache import cached_indicator
 
 class MarketAnalysis:
     """
@@ -30,18 +32,26 @@ class MarketAnalysis:
             print(f"Error fetching historical data: {e}")
             return None
             
-    def process_ohlcv_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    def process_ohlcv_data(self, df: pd.DataFrame, symbol: Optional[str] = None,
+                           timeframe: Optional[str] = None) -> pd.DataFrame:
         """
         Process OHLCV data as specified in PRD 3.4.2
+        
+        When symbol and timeframe are given, indicators are shared with the
+        bots and trading_utils through the process-wide indicator cache.
         """
         if df is None or df.empty:
             return None
             
         # Add basic technical indicators
-        df['sma_20'] = df['close'].rolling(window=20).mean()
-        df['sma_50'] = df['close'].rolling(window=50).mean()
-        df['rsi'] = self.calculate_rsi(df['close'])
-        df['atr'] = self.calculate_atr(df)
+        df['sma_20'] = cached_indicator(df, symbol, timeframe, 'sma', (20,),
+                                        lambda: df['close'].rolling(window=20).mean())
+        df['sma_50'] = cached_indicator(df, symbol, timeframe, 'sma', (50,),
+                                        lambda: df['close'].rolling(window=50).mean())
+        df['rsi'] = cached_indicator(df, symbol, timeframe, 'rsi', (14,),
+                                     lambda: self.calculate_rsi(df['close']))
+        df['atr'] = cached_indicator(df, symbol, timeframe, 'atr', (14,),
+                                     lambda: self.calculate_atr(df))
         
         return df
         
@@ -50,31 +60,65 @@ class MarketAnalysis:
                                   threshold: float = 0.02) -> Dict[str, List[float]]:
         """
         Calculate support and resistance levels as specified in PRD 3.4.3
+        
+        Pivots are found with centered rolling max/min over whole arrays; each
+        pivot is then kept only if it is more than `threshold` away from every
+        level already kept, checked with a bisect lookup in a sorted list.
         """
         if df is None or df.empty:
             return {'support': [], 'resistance': []}
             
-        highs = df['high'].rolling(window=window, center=True).max()
-        lows = df['low'].rolling(window=window, center=True).min()
+        high = df['high'].to_numpy(dtype=np.float64)
+        low = df['low'].to_numpy(dtype=np.float64)
+        highs = df['high'].rolling(window=window, center=True).max().to_numpy()
+        lows = df['low'].rolling(window=window, center=True).min().to_numpy()
         
-        # Find potential levels
-        resistance_levels = []
-        support_levels = []
+        # Candidate pivots, in row order
+        candidates = np.zeros(len(df), dtype=bool)
+        candidates[window:len(df) - window] = True
+        resistance_pivots = highs[candidates & (highs == high)]
+        support_pivots = lows[candidates & (lows == low)]
         
-        for i in range(window, len(df) - window):
-            # Resistance
-            if highs.iloc[i] == df['high'].iloc[i] and \
-               all(abs(highs.iloc[i] - level) / level > threshold for level in resistance_levels):
-                resistance_levels.append(highs.iloc[i])
-                
-            # Support
-            if lows.iloc[i] == df['low'].iloc[i] and \
-               all(abs(lows.iloc[i] - level) / level > threshold for level in support_levels):
-                support_levels.append(lows.iloc[i])
+        return {
+            'support': self._dedupe_levels(support_pivots, threshold),
+            'resistance': self._dedupe_levels(resistance_pivots, threshold)
+        }
+        
+    @staticmethod
+    def _dedupe_levels(pivots: np.ndarray, threshold: float) -> List[float]:
+        """
+        Keep pivots that are more than `threshold` (relative to the kept level)
+        away from every earlier kept level, returned sorted.
         
+        |x - level| / level <= threshold holds exactly when level lies in
+        [x / (1 + threshold), x / (1 - threshold)], so one bisect on the sorted
+        kept levels replaces a scan over all of them.
+        """
+        levels: List[float] = []
+        lower_factor = 1 / (1 + threshold)
+        upper_factor = 1 / (1 - threshold) if threshold < 1 else np.inf
+        for pivot in pivots.tolist():
+            i = bisect_left(levels, pivot * lower_factor)
+            if i < len(levels) and levels[i] <= pivot * upper_factor:
+                continue
+            insort(levels, pivot)
+        return levels
+        
+    def calculate_support_resistance_batch(self, frames: Dict[str, pd.DataFrame],
+                                           window: int = 20,
+                                           threshold: float = 0.02) -> Dict[str, Dict[str, List[float]]]:
+        """
+        Calculate support and resistance levels for many symbols at once
+        
+        Args:
+            frames: Symbol -> OHLCV DataFrame
+            
+        Returns:
+            Symbol -> {'support': [...], 'resistance': [...]}
+        """
         return {
-            'support': sorted(support_levels),
-            'resistance': sorted(resistance_levels)
+            symbol: self.calculate_support_resistance(df, window=window, threshold=threshold)
+            for symbol, df in frames.items()
         }
         
     @staticmethod
@@ -0,0 +1,162 @@
+"""
+Rolling order-flow metrics over live trade streams.
+
+For each symbol, trades are folded into per-second buckets held in a
+preallocated NumPy ring (one row per second, five minutes deep by default).
+Every window (1s, 10s, 1m, 5m) keeps running sums of the closed seconds it
+covers. They are updated incrementally when a second closes, and the
+still-open second is added on read, so queries cost the same no matter how
+many trades arrived.
+
+Windows are aligned to whole seconds: a window of w seconds covers the
+current (partial) second plus the w - 1 seconds before it. Time advances
+with trade timestamps, or explicitly through `now` on queries.
+
+Per window: buy/sell volume and notional (taker side), trade counts,
+volume delta (the window's CVD), buy/sell imbalance and VWAP. The
+session-wide cumulative volume delta is available as `cvd`.
+"""
+
+import math
+from typing import Dict, Optional
+import numpy as np
+
+WINDOWS = {'1s': 1, '10s': 10, '1m': 60, '5m': 300}
+
+# Bucket columns
+BUY_VOLUME, SELL_VOLUME, BUY_NOTIONAL, SELL_NOTIONAL, BUY_TRADES, SELL_TRADES = range(6)
+N_FIELDS = 6
+
+# Closed-second sums are rebuilt from the ring this often to stop float drift
+RESUM_INTERVAL = 3600
+
+
+class RollingOrderFlow:
+    """Rolling order-flow windows for one symbol"""
+
+    def __init__(self, windows: Optional[Dict[str, int]] = None):
+        self.windows = dict(windows or WINDOWS)
+        self.size = max(self.windows.values()) + 1
+        self.ring = np.zeros((self.size, N_FIELDS))
+        self.closed = {name: np.zeros(N_FIELDS) for name in self.windows}
+        self.current = [0.0] * N_FIELDS
+        self.second: Optional[int] = None
+        self.cvd = 0.0
+        self.last_price = math.nan
+        self._rollovers = 0
+
+    def update(self, timestamp: int, price: float, quantity: float, is_buyer_maker: bool) -> None:
+        """Fold in one trade (timestamp in epoch ms); is_buyer_maker means the taker sold"""
+        second = timestamp // 1000
+        if self.second is None:
+            self.second = second
+        elif second > self.second:
+            self.advance(timestamp)
+        # Trades stamped before the current second are counted in it
+
+        current = self.current
+        notional = price * quantity
+        if is_buyer_maker:
+            current[SELL_VOLUME] += quantity
+            current[SELL_NOTIONAL] += notional
+            current[SELL_TRADES] += 1
+            self.cvd -= quantity
+        else:
+            current[BUY_VOLUME] += quantity
+            current[BUY_NOTIONAL] += notional
+            current[BUY_TRADES] += 1
+            self.cvd += quantity
+        self.last_price = price
+
+    def advance(self, timestamp: int) -> None:
+        """Close every second before `timestamp` (epoch ms)"""
+        second = timestamp // 1000
+        if self.second is None:
+            self.second = second
+            return
+        if second <= self.second:
+            return
+
+        previous = self.second
+        self.ring[previous % self.size] = self.current
+        self.current = [0.0] * N_FIELDS
+        self.second = second
+        self._rollovers += 1
+
+        if second == previous + 1 and self._rollovers % RESUM_INTERVAL:
+            # Window w now covers closed seconds second-w+1 .. second-1
+            entering = self.ring[previous % self.size]
+            for name, length in self.windows.items():
+                if length > 1:
+                    self.closed[name] += entering - self.ring[(second - length) % self.size]
+            return
+
+        # Clear the seconds skipped without trades, then rebuild every window
+        if second - previous >= self.size:
+            # Quiet for longer than the ring: nothing in it is still in a window
+            self.ring[:] = 0.0
+        else:
+            for empty in range(previous + 1, second):
+                self.ring[empty % self.size] = 0.0
+        self._resum()
+
+    def _resum(self):
+        for name, length in self.windows.items():
+            rows = np.arange(self.second - length + 1, self.second) % self.size
+            self.closed[name] = self.ring[rows].sum(axis=0)
+
+    def totals(self, window: str, now: Optional[int] = None) -> np.ndarray:
+        """Raw field sums for a window; `now` (epoch ms) first expires old seconds"""
+        if now is not None:
+            self.advance(now)
+        return self.closed[window] + self.current
+
+    def window(self, window: str, now: Optional[int] = None) -> dict:
+        buy_volume, sell_volume, buy_notional, sell_notional, buy_trades, sell_trades = \
+            self.totals(window, now).tolist()
+        volume = buy_volume + sell_volume
+        notional = buy_notional + sell_notional
+        return {
+            'buy_volume': buy_volume,
+            'sell_volume': sell_volume,
+            'buy_notional': buy_notional,
+            'sell_notional': sell_notional,
+            'delta': buy_volume - sell_volume,
+            'trades': int(buy_trades + sell_trades),
+            'imbalance': (buy_notional - sell_notional) / notional if notional else 0.0,
+            'vwap': notional / volume if volume else math.nan,
+        }
+
+
+class OrderFlowTracker:
+    """
+    RollingOrderFlow per symbol.
+
+    Example:
+        tracker = OrderFlowTracker()
+        tracker.update('BTCUSDT', trade_time, price, quantity, is_buyer_maker)
+        tracker.window('BTCUSDT', '1m')['imbalance']
+    """
+
+    def __init__(self, windows: Optional[Dict[str, int]] = None):
+        self.windows = dict(windows or WINDOWS)
+        self.symbols: Dict[str, RollingOrderFlow] = {}
+
+    def _flow(self, symbol: str) -> RollingOrderFlow:
+        flow = self.symbols.get(symbol)
+        if flow is None:
+            flow = self.symbols[symbol] = RollingOrderFlow(self.windows)
+        return flow
+
+    def update(self, symbol: str, timestamp: int, price: float, quantity: float, is_buyer_maker: bool) -> None:
+        self._flow(symbol.upper()).update(timestamp, price, quantity, is_buyer_maker)
+
+    def window(self, symbol: str, window: str, now: Optional[int] = None) -> dict:
+        return self._flow(symbol.upper()).window(window, now)
+
+    def cvd(self, symbol: str) -> float:
+        return self._flow(symbol.upper()).cvd
+
+    def snapshot(self, window: str, now: Optional[int] = None) -> Dict[str, dict]:
+        """One window for every tracked symbol"""
+        return {symbol: flow.window(window, now) for symbol, flow in self.symbols.items()}
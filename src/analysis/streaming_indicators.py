@@ -0,0 +1,362 @@
+"""
+Incremental streaming indicators.
+
+Each indicator keeps just enough state to fold in one new bar in constant
+time, instead of recomputing rolling windows and EWMs over the whole
+DataFrame on every candle. Values follow the pandas formulas used in
+trading_utils.calculate_technical_indicators, MarketAnalysis and the bots,
+and StreamingIndicatorEngine.compare_with_pandas checks that they agree.
+
+Every indicator supports:
+- update(...): append a new bar and return the latest value
+- amend(...): revise the most recent bar (e.g. the still-open live candle)
+- seed(...): replay a history to warm up the state
+"""
+
+import math
+from collections import deque
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+NAN = math.nan
+
+# Running sums are rebuilt from the window this often to stop float drift
+RESUM_INTERVAL = 10_000
+
+
+class StreamingSMA:
+    """Simple moving average, matching Series.rolling(period).mean()"""
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+        self._updates = 0
+
+    def update(self, value: float) -> float:
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(value)
+        self.total += value
+        self._updates += 1
+        if self._updates % RESUM_INTERVAL == 0:
+            self.total = math.fsum(self.window)
+        return self.value
+
+    def amend(self, value: float) -> float:
+        if not self.window:
+            # Nothing to revise yet: the amended bar is the first one
+            return self.update(value)
+        self.total += value - self.window[-1]
+        self.window[-1] = value
+        return self.value
+
+    def seed(self, values) -> float:
+        for value in values:
+            self.update(value)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.total / self.period if len(self.window) == self.period else NAN
+
+
+class StreamingEMA:
+    """
+    Exponential moving average, matching Series.ewm(..., adjust=False).mean()
+
+    Pass either span (alpha = 2 / (span + 1)) or alpha directly. The first
+    bar seeds the average; min_periods hides values until that many bars.
+    """
+
+    def __init__(self, span: Optional[float] = None, alpha: Optional[float] = None,
+                 min_periods: int = 0):
+        if (span is None) == (alpha is None):
+            raise ValueError("Pass exactly one of span or alpha")
+        self.alpha = alpha if alpha is not None else 2 / (span + 1)
+        self.min_periods = min_periods
+        self.ema = NAN
+        self.count = 0
+        self._prev = (NAN, 0)
+
+    def update(self, value: float) -> float:
+        self._prev = (self.ema, self.count)
+        if self.count == 0:
+            self.ema = value
+        else:
+            self.ema += self.alpha * (value - self.ema)
+        self.count += 1
+        return self.value
+
+    def amend(self, value: float) -> float:
+        self.ema, self.count = self._prev
+        return self.update(value)
+
+    def seed(self, values) -> float:
+        for value in values:
+            self.update(value)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.ema if self.count >= max(self.min_periods, 1) else NAN
+
+
+class StreamingRSI:
+    """
+    Relative Strength Index.
+
+    smoothing='wilder' averages gains and losses with
+    ewm(alpha=1/period, adjust=False, min_periods=period); smoothing='sma'
+    uses rolling(period).mean() like the bots and MarketAnalysis.calculate_rsi.
+    The first bar counts as a zero change, as delta.where(...) does in pandas.
+    """
+
+    def __init__(self, period: int = 14, smoothing: str = 'wilder'):
+        if smoothing == 'wilder':
+            self.gains = StreamingEMA(alpha=1 / period, min_periods=period)
+            self.losses = StreamingEMA(alpha=1 / period, min_periods=period)
+        elif smoothing == 'sma':
+            self.gains = StreamingSMA(period)
+            self.losses = StreamingSMA(period)
+        else:
+            raise ValueError(f"Unknown RSI smoothing: {smoothing}")
+        self.period = period
+        self.smoothing = smoothing
+        self._last_close = None
+        self._prev_close = None
+
+    def update(self, close: float) -> float:
+        delta = close - self._last_close if self._last_close is not None else 0.0
+        self._prev_close, self._last_close = self._last_close, close
+        self.gains.update(delta if delta > 0 else 0.0)
+        self.losses.update(-delta if delta < 0 else 0.0)
+        return self.value
+
+    def amend(self, close: float) -> float:
+        delta = close - self._prev_close if self._prev_close is not None else 0.0
+        self._last_close = close
+        self.gains.amend(delta if delta > 0 else 0.0)
+        self.losses.amend(-delta if delta < 0 else 0.0)
+        return self.value
+
+    def seed(self, closes) -> float:
+        for close in closes:
+            self.update(close)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        gain, loss = self.gains.value, self.losses.value
+        if math.isnan(gain) or math.isnan(loss):
+            return NAN
+        if loss == 0:
+            return 100.0 if gain > 0 else NAN
+        return 100 - 100 / (1 + gain / loss)
+
+
+class StreamingMACD:
+    """MACD line and signal line, matching the ewm(adjust=False) pair in trading_utils"""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = StreamingEMA(span=fast)
+        self.slow = StreamingEMA(span=slow)
+        self.signal = StreamingEMA(span=signal)
+
+    def update(self, close: float) -> tuple:
+        macd = self.fast.update(close) - self.slow.update(close)
+        return macd, self.signal.update(macd)
+
+    def amend(self, close: float) -> tuple:
+        macd = self.fast.amend(close) - self.slow.amend(close)
+        return macd, self.signal.amend(macd)
+
+    def seed(self, closes) -> tuple:
+        for close in closes:
+            self.update(close)
+        return self.value
+
+    @property
+    def value(self) -> tuple:
+        return self.fast.value - self.slow.value, self.signal.value
+
+
+class StreamingATR:
+    """
+    Average True Range.
+
+    smoothing='sma' matches MarketAnalysis.calculate_atr (rolling mean of the
+    true range); smoothing='wilder' uses ewm(alpha=1/period, adjust=False).
+    """
+
+    def __init__(self, period: int = 14, smoothing: str = 'sma'):
+        if smoothing == 'wilder':
+            self.average = StreamingEMA(alpha=1 / period, min_periods=period)
+        elif smoothing == 'sma':
+            self.average = StreamingSMA(period)
+        else:
+            raise ValueError(f"Unknown ATR smoothing: {smoothing}")
+        self.period = period
+        self._last_close = None
+        self._prev_close = None
+
+    @staticmethod
+    def _true_range(high, low, prev_close):
+        if prev_close is None:
+            return high - low
+        return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = self._true_range(high, low, self._last_close)
+        self._prev_close, self._last_close = self._last_close, close
+        return self.average.update(true_range)
+
+    def amend(self, high: float, low: float, close: float) -> float:
+        self._last_close = close
+        return self.average.amend(self._true_range(high, low, self._prev_close))
+
+    def seed(self, highs, lows, closes) -> float:
+        for high, low, close in zip(highs, lows, closes):
+            self.update(high, low, close)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.average.value
+
+
+class StreamingVWAP:
+    """Cumulative VWAP on the typical price, as VWAPBot.calculate_vwap; reset() starts a new session"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.price_volume = 0.0
+        self.volume = 0.0
+        self._last = (0.0, 0.0)
+
+    def update(self, high: float, low: float, close: float, volume: float) -> float:
+        price_volume = (high + low + close) / 3 * volume
+        self._last = (price_volume, volume)
+        self.price_volume += price_volume
+        self.volume += volume
+        return self.value
+
+    def amend(self, high: float, low: float, close: float, volume: float) -> float:
+        last_price_volume, last_volume = self._last
+        self.price_volume -= last_price_volume
+        self.volume -= last_volume
+        return self.update(high, low, close, volume)
+
+    def seed(self, highs, lows, closes, volumes) -> float:
+        for high, low, close, volume in zip(highs, lows, closes, volumes):
+            self.update(high, low, close, volume)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.price_volume / self.volume if self.volume else NAN
+
+
+class StreamingIndicatorEngine:
+    """
+    The indicator set of calculate_technical_indicators and
+    MarketAnalysis.process_ohlcv_data, updated one bar at a time.
+
+    Keys of `values` use the column names of those functions (SMA_20, SMA_50,
+    EMA_20, RSI, MACD, Signal_Line, atr) plus VWAP and RSI_wilder.
+    """
+
+    def __init__(self, rsi_period: int = 14, atr_period: int = 14):
+        self.sma_20 = StreamingSMA(20)
+        self.sma_50 = StreamingSMA(50)
+        self.ema_20 = StreamingEMA(span=20)
+        self.rsi = StreamingRSI(rsi_period, smoothing='sma')
+        self.rsi_wilder = StreamingRSI(rsi_period, smoothing='wilder')
+        self.macd = StreamingMACD()
+        self.atr = StreamingATR(atr_period)
+        self.vwap = StreamingVWAP()
+
+    def update(self, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """Fold in a newly opened bar"""
+        self.sma_20.update(close)
+        self.sma_50.update(close)
+        self.ema_20.update(close)
+        self.rsi.update(close)
+        self.rsi_wilder.update(close)
+        self.macd.update(close)
+        self.atr.update(high, low, close)
+        self.vwap.update(high, low, close, volume)
+        return self.values
+
+    def amend(self, high: float, low: float, close: float, volume: float) -> Dict[str, float]:
+        """Revise the latest bar in place"""
+        self.sma_20.amend(close)
+        self.sma_50.amend(close)
+        self.ema_20.amend(close)
+        self.rsi.amend(close)
+        self.rsi_wilder.amend(close)
+        self.macd.amend(close)
+        self.atr.amend(high, low, close)
+        self.vwap.amend(high, low, close, volume)
+        return self.values
+
+    def seed(self, df: pd.DataFrame) -> Dict[str, float]:
+        """Warm up the state from an OHLCV DataFrame"""
+        for high, low, close, volume in zip(df['high'].tolist(), df['low'].tolist(),
+                                            df['close'].tolist(), df['volume'].tolist()):
+            self.update(high, low, close, volume)
+        return self.values
+
+    @property
+    def values(self) -> Dict[str, float]:
+        macd, signal = self.macd.value
+        return {
+            'SMA_20': self.sma_20.value,
+            'SMA_50': self.sma_50.value,
+            'EMA_20': self.ema_20.value,
+            'RSI': self.rsi.value,
+            'RSI_wilder': self.rsi_wilder.value,
+            'MACD': macd,
+            'Signal_Line': signal,
+            'atr': self.atr.value,
+            'VWAP': self.vwap.value,
+        }
+
+    @classmethod
+    def compare_with_pandas(cls, df: pd.DataFrame) -> Dict[str, float]:
+        """
+        Stream `df` bar by bar and return the largest absolute difference from
+        the pandas implementations for each indicator.
+        """
+        from ..utils.trading_utils import calculate_technical_indicators
+        from .market_analysis import MarketAnalysis
+
+        reference = calculate_technical_indicators(df.copy())
+        reference['atr'] = MarketAnalysis.calculate_atr(df)
+        delta = df['close'].diff()
+        gain = delta.where(delta > 0, 0).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+        loss = (-delta.where(delta < 0, 0)).ewm(alpha=1 / 14, adjust=False, min_periods=14).mean()
+        reference['RSI_wilder'] = 100 - (100 / (1 + gain / loss))
+        typical_price = (df['high'] + df['low'] + df['close']) / 3
+        reference['VWAP'] = (typical_price * df['volume']).cumsum() / df['volume'].cumsum()
+
+        engine = cls()
+        streamed = pd.DataFrame([
+            engine.update(high, low, close, volume)
+            for high, low, close, volume in zip(df['high'].tolist(), df['low'].tolist(),
+                                                df['close'].tolist(), df['volume'].tolist())
+        ], index=df.index)
+
+        differences = {}
+        for column in streamed.columns:
+            expected = reference[column].to_numpy(dtype=np.float64)
+            actual = streamed[column].to_numpy(dtype=np.float64)
+            if not np.array_equal(np.isnan(expected), np.isnan(actual)):
+                differences[column] = math.inf
+            else:
+                valid = ~np.isnan(expected)
+                differences[column] = float(np.abs(expected[valid] - actual[valid]).max()) if valid.any() else 0.0
+        return differences
@@ -0,0 +1,25 @@
+from .vectorized import (
+    run_vectorized_backtest,
+    signals_to_positions,
+    backtest_metrics,
+    BUY,
+    SELL,
+    HOLD,
+)
+from .sweep import run_parameter_sweep, save_ohlcv_memmap
+from .tick_replay import TickBacktester, TickBroker, TickStrategy, iter_trades
+
+__all__ = [
+    'run_vectorized_backtest',
+    'signals_to_positions',
+    'backtest_metrics',
+    'run_parameter_sweep',
+    'save_ohlcv_memmap',
+    'TickBacktester',
+    'TickBroker',
+    'TickStrategy',
+    'iter_trades',
+    'BUY',
+    'SELL',
+    'HOLD',
+]
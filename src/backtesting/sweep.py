@@ -0,0 +1,146 @@
+"""
+Parallel parameter sweeps over a shared memory-mapped OHLCV array.
+
+The OHLCV history is written once to a .npy file and every worker process
+attaches to it with np.load(mmap_mode='r'), so only parameter tuples and
+metric rows cross the process boundary.
+"""
+
+import inspect
+import itertools
+import os
+import tempfile
+from multiprocessing import Pool
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+from ..config import INITIAL_BALANCE, TRADING_FEE
+from .vectorized import run_vectorized_backtest, backtest_metrics
+
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Constructor arguments that are not strategy settings
+SKIPPED_INIT_PARAMS = ('self', 'api_key', 'api_secret')
+
+# Per-worker state, set once by _init_worker
+_worker = {}
+
+
+def save_ohlcv_memmap(ohlcv, path: str) -> str:
+    """
+    Write OHLCV data to a .npy file that sweep workers can memory-map.
+
+    Accepts ccxt-style rows or a DataFrame with OHLCV_COLUMNS; datetime
+    timestamps are stored as epoch milliseconds.
+    """
+    if isinstance(ohlcv, pd.DataFrame):
+        df = ohlcv[OHLCV_COLUMNS].copy()
+        if pd.api.types.is_datetime64_any_dtype(df['timestamp']):
+            df['timestamp'] = df['timestamp'].to_numpy().astype('datetime64[ms]').astype(np.int64)
+        ohlcv = df.to_numpy(dtype=np.float64)
+    np.save(path, np.ascontiguousarray(ohlcv, dtype=np.float64))
+    return path
+
+
+def _strategy_instance(strategy_cls, params: Dict):
+    """
+    Build a strategy for backtesting without running its constructor.
+
+    The bot constructors open exchange clients, which sweeps never need; the
+    signal functions only read the tuned attributes set here. Attributes the
+    grid does not cover keep their constructor defaults. Leaving symbol and
+    interval unset keeps sweep series out of the shared indicator cache.
+    """
+    bot = strategy_cls.__new__(strategy_cls)
+    bot.__dict__.update(
+        (name, parameter.default)
+        for name, parameter in inspect.signature(strategy_cls.__init__).parameters.items()
+        if name not in SKIPPED_INIT_PARAMS and parameter.default is not inspect.Parameter.empty
+    )
+    bot.__dict__.update(symbol=None, interval=None, timeframe=None)
+    bot.__dict__.update(params)
+    return bot
+
+
+def _strategy_signals(bot, ohlcv: np.ndarray) -> np.ndarray:
+    """Whole-array signals from a BaseBot subclass or a DataFrame-based bot"""
+    if hasattr(bot, 'generate_signals'):
+        # SMABot/RSIBot/VWAPBot mark +1/-1 in a Position column
+        df = pd.DataFrame(ohlcv, columns=OHLCV_COLUMNS)
+        return bot.generate_signals(df)['Position'].to_numpy()
+    return bot.calculate_signals_vectorized(ohlcv)
+
+
+def _init_worker(path, strategy_cls, param_names, timeframe, initial_balance, fee):
+    _worker.update(
+        ohlcv=np.load(path, mmap_mode='r'),
+        strategy_cls=strategy_cls,
+        param_names=param_names,
+        timeframe=timeframe,
+        initial_balance=initial_balance,
+        fee=fee,
+    )
+
+
+def _run_combination(values):
+    params = dict(zip(_worker['param_names'], values))
+    bot = _strategy_instance(_worker['strategy_cls'], params)
+    ohlcv = _worker['ohlcv']
+    signals = _strategy_signals(bot, ohlcv)
+    result = run_vectorized_backtest(ohlcv, signals,
+                                     initial_balance=_worker['initial_balance'],
+                                     fee=_worker['fee'])
+    metrics = backtest_metrics(result, _worker['timeframe'])
+    return values + tuple(metrics.values())
+
+
+def run_parameter_sweep(strategy_cls, param_grid: Dict[str, Iterable], ohlcv,
+                        timeframe: str = '1h', processes: Optional[int] = None,
+                        initial_balance: float = INITIAL_BALANCE,
+                        fee: float = TRADING_FEE) -> pd.DataFrame:
+    """
+    Backtest every combination of a parameter grid across a process pool.
+
+    Args:
+        strategy_cls: BaseBot subclass with calculate_signals_vectorized, or
+            SMABot/RSIBot/VWAPBot (anything with generate_signals)
+        param_grid: Attribute name -> values, e.g. {'rsi_period': range(7, 29),
+            'oversold': [20, 25, 30], 'overbought': [70, 75, 80]}
+        ohlcv: Path to a .npy file from save_ohlcv_memmap, ccxt-style rows or
+            an OHLCV DataFrame
+        timeframe: Candle timeframe, used to annualize Sharpe
+        processes: Worker count (defaults to os.cpu_count())
+
+    Returns:
+        DataFrame with one row per combination, ranked by Sharpe (descending)
+        then max drawdown (ascending)
+    """
+    param_names = list(param_grid)
+    combinations = list(itertools.product(*(list(v) for v in param_grid.values())))
+    processes = processes or os.cpu_count() or 1
+
+    tmp_path = None
+    if isinstance(ohlcv, (str, os.PathLike)):
+        path = os.fspath(ohlcv)
+    else:
+        fd, tmp_path = tempfile.mkstemp(suffix='.npy')
+        os.close(fd)
+        path = save_ohlcv_memmap(ohlcv, tmp_path)
+
+    # Large chunks keep IPC overhead flat as the grid grows
+    chunksize = max(1, len(combinations) // (processes * 8))
+    try:
+        with Pool(processes, initializer=_init_worker,
+                  initargs=(path, strategy_cls, param_names, timeframe,
+                            initial_balance, fee)) as pool:
+            rows = list(pool.imap_unordered(_run_combination, combinations, chunksize))
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+    metric_names = ['total_return', 'sharpe', 'max_drawdown', 'trades', 'fees']
+    results = pd.DataFrame(rows, columns=param_names + metric_names)
+    results = results.astype({name: np.float32 for name in metric_names if name != 'trades'})
+    results['trades'] = results['trades'].astype(np.int32)
+    return results.sort_values(['sharpe', 'max_drawdown'],
+                               ascending=[False, True]).reset_index(drop=True)
@@ -0,0 +1,286 @@
+"""
+Event-driven tick replay backtester.
+
+Streams the aggTrade recordings written by Datastreams/recent_trades.py
+(binance_trades.csv) and Datastreams/huge_trades.py (large_trades.csv)
+through strategy callbacks in time order. Files are read in chunks and
+several recordings are merged lazily, so runs over 10M+ trades never load a
+whole file. Stop-loss and take-profit brackets are checked on every trade,
+which shows intrabar behavior that OHLCV backtests hide.
+"""
+
+import heapq
+import logging
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from ..config import INITIAL_BALANCE, TRADING_FEE
+
+logger = logging.getLogger(__name__)
+
+# (trade_time_ms, symbol, price, quantity, is_buyer_maker)
+Trade = Tuple[int, str, float, float, bool]
+
+AGG_TRADE_COLUMNS = ['Symbol', 'Price', 'Quantity', 'Trade Time', 'Is Buyer Maker']
+LARGE_TRADE_COLUMNS = ['Timestamp', 'Symbol', 'Trade Type', 'Price', 'Quantity']
+
+
+def _emit(columns, end=None) -> Iterator[Trade]:
+    return zip(*(column[:end].tolist() for column in columns))
+
+
+def _ordered_trades(chunks, path: str) -> Iterator[Trade]:
+    """
+    Yield the rows of column chunks (ts, symbols, prices, quantities, is_buyer_maker)
+    globally ordered by trade time.
+
+    Recorders append from several coroutines, so rows arrive slightly out of
+    order, including across chunk boundaries. Each chunk is sorted, then only
+    its rows up to the next chunk's earliest trade are released; the newer
+    tail is carried over and merged into that next chunk. A row older than
+    one already released (displaced by more than a chunk) is dropped and
+    counted, as LiveCandleBuilder does with late trades, because heapq.merge
+    in iter_trades needs every stream in order.
+    """
+    pending = None
+    released = None
+    late_trades = 0
+    for columns in chunks:
+        if released is not None:
+            on_time = columns[0] >= released
+            if not on_time.all():
+                late_trades += int((~on_time).sum())
+                columns = tuple(column[on_time] for column in columns)
+        if pending is not None:
+            # Rows at or before the new chunk's earliest trade can no longer be preceded
+            cut = int(np.searchsorted(pending[0], columns[0].min(), side='right')) if len(columns[0]) else 0
+            if cut:
+                released = int(pending[0][cut - 1])
+                yield from _emit(pending, cut)
+            columns = tuple(np.concatenate((held[cut:], column)) for held, column in zip(pending, columns))
+        order = np.argsort(columns[0], kind='stable')
+        pending = tuple(column[order] for column in columns)
+    if pending is not None:
+        yield from _emit(pending)
+    if late_trades:
+        logger.warning(f"Dropped {late_trades:,} out-of-order trades from {path}")
+
+
+def read_agg_trades(path: str, chunksize: int = 1_000_000) -> Iterator[Trade]:
+    """Yield trades from a recent_trades.py recording (binance_trades.csv)"""
+    reader = pd.read_csv(
+        path,
+        usecols=AGG_TRADE_COLUMNS,
+        dtype={'Symbol': str, 'Price': np.float64, 'Quantity': np.float64,
+               'Trade Time': np.int64, 'Is Buyer Maker': str},
+        chunksize=chunksize,
+    )
+    columns = ((chunk['Trade Time'].to_numpy(),
+                chunk['Symbol'].to_numpy(),
+                chunk['Price'].to_numpy(),
+                chunk['Quantity'].to_numpy(),
+                (chunk['Is Buyer Maker'] == 'True').to_numpy())
+               for chunk in reader)
+    return _ordered_trades(columns, path)
+
+
+def _large_trade_columns(chunk: pd.DataFrame, tz: str, quote_asset: str):
+    ts = (pd.to_datetime(chunk['Timestamp'])
+          .dt.tz_localize(tz, ambiguous='NaT', nonexistent='NaT'))
+    valid = ts.notna().to_numpy()
+    ts = (ts[valid].dt.tz_convert('UTC').dt.tz_localize(None)
+          .to_numpy().astype('datetime64[ms]').astype(np.int64))
+    chunk = chunk[valid]
+    symbols = chunk['Symbol'].str.upper()
+    symbols = symbols.where(symbols.str.endswith(quote_asset), symbols + quote_asset)
+    return (
+        ts,
+        symbols.to_numpy(),
+        chunk['Price'].str.replace(r'[$,]', '', regex=True).astype(np.float64).to_numpy(),
+        chunk['Quantity'].str.replace(',', '', regex=False).astype(np.float64).to_numpy(),
+        (chunk['Trade Type'] == 'SELL').to_numpy(),
+    )
+
+
+def read_large_trades(path: str, chunksize: int = 1_000_000,
+                      tz: str = 'US/Central', quote_asset: str = 'USDT') -> Iterator[Trade]:
+    """
+    Yield trades from a huge_trades.py recording (large_trades.csv).
+
+    That file stores second-resolution local timestamps, formatted numbers
+    ("$1,234.50") and display symbols ("BTC"), which are converted back to
+    epoch ms, floats and exchange symbols ("BTCUSDT") here so merged replays
+    use one key per market.
+    """
+    reader = pd.read_csv(path, usecols=LARGE_TRADE_COLUMNS, dtype=str, chunksize=chunksize)
+    columns = (_large_trade_columns(chunk, tz, quote_asset) for chunk in reader)
+    return _ordered_trades(columns, path)
+
+
+def read_recording(path: str, chunksize: int = 1_000_000) -> Iterator[Trade]:
+    """Pick the reader matching a recording's header"""
+    with open(path) as f:
+        header = f.readline()
+    if 'Aggregate Trade ID' in header:
+        return read_agg_trades(path, chunksize)
+    return read_large_trades(path, chunksize)
+
+
+def iter_trades(paths: List[str], chunksize: int = 1_000_000) -> Iterator[Trade]:
+    """Merge one or more recordings into a single time-ordered trade stream"""
+    streams = [read_recording(path, chunksize) for path in paths]
+    if len(streams) == 1:
+        return streams[0]
+    return heapq.merge(*streams, key=itemgetter(0))
+
+
+class TickBroker:
+    """
+    Simulated account filled at recorded trade prices.
+
+    Positions are per symbol and may carry a stop-loss and take-profit price;
+    brackets fill at the price of the first trade that crosses them.
+    """
+
+    def __init__(self, initial_balance: float = INITIAL_BALANCE, fee: float = TRADING_FEE):
+        self.cash = initial_balance
+        self.fee = fee
+        self.positions: Dict[str, dict] = {}
+        self.last_prices: Dict[str, float] = {}
+        self.closed_trades: List[dict] = []
+        self.time = 0
+
+    def buy(self, symbol: str, quantity: float, stop_loss: Optional[float] = None,
+            take_profit: Optional[float] = None) -> dict:
+        """Open a long position at the last trade price"""
+        return self._open(symbol, 1, quantity, stop_loss, take_profit)
+
+    def sell(self, symbol: str, quantity: float, stop_loss: Optional[float] = None,
+             take_profit: Optional[float] = None) -> dict:
+        """Open a short position at the last trade price"""
+        return self._open(symbol, -1, quantity, stop_loss, take_profit)
+
+    def close(self, symbol: str, reason: str = 'signal') -> Optional[dict]:
+        """Close the position in `symbol` at the last trade price"""
+        if symbol not in self.positions:
+            return None
+        return self._close(symbol, self.last_prices[symbol], reason)
+
+    def position(self, symbol: str) -> Optional[dict]:
+        return self.positions.get(symbol)
+
+    def equity(self) -> float:
+        """Cash plus open positions marked at their last trade price"""
+        return self.cash + sum(p['side'] * p['quantity'] * self.last_prices[s]
+                               for s, p in self.positions.items())
+
+    def _open(self, symbol, side, quantity, stop_loss, take_profit):
+        if symbol in self.positions:
+            raise ValueError(f"Position already open for {symbol}")
+        price = self.last_prices[symbol]
+        notional = quantity * price
+        self.cash -= side * notional + notional * self.fee
+        position = {
+            'side': side,
+            'quantity': quantity,
+            'entry_price': price,
+            'entry_time': self.time,
+            'stop_loss': stop_loss,
+            'take_profit': take_profit,
+        }
+        self.positions[symbol] = position
+        return position
+
+    def _close(self, symbol, price, reason):
+        position = self.positions.pop(symbol)
+        notional = position['quantity'] * price
+        self.cash += position['side'] * notional - notional * self.fee
+        trade = dict(position, symbol=symbol, exit_price=price, exit_time=self.time,
+                     reason=reason,
+                     pnl=position['side'] * position['quantity'] * (price - position['entry_price']))
+        self.closed_trades.append(trade)
+        return trade
+
+    def _check_brackets(self, symbol, price):
+        position = self.positions[symbol]
+        stop, target = position['stop_loss'], position['take_profit']
+        if position['side'] > 0:
+            if stop is not None and price <= stop:
+                return self._close(symbol, price, 'stop_loss')
+            if target is not None and price >= target:
+                return self._close(symbol, price, 'take_profit')
+        else:
+            if stop is not None and price >= stop:
+                return self._close(symbol, price, 'stop_loss')
+            if target is not None and price <= target:
+                return self._close(symbol, price, 'take_profit')
+        return None
+
+
+class TickStrategy:
+    """
+    Base class for strategies replayed by TickBacktester.
+
+    on_trade receives the plain trade fields rather than an event object to
+    keep the per-trade cost low.
+    """
+
+    def on_start(self, broker: TickBroker):
+        pass
+
+    def on_trade(self, timestamp: int, symbol: str, price: float, quantity: float,
+                 is_buyer_maker: bool, broker: TickBroker):
+        raise NotImplementedError
+
+    def on_exit(self, trade: dict, broker: TickBroker):
+        """Called when a stop-loss or take-profit closes a position"""
+        pass
+
+    def on_finish(self, broker: TickBroker):
+        pass
+
+
+class TickBacktester:
+    def __init__(self, strategy: TickStrategy, initial_balance: float = INITIAL_BALANCE,
+                 fee: float = TRADING_FEE):
+        self.strategy = strategy
+        self.broker = TickBroker(initial_balance, fee)
+
+    def run(self, paths: List[str], chunksize: int = 1_000_000) -> dict:
+        """
+        Replay one or more recordings through the strategy.
+
+        Returns:
+            Dict with the number of trades replayed, final equity and the list
+            of closed positions
+        """
+        if isinstance(paths, str):
+            paths = [paths]
+        broker = self.broker
+        strategy = self.strategy
+        on_trade = strategy.on_trade
+        positions = broker.positions
+        last_prices = broker.last_prices
+        check_brackets = broker._check_brackets
+        events = 0
+
+        strategy.on_start(broker)
+        for ts, symbol, price, quantity, is_buyer_maker in iter_trades(paths, chunksize):
+            broker.time = ts
+            last_prices[symbol] = price
+            if symbol in positions:
+                exit_trade = check_brackets(symbol, price)
+                if exit_trade is not None:
+                    strategy.on_exit(exit_trade, broker)
+            on_trade(ts, symbol, price, quantity, is_buyer_maker, broker)
+            events += 1
+        strategy.on_finish(broker)
+
+        logger.info(f"Replayed {events:,} trades, {len(broker.closed_trades)} closed positions")
+        return {
+            'events': events,
+            'equity': broker.equity(),
+            'cash': broker.cash,
+            'closed_trades': broker.closed_trades,
+        }
@@ -0,0 +1,139 @@
+"""
+Vectorized backtest engine.
+
+Computes positions, fills, fees and equity for a whole OHLCV history as NumPy
+arrays in one pass, instead of looping candle by candle like
+BaseBot.backtest's reference path.
+"""
+
+from typing import Dict
+import numpy as np
+from ..config import INITIAL_BALANCE, MAX_POSITION_SIZE, TRADING_FEE
+
+# Signal values returned by whole-array signal functions
+BUY = 1
+SELL = -1
+HOLD = 0
+
+# Column layout of ccxt-style OHLCV rows
+TIMESTAMP, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+def signals_to_positions(signals) -> np.ndarray:
+    """
+    Convert a BUY/SELL/HOLD signal array into a 0/1 in-position array.
+
+    A buy only opens a position when flat and a sell only closes it when long,
+    which is the same as carrying the last non-HOLD signal forward.
+    """
+    signals = np.asarray(signals, dtype=np.int8)
+    last_idx = np.where(signals != HOLD, np.arange(len(signals)), -1)
+    np.maximum.accumulate(last_idx, out=last_idx)
+    last_signal = np.where(last_idx >= 0, signals[last_idx], HOLD)
+    return (last_signal == BUY).astype(np.int8)
+
+
+def run_vectorized_backtest(ohlcv, signals,
+                            initial_balance: float = INITIAL_BALANCE,
+                            position_size: float = MAX_POSITION_SIZE,
+                            fee: float = TRADING_FEE) -> Dict[str, np.ndarray]:
+    """
+    Backtest a whole signal array against OHLCV data.
+
+    Each entry spends ``position_size`` of the free balance at the candle close
+    and pays ``fee`` on top; each exit sells the whole position at the close
+    and pays ``fee`` on the proceeds.
+
+    Args:
+        ohlcv: Array-like of [timestamp, open, high, low, close, volume] rows
+        signals: Array of BUY (1), SELL (-1) or HOLD (0), one per row
+        initial_balance: Starting balance in USDT
+        position_size: Fraction of the free balance used per entry
+        fee: Fee rate charged on both fills
+
+    Returns:
+        Dict of per-candle arrays (timestamp, price, position, amount, balance,
+        fees, equity) plus the fill indices and prices of every trade
+    """
+    ohlcv = np.asarray(ohlcv, dtype=np.float64)
+    close = ohlcv[:, CLOSE]
+    signals = np.asarray(signals)
+    if len(signals) != len(close):
+        raise ValueError("signals must have one value per candle")
+
+    position = signals_to_positions(signals)
+    previous = np.concatenate(([0], position[:-1]))
+    entries = np.flatnonzero(position > previous)
+    exits = np.flatnonzero(position < previous)
+    entry_price = close[entries]
+    exit_price = close[exits]
+
+    # Balance after each round trip is the balance before it times a fixed multiplier
+    entry_cost = position_size * (1 + fee)
+    multiplier = 1 - entry_cost + position_size * (1 - fee) * exit_price / entry_price[:len(exits)]
+    closed_balance = initial_balance * np.concatenate(([1.0], np.cumprod(multiplier)))
+    entry_balance = closed_balance[:len(entries)]
+    amount_bought = entry_balance * position_size / entry_price
+
+    # Number of entries seen so far tells which trade each candle belongs to
+    trade_no = np.cumsum(position > previous)
+    in_position = position.astype(bool)
+    open_trade = np.maximum(trade_no - 1, 0)
+
+    amount = np.where(in_position, amount_bought[open_trade] if len(entries) else 0.0, 0.0)
+    balance = np.where(
+        in_position,
+        entry_balance[open_trade] * (1 - entry_cost) if len(entries) else 0.0,
+        closed_balance[np.minimum(trade_no, len(exits))]
+    )
+
+    fees = np.zeros(len(close))
+    fees[entries] = entry_balance * position_size * fee
+    fees[exits] = amount_bought[:len(exits)] * exit_price * fee
+
+    return {
+        'timestamp': ohlcv[:, TIMESTAMP].astype(np.int64),
+        'price': close,
+        'position': position,
+        'amount': amount,
+        'balance': balance,
+        'fees': fees,
+        'equity': balance + amount * close,
+        'entry_index': entries,
+        'exit_index': exits,
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+    }
+
+
+def periods_per_year(timeframe: str) -> float:
+    """Number of candles per year for a ccxt/Binance timeframe such as '1m' or '4h'"""
+    units = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+    seconds = int(timeframe[:-1]) * units[timeframe[-1]]
+    return 365 * 86400 / seconds
+
+
+def backtest_metrics(result: Dict[str, np.ndarray], timeframe: str = '1h') -> Dict[str, float]:
+    """
+    Summarize a run_vectorized_backtest result.
+
+    Sharpe is annualized from per-candle equity returns; max_drawdown is the
+    largest peak-to-trough equity loss as a positive fraction.
+    """
+    equity = result['equity']
+    if len(equity) < 2:
+        return {'total_return': 0.0, 'sharpe': 0.0, 'max_drawdown': 0.0,
+                'trades': 0, 'fees': 0.0}
+
+    returns = np.diff(equity) / equity[:-1]
+    std = returns.std()
+    sharpe = returns.mean() / std * np.sqrt(periods_per_year(timeframe)) if std > 0 else 0.0
+    peak = np.maximum.accumulate(equity)
+
+    return {
+        'total_return': float(equity[-1] / equity[0] - 1),
+        'sharpe': float(sharpe),
+        'max_drawdown': float(((peak - equity) / peak).max()),
+        'trades': int(len(result['exit_index'])),
+        'fees': float(result['fees'].sum()),
+    }
@@ -1,14 +1,31 @@
+import asyncio
 import logging
 import time
 from abc import ABC, abstractmethod
+from collections import deque
 import ccxt
+import numpy as np
 from ..config import (
     EXCHANGE_API_KEY,
     EXCHANGE_SECRET_KEY,
+    INITIAL_BALANCE,
     MAX_POSITION_SIZE,
     STOP_LOSS_PERCENTAGE,
     TAKE_PROFIT_PERCENTAGE,
+    TRADING_FEE,
 )
+from ..backtesting.vectorized import run_vectorized_backtest
+from ..data.live_candles import LiveCandleBuilder, bar_to_ohlcv, normalize_symbol
+from ..streaming import CombinedStream, FUTURES_STREAM_URL, SPOT_STREAM_URL
+from ..streaming.market_bus import CANDLE, DEFAULT_BUS_NAME, MarketBusReader, record_to_bar
+
+CANDLE_HISTORY = 100
+
+# Live candles are built from Binance aggTrade streams, so only Binance venues are supported
+LIVE_STREAM_URLS = {
+    'binance': SPOT_STREAM_URL,
+    'binanceusdm': FUTURES_STREAM_URL,
+}
 
 class BaseBot(ABC):
     def __init__(self, exchange_id='binance', symbol='BTC/USDT', timeframe='1h'):
@@ -31,12 +48,25 @@ class BaseBot(ABC):
         # Initialize state
         self.position = None
         self.last_price = None
+        self.candles = deque(maxlen=CANDLE_HISTORY)
     
     @abstractmethod
     def calculate_signals(self, data):
         """Calculate trading signals based on the strategy."""
         pass
     
+    def calculate_signals_vectorized(self, ohlcv):
+        """
+        Calculate signals for a whole OHLCV history at once.
+        
+        Takes an (n, 6) array of [timestamp, open, high, low, close, volume] rows
+        and returns n values of BUY (1), SELL (-1) or HOLD (0). Value i must be
+        what calculate_signals returns for the rows up to and including i.
+        Strategies that implement it (e.g. MACrossoverBot) can run
+        backtest(..., vectorized=True).
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} has no vectorized signal function")
+    
     def fetch_data(self):
         """Fetch OHLCV data from the exchange."""
         try:
@@ -50,6 +80,32 @@ class BaseBot(ABC):
             self.logger.error(f"Error fetching data: {e}")
             return None
     
+    def market_symbol(self, symbol):
+        """ccxt market for an exchange symbol id such as 'BTCUSDT' (as used by LiveCandleBuilder)."""
+        if symbol == normalize_symbol(self.symbol):
+            return self.symbol
+        self.exchange.load_markets()
+        markets = self.exchange.markets_by_id.get(symbol)
+        if not markets:
+            raise ValueError(f"Unknown {self.exchange_id} market id: {symbol}")
+        # Newer ccxt maps each id to a list of markets
+        market = markets[0] if isinstance(markets, list) else markets
+        return market['symbol']
+    
+    def fetch_kline(self, symbol, interval, open_time):
+        """
+        Fetch the single REST kline of `symbol` opening at `open_time`; used to reconcile live bars.
+        
+        `symbol` is the builder's exchange id, which may belong to another bot on a shared builder.
+        """
+        ohlcv = self.exchange.fetch_ohlcv(
+            symbol=self.market_symbol(symbol),
+            timeframe=interval,
+            since=open_time,
+            limit=1
+        )
+        return ohlcv[0] if ohlcv else None
+    
     def get_position_size(self):
         """Calculate position size based on risk management rules."""
         try:
@@ -96,6 +152,117 @@ class BaseBot(ABC):
             self.logger.error(f"Error setting stop loss: {e}")
             return None
     
+    def step(self, data):
+        """Calculate signals on OHLCV rows and execute trades based on them."""
+        signal = self.calculate_signals(data)
+        
+        if signal == 'buy' and not self.position:
+            amount = self.get_position_size()
+            order = self.place_order('buy', amount)
+            if order:
+                self.position = order
+                self.set_stop_loss(order['price'], 'buy')
+        
+        elif signal == 'sell' and self.position:
+            order = self.place_order('sell', self.position['amount'])
+            if order:
+                self.position = None
+    
+    def on_candle(self, bar, closed):
+        """
+        Handle a live bar from a LiveCandleBuilder.
+        
+        Partial bars only refresh last_price. Closed bars are merged into the
+        candle history (a reconciled bar replaces the row with the same open
+        time) and the strategy runs on the updated history, unless the bar is a
+        revision of an older row.
+        """
+        self.last_price = bar['close']
+        if not closed:
+            return
+        
+        row = bar_to_ohlcv(bar)
+        if self.candles and self.candles[-1][0] > row[0]:
+            for i, candle in enumerate(self.candles):
+                if candle[0] == row[0]:
+                    self.candles[i] = row
+            return
+        if self.candles and self.candles[-1][0] == row[0]:
+            self.candles[-1] = row
+        else:
+            self.candles.append(row)
+        
+        try:
+            self.step(list(self.candles))
+        except Exception as e:
+            self.logger.error(f"Error handling candle: {e}")
+    
+    def seed_candles(self):
+        """Load the candle history with one REST request, dropping the still-open bar."""
+        history = self.fetch_data() or []
+        self.candles.clear()
+        self.candles.extend(list(row) for row in history[:-1])
+    
+    def attach(self, builder):
+        """
+        Subscribe to a shared LiveCandleBuilder for this bot's symbol and timeframe.
+        
+        The history is seeded from one REST request; the still-open bar it
+        returns is dropped and rebuilt from trades.
+        """
+        self.seed_candles()
+        builder.subscribe(self.on_candle, symbol=self.symbol, interval=self.timeframe)
+    
+    async def run_live(self, builder=None, stream=None):
+        """
+        Streaming bot loop: candles are built from aggTrade events instead of
+        polling REST klines, and each closed bar is reconciled with REST.
+        """
+        self.logger.info(f"Starting {self.__class__.__name__} on {self.symbol} (live candles)")
+        
+        if builder is None:
+            builder = LiveCandleBuilder([self.timeframe])
+        if stream is None:
+            if self.exchange_id not in LIVE_STREAM_URLS:
+                raise ValueError(f"No live candle stream for exchange '{self.exchange_id}'; "
+                                 f"supported: {', '.join(LIVE_STREAM_URLS)}")
+            stream = CombinedStream(LIVE_STREAM_URLS[self.exchange_id])
+        
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.attach, builder)
+        stream.subscribe_raw(f"{normalize_symbol(self.symbol).lower()}@aggTrade", builder.raw_handler)
+        await asyncio.gather(stream.run(), builder.reconcile_loop(self.fetch_kline))
+    
+    def run_bus(self, bus_name=DEFAULT_BUS_NAME, idle_sleep=0.01):
+        """
+        Bot loop fed by a shared-memory market bus (see streaming.market_bus).
+        
+        Candles come from the ingestion process, so any number of bots can
+        run without opening their own exchange connections.
+        """
+        self.logger.info(f"Starting {self.__class__.__name__} on {self.symbol} (market bus '{bus_name}')")
+        self.seed_candles()
+        reader = MarketBusReader(bus_name)
+        symbol = normalize_symbol(self.symbol).encode()
+        interval = self.timeframe.encode()
+        overruns = 0
+        
+        try:
+            while True:
+                records = reader.poll(copy=True)
+                if not len(records):
+                    time.sleep(idle_sleep)
+                    continue
+                mine = records[(records['kind'] == CANDLE) & (records['symbol'] == symbol)
+                               & (records['interval'] == interval)]
+                for record in mine:
+                    self.on_candle(record_to_bar(record), bool(record['closed']))
+                if reader.overruns > overruns:
+                    self.logger.warning(f"Fell behind the market bus; {reader.overruns - overruns} records lost")
+                    overruns = reader.overruns
+        finally:
+            reader.close()
+    
     def run(self):
         """Main bot loop."""
         self.logger.info(f"Starting {self.__class__.__name__} on {self.symbol}")
@@ -107,21 +274,7 @@ class BaseBot(ABC):
                 if not data:
                     continue
                 
-                # Calculate signals
-                signal = self.calculate_signals(data)
-                
-                # Execute trades based on signals
-                if signal == 'buy' and not self.position:
-                    amount = self.get_position_size()
-                    order = self.place_order('buy', amount)
-                    if order:
-                        self.position = order
-                        self.set_stop_loss(order['price'], 'buy')
-                
-                elif signal == 'sell' and self.position:
-                    order = self.place_order('sell', self.position['amount'])
-                    if order:
-                        self.position = None
+                self.step(data)
                 
                 # Sleep to avoid hitting rate limits
                 time.sleep(self.exchange.rateLimit / 1000)
@@ -130,14 +283,27 @@ class BaseBot(ABC):
                 self.logger.error(f"Error in main loop: {e}")
                 time.sleep(10)  # Wait before retrying
     
-    def backtest(self, historical_data):
-        """Run strategy on historical data."""
+    def backtest(self, historical_data, vectorized=False, fee=TRADING_FEE, initial_balance=INITIAL_BALANCE):
+        """
+        Run strategy on historical data.
+        
+        With vectorized=True the whole history goes through
+        calculate_signals_vectorized and the NumPy engine, which also charges
+        `fee` on every fill. The default per-candle path is kept as a
+        fee-free reference for checking results (compare with fee=0); like
+        the live loop, it gives the strategy the last CANDLE_HISTORY candles.
+        """
+        if vectorized:
+            ohlcv = np.asarray(historical_data, dtype=np.float64)
+            signals = self.calculate_signals_vectorized(ohlcv)
+            return run_vectorized_backtest(ohlcv, signals, initial_balance=initial_balance, fee=fee)
+        
         results = []
         position = None
-        balance = 10000  # Initial balance in USDT
+        balance = initial_balance  # USDT
         
-        for candle in historical_data:
-            signal = self.calculate_signals([candle])
+        for i, candle in enumerate(historical_data):
+            signal = self.calculate_signals(historical_data[max(0, i + 1 - CANDLE_HISTORY):i + 1])
             
             if signal == 'buy' and not position:
                 position = {
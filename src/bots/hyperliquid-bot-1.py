@@ -27,6 +27,11 @@ import datetime                     # Date and time operations
 import schedule                     # Task scheduling
 import requests                     # HTTP requests for API calls
 import logging                      # Logging functionality
+import sys                          # Module search path for the shared src package
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.streaming.order_book import hyperliquid_book  # Locally maintained L2 books
 
 # Configure logging
 logging.basicConfig(
@@ -47,6 +52,7 @@ def ask_bid(symbol):
     - Uses L2 order book data (level 2 market depth)
     - Retrieves best ask (lowest selling price) and best bid (highest buying price)
     - Returns both prices plus full order book data for additional analysis
+    - Served from a locally maintained book after the first call
     
     Parameters:
     symbol (str): Trading pair to query (e.g., 'WIF')
@@ -54,6 +60,13 @@ def ask_bid(symbol):
     Returns:
     tuple: (ask_price, bid_price, full_orderbook_data)
     """
+    # Local book kept current over the l2Book WebSocket; REST only while it is not in sync
+    book = hyperliquid_book(symbol)
+    top = book.ask_bid() if book is not None else None
+    if top is not None:
+        ask, bid = top
+        return ask, bid, book.levels
+
     try:
         # API endpoint for order book data
         url = 'https://api.hyperliquid.xyz/info'
@@ -0,0 +1,50 @@
+import numpy as np
+from .base_bot import BaseBot, CANDLE_HISTORY
+from ..backtesting.vectorized import BUY, CLOSE, HOLD, SELL
+
+
+class MACrossoverBot(BaseBot):
+    """
+    Moving-average crossover on closes: buy when the fast SMA crosses above
+    the slow SMA, sell when it crosses below.
+
+    calculate_signals() looks at the last two candles of the rows it is given;
+    calculate_signals_vectorized() computes the same crossings for a whole
+    history at once, so backtest(..., vectorized=True) matches the per-candle
+    path at fee=0.
+    """
+
+    def __init__(self, exchange_id='binance', symbol='BTC/USDT', timeframe='1h', fast_period=10, slow_period=30):
+        if not 0 < fast_period < slow_period < CANDLE_HISTORY:
+            raise ValueError(f"Need 0 < fast_period < slow_period < {CANDLE_HISTORY}")
+        super().__init__(exchange_id, symbol, timeframe)
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+
+    def calculate_signals(self, data):
+        closes = np.asarray([row[CLOSE] for row in data[-(self.slow_period + 1):]], dtype=np.float64)
+        if len(closes) <= self.slow_period:
+            return 'hold'
+        fast_now, fast_before = closes[-self.fast_period:].mean(), closes[-self.fast_period - 1:-1].mean()
+        slow_now, slow_before = closes[-self.slow_period:].mean(), closes[-self.slow_period - 1:-1].mean()
+        if fast_before <= slow_before and fast_now > slow_now:
+            return 'buy'
+        if fast_before >= slow_before and fast_now < slow_now:
+            return 'sell'
+        return 'hold'
+
+    def calculate_signals_vectorized(self, ohlcv):
+        closes = np.asarray(ohlcv, dtype=np.float64)[:, CLOSE]
+        signals = np.full(len(closes), HOLD, dtype=np.int8)
+        if len(closes) <= self.slow_period:
+            return signals
+        # Same window means as calculate_signals, one row per candle that has a full slow window
+        windows = np.lib.stride_tricks.sliding_window_view(closes, self.slow_period)
+        slow = windows.mean(axis=1)
+        fast = windows[:, -self.fast_period:].mean(axis=1)
+        above_before, above_now = fast[:-1] > slow[:-1], fast[1:] > slow[1:]
+        below_before, below_now = fast[:-1] < slow[:-1], fast[1:] < slow[1:]
+        # Index 0 of the crossings is the first candle with a previous full window
+        signals[self.slow_period:][~above_before & above_now] = BUY
+        signals[self.slow_period:][~below_before & below_now] = SELL
+        return signals
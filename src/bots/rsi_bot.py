@@ -4,6 +4,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import time
+from ..analysis.indicator_cache import cached_indicator
+from ..analysis.streaming_indicators import StreamingRSI
+from ..data.candle_feed import CandleFeed
 
 class RSIBot:
     def __init__(self, api_key, api_secret, symbol='BTCUSDT', interval='1h', rsi_period=14, 
@@ -16,11 +19,13 @@ class RSIBot:
         self.overbought = overbought
         
     def calculate_rsi(self, data):
-        delta = data['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        def compute():
+            delta = data['close'].diff()
+            gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_period).mean()
+            loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_period).mean()
+            rs = gain / loss
+            return 100 - (100 / (1 + rs))
+        return cached_indicator(data, self.symbol, self.interval, 'rsi', (self.rsi_period,), compute)
         
     def get_historical_data(self):
         klines = self.client.get_historical_klines(
@@ -43,15 +48,27 @@ class RSIBot:
         return df
         
     def run_bot(self):
+        # Load history once, then poll only for new or updated candles
+        feed = CandleFeed(self.client, self.symbol, self.interval)
+        df = feed.load(f"{self.rsi_period + 1} days ago UTC")
+        rsi = StreamingRSI(self.rsi_period, smoothing='sma')
+        rsi.seed(df['close'].tolist())
+        price = df['close'].iloc[-1]
+        
         while True:
             try:
-                df = self.get_historical_data()
-                df = self.generate_signals(df)
+                for bar, is_new in feed.poll():
+                    price = bar['close']
+                    if is_new:
+                        rsi.update(price)
+                    else:
+                        rsi.amend(price)
+                current_rsi = rsi.value
                 
-                current_position = df['Position'].iloc[-1]
+                current_position = 1 if current_rsi < self.oversold else -1 if current_rsi > self.overbought else 0
                 print(f"Current Position Signal: {current_position}")
-                print(f"Current Price: {df['close'].iloc[-1]}")
-                print(f"Current RSI: {df['RSI'].iloc[-1]}")
+                print(f"Current Price: {price}")
+                print(f"Current RSI: {current_rsi}")
                 
                 time.sleep(60)  # Check every minute
                 
@@ -4,6 +4,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import time
+from ..analysis.indicator_cache import cached_indicator
+from ..analysis.streaming_indicators import StreamingSMA
+from ..data.candle_feed import CandleFeed
 
 class SMABot:
     def __init__(self, api_key, api_secret, symbol='BTCUSDT', interval='1h', sma_period=20):
@@ -13,7 +16,8 @@ class SMABot:
         self.sma_period = sma_period
         
     def calculate_sma(self, data):
-        return data['close'].rolling(window=self.sma_period).mean()
+        return cached_indicator(data, self.symbol, self.interval, 'sma', (self.sma_period,),
+                                lambda: data['close'].rolling(window=self.sma_period).mean())
         
     def get_historical_data(self):
         klines = self.client.get_historical_klines(
@@ -36,15 +40,27 @@ class SMABot:
         return df
         
     def run_bot(self):
+        # Load history once, then poll only for new or updated candles
+        feed = CandleFeed(self.client, self.symbol, self.interval)
+        df = feed.load(f"{self.sma_period + 1} days ago UTC")
+        sma = StreamingSMA(self.sma_period)
+        sma.seed(df['close'].tolist())
+        price = df['close'].iloc[-1]
+        
         while True:
             try:
-                df = self.get_historical_data()
-                df = self.generate_signals(df)
+                for bar, is_new in feed.poll():
+                    price = bar['close']
+                    if is_new:
+                        sma.update(price)
+                    else:
+                        sma.amend(price)
+                current_sma = sma.value
                 
-                current_position = df['Position'].iloc[-1]
+                current_position = 1 if price > current_sma else -1 if price < current_sma else 0
                 print(f"Current Position Signal: {current_position}")
-                print(f"Current Price: {df['close'].iloc[-1]}")
-                print(f"Current SMA: {df['SMA'].iloc[-1]}")
+                print(f"Current Price: {price}")
+                print(f"Current SMA: {current_sma}")
                 
                 time.sleep(60)  # Check every minute
                 
@@ -4,6 +4,9 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import time
+from ..analysis.indicator_cache import cached_indicator
+from ..analysis.streaming_indicators import StreamingSMA
+from ..data.candle_feed import CandleFeed
 
 class VWAPBot:
     def __init__(self, api_key, api_secret, symbol='BTCUSDT', interval='1h'):
@@ -12,11 +15,11 @@ class VWAPBot:
         self.interval = interval
         
     def calculate_vwap(self, df):
-        df['typical_price'] = (df['high'] + df['low'] + df['close']) / 3
-        df['price_volume'] = df['typical_price'] * df['volume']
-        df['cumulative_price_volume'] = df['price_volume'].cumsum()
-        df['cumulative_volume'] = df['volume'].cumsum()
-        return df['cumulative_price_volume'] / df['cumulative_volume']
+        def compute():
+            typical_price = (df['high'] + df['low'] + df['close']) / 3
+            cumulative_price_volume = (typical_price * df['volume']).cumsum()
+            return cumulative_price_volume / df['volume'].cumsum()
+        return cached_indicator(df, self.symbol, self.interval, 'vwap', (), compute)
         
     def get_historical_data(self):
         klines = self.client.get_historical_klines(
@@ -40,15 +43,38 @@ class VWAPBot:
         return df
         
     def run_bot(self):
+        # Load the trailing day once, then poll only for new or updated candles
+        feed = CandleFeed(self.client, self.symbol, self.interval)
+        df = feed.load("1 day ago UTC")
+        if df.empty:
+            raise ValueError(f"No {self.interval} candles for {self.symbol} in the last day")
+        
+        # VWAP over a fixed trailing window (one day of bars at load time) is the ratio of two rolling sums
+        window = len(df)
+        price_volume = StreamingSMA(window)
+        volume = StreamingSMA(window)
+        typical_price = (df['high'] + df['low'] + df['close']) / 3
+        price_volume.seed((typical_price * df['volume']).tolist())
+        volume.seed(df['volume'].tolist())
+        price = df['close'].iloc[-1]
+        
         while True:
             try:
-                df = self.get_historical_data()
-                df = self.generate_signals(df)
+                for bar, is_new in feed.poll():
+                    price = bar['close']
+                    bar_price_volume = (bar['high'] + bar['low'] + bar['close']) / 3 * bar['volume']
+                    if is_new:
+                        price_volume.update(bar_price_volume)
+                        volume.update(bar['volume'])
+                    else:
+                        price_volume.amend(bar_price_volume)
+                        volume.amend(bar['volume'])
+                current_vwap = price_volume.total / volume.total if volume.total else np.nan
                 
-                current_position = df['Position'].iloc[-1]
+                current_position = 1 if price > current_vwap else -1 if price < current_vwap else 0
                 print(f"Current Position Signal: {current_position}")
-                print(f"Current Price: {df['close'].iloc[-1]}")
-                print(f"Current VWAP: {df['VWAP'].iloc[-1]}")
+                print(f"Current Price: {price}")
+                print(f"Current VWAP: {current_vwap}")
                 
                 time.sleep(60)  # Check every minute
                 
@@ -0,0 +1,231 @@
+"""
+Concurrent, rate-limit-aware bulk kline backfill.
+
+Many (symbol, interval, range) jobs are split into 1000-candle pages and
+fetched by a thread pool that shares one token-bucket limiter sized to the
+exchange's request-weight budget. Finished pages are buffered per (symbol,
+interval) and merged into a HistoricalDataManager every `flush_pages` pages
+(and at the end), so the store rewrites each series or month partition a
+handful of times instead of once per page. Pages are marked covered in the
+manifest only once flushed; the manifest doubles as the checkpoint, so
+re-running an interrupted backfill only fetches pages that are still missing.
+
+base_url can point at a local stand-in HTTP server for testing.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Tuple
+import pandas as pd
+import requests
+from binance.helpers import interval_to_milliseconds
+from .historical_data import klines_to_dataframe, to_milliseconds
+
+logger = logging.getLogger(__name__)
+
+SPOT_BASE_URL = 'https://api.binance.com'
+SPOT_KLINES_PATH = '/api/v3/klines'
+SPOT_WEIGHT_LIMIT = 6000  # request weight per minute
+SPOT_KLINES_WEIGHT = 2
+
+FUTURES_BASE_URL = 'https://fapi.binance.com'
+FUTURES_KLINES_PATH = '/fapi/v1/klines'
+FUTURES_WEIGHT_LIMIT = 2400
+FUTURES_KLINES_WEIGHT = 5  # for limit=1000
+
+PAGE_LIMIT = 1000
+DEFAULT_FLUSH_PAGES = 50  # ~35 days of 1m candles per store write
+
+# (symbol, interval, start, end); start/end accept anything to_milliseconds does
+Job = Tuple[str, str, object, object]
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `capacity` per `period`
+    seconds. The used weight reported by the exchange and Retry-After pauses
+    are folded in so all workers back off together.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, weight: float = 1) -> None:
+        """Block until `weight` tokens are available, then take them"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait_time = self.paused_until - now
+                if wait_time <= 0:
+                    if self.tokens >= weight:
+                        self.tokens -= weight
+                        return
+                    wait_time = (weight - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+    def observe_used_weight(self, used: float) -> None:
+        """Never assume more budget than the exchange says is left"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, self.capacity - used)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.paused_until = max(self.paused_until, now + seconds)
+            self.tokens = 0
+            self.updated = now
+
+
+class BulkKlineDownloader:
+    def __init__(self, store, base_url: str = SPOT_BASE_URL, klines_path: str = SPOT_KLINES_PATH,
+                 weight_limit: float = SPOT_WEIGHT_LIMIT, request_weight: float = SPOT_KLINES_WEIGHT,
+                 workers: int = 8, max_retries: int = 5, timeout: float = 10.0,
+                 flush_pages: int = DEFAULT_FLUSH_PAGES):
+        """
+        Args:
+            store: HistoricalDataManager that receives the candles and tracks coverage
+            base_url: REST root, e.g. SPOT_BASE_URL, FUTURES_BASE_URL or a local test server
+            weight_limit: Request weight allowed per minute
+            request_weight: Weight of one klines request with limit=1000
+            workers: Concurrent requests in flight
+            flush_pages: Finished pages buffered per (symbol, interval) before a store write
+        """
+        self.store = store
+        self.url = base_url.rstrip('/') + klines_path
+        self.limiter = TokenBucket(weight_limit)
+        self.request_weight = request_weight
+        self.workers = workers
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.flush_pages = flush_pages
+        self._local = threading.local()
+
+    def _session(self):
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def plan(self, jobs: Iterable[Job]) -> List[Tuple[str, str, int, int]]:
+        """
+        Split jobs into pages of missing, closed candles
+
+        Ranges already covered in the store are skipped, which is what lets an
+        interrupted backfill resume.
+        """
+        pages = []
+        now = int(time.time() * 1000)
+        for symbol, interval, start, end in jobs:
+            step = interval_to_milliseconds(interval)
+            current_open = now // step * step
+            end = min(to_milliseconds(end), current_open)
+            for gap_start, gap_end in self.store.missing_ranges(symbol, interval, start, end):
+                for page_start in range(gap_start, gap_end, step * PAGE_LIMIT):
+                    pages.append((symbol, interval, page_start,
+                                  min(page_start + step * PAGE_LIMIT, gap_end)))
+        return pages
+
+    def fetch_page(self, symbol: str, interval: str, start: int, end: int) -> list:
+        """Fetch raw klines with open time in [start, end), retrying with backoff"""
+        params = {'symbol': symbol, 'interval': interval, 'startTime': start,
+                  'endTime': end - 1, 'limit': PAGE_LIMIT}
+        for attempt in range(self.max_retries):
+            self.limiter.acquire(self.request_weight)
+            try:
+                response = self._session().get(self.url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                logger.warning(f"{symbol} {interval} request failed ({e}), retrying")
+                time.sleep(min(2 ** attempt, 30))
+                continue
+
+            used = response.headers.get('X-MBX-USED-WEIGHT-1M') or response.headers.get('X-MBX-USED-WEIGHT-1m')
+            if used is not None:
+                self.limiter.observe_used_weight(float(used))
+
+            if response.status_code in (418, 429):
+                retry_after = float(response.headers.get('Retry-After', 60))
+                logger.warning(f"Rate limited (HTTP {response.status_code}), pausing {retry_after:.0f}s")
+                self.limiter.pause(retry_after)
+                continue
+            if response.status_code >= 500:
+                time.sleep(min(2 ** attempt, 30))
+                continue
+            response.raise_for_status()
+            return response.json()
+
+        raise RuntimeError(f"Giving up on {symbol} {interval} {start}-{end} after {self.max_retries} attempts")
+
+    def _flush(self, key: Tuple[str, str], buffered: List[tuple], summary: dict) -> None:
+        """Write a series' buffered pages to the store and mark them covered"""
+        symbol, interval = key
+        frames = [df for df, _, _ in buffered]
+        try:
+            self.store.merge_pages(symbol, interval, pd.concat(frames, ignore_index=True),
+                                   [[start, end] for _, start, end in buffered])
+            summary['completed'] += len(buffered)
+            summary['candles'] += sum(len(df) for df in frames)
+        except Exception as e:
+            logger.error(f"Failed to store {len(buffered)} {symbol} {interval} pages: {e}")
+            summary['failed'] += len(buffered)
+        summary['flushes'] += 1
+
+    def run(self, jobs: Iterable[Job]) -> dict:
+        """
+        Backfill every job and return a summary
+
+        Finished pages are buffered and flushed to the store from this thread;
+        failed pages stay uncovered and are picked up by the next run. Pages
+        still buffered when the run stops (even on an exception) are flushed
+        so their progress is kept.
+        """
+        pages = self.plan(jobs)
+        summary = {'pages': len(pages), 'completed': 0, 'failed': 0, 'candles': 0, 'flushes': 0}
+        logger.info(f"Backfilling {len(pages)} pages with {self.workers} workers")
+
+        buffers: Dict[Tuple[str, str], List[tuple]] = defaultdict(list)
+        remaining = iter(pages)
+        try:
+            with ThreadPoolExecutor(self.workers) as pool:
+                in_flight = {}
+
+                def submit_next():
+                    page = next(remaining, None)
+                    if page is not None:
+                        in_flight[pool.submit(self.fetch_page, *page)] = page
+
+                # Bound queued pages so huge backfills do not hold every result at once
+                for _ in range(self.workers * 2):
+                    submit_next()
+
+                while in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        symbol, interval, start, end = in_flight.pop(future)
+                        try:
+                            buffered = buffers[symbol, interval]
+                            buffered.append((klines_to_dataframe(future.result()), start, end))
+                            if len(buffered) >= self.flush_pages:
+                                self._flush((symbol, interval), buffers.pop((symbol, interval)), summary)
+                        except Exception as e:
+                            logger.error(f"Failed {symbol} {interval} page at {start}: {e}")
+                            summary['failed'] += 1
+                        submit_next()
+        finally:
+            for key, buffered in buffers.items():
+                if buffered:
+                    self._flush(key, buffered, summary)
+
+        return summary
@@ -0,0 +1,82 @@
+"""
+Delta-polling candle feed.
+
+Keeps a rolling in-memory kline window per symbol and asks the exchange only
+for bars at or after the newest open time it holds, instead of re-downloading
+days of history every cycle. poll() hands back just the bars that were
+appended or revised.
+"""
+
+from collections import deque
+from typing import List, Tuple
+import pandas as pd
+from .historical_data import klines_to_dataframe
+
+POLL_LIMIT = 1000
+
+
+def kline_to_bar(kline) -> dict:
+    """Raw Binance kline -> dict with epoch-ms timestamp and float OHLCV"""
+    return {
+        'timestamp': int(kline[0]),
+        'open': float(kline[1]),
+        'high': float(kline[2]),
+        'low': float(kline[3]),
+        'close': float(kline[4]),
+        'volume': float(kline[5]),
+        'close_time': int(kline[6]),
+    }
+
+
+class CandleFeed:
+    def __init__(self, client, symbol: str, interval: str, window: int = 1000):
+        """
+        Args:
+            client: python-binance Client
+            window: Maximum number of klines kept in memory
+        """
+        self.client = client
+        self.symbol = symbol
+        self.interval = interval
+        self.klines = deque(maxlen=window)
+
+    @property
+    def last_open_time(self):
+        return int(self.klines[-1][0]) if self.klines else None
+
+    def load(self, start_str) -> pd.DataFrame:
+        """Fill the window with history once, e.g. load("21 days ago UTC")"""
+        self.klines.clear()
+        self.klines.extend(self.client.get_historical_klines(self.symbol, self.interval, start_str))
+        return self.frame()
+
+    def frame(self) -> pd.DataFrame:
+        """The current window as a typed DataFrame (built on demand)"""
+        return klines_to_dataframe(list(self.klines))
+
+    def poll(self) -> List[Tuple[dict, bool]]:
+        """
+        Fetch bars at or after the newest held open time
+
+        Returns:
+            List of (bar, is_new) in time order; is_new is False when the bar
+            revises the newest held candle (the one still open)
+        """
+        updates = []
+        while True:
+            klines = self.client.get_klines(symbol=self.symbol, interval=self.interval,
+                                            startTime=self.last_open_time, limit=POLL_LIMIT)
+            for kline in klines:
+                open_time = int(kline[0])
+                last = self.last_open_time
+                if last is not None and open_time < last:
+                    continue
+                if last is not None and open_time == last:
+                    self.klines[-1] = kline
+                    updates.append((kline_to_bar(kline), False))
+                else:
+                    self.klines.append(kline)
+                    updates.append((kline_to_bar(kline), True))
+            # A full page means we were behind by more than one request
+            if len(klines) < POLL_LIMIT:
+                return updates
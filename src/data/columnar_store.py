@@ -0,0 +1,149 @@
+"""
+Columnar, memory-mapped candle storage.
+
+Candles are stored as one .npy file per column, partitioned by
+symbol/interval/month:
+
+    <root>/<symbol>/<interval>/<YYYY-MM>/<column>.npy
+
+Range reads memory-map only the partitions and columns they need and slice
+them by open time, so a read inside one month is zero-copy. Reads that span
+several months concatenate the slices.
+"""
+
+import os
+import shutil
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Timestamps are stored as epoch milliseconds
+COLUMN_DTYPES = {
+    'timestamp': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+    'close_time': np.int64,
+    'quote_asset_volume': np.float64,
+    'number_of_trades': np.int64,
+    'taker_buy_base_asset_volume': np.float64,
+    'taker_buy_quote_asset_volume': np.float64,
+}
+
+TIME_COLUMNS = ('timestamp', 'close_time')
+
+
+def _to_epoch_ms(series: pd.Series) -> np.ndarray:
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy().astype('datetime64[ms]').astype(np.int64)
+    return series.to_numpy(dtype=np.int64)
+
+
+def _month_key(epoch_ms: np.ndarray) -> np.ndarray:
+    return epoch_ms.astype('datetime64[ms]').astype('datetime64[M]').astype(str)
+
+
+class ColumnarCandleStore:
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _series_dir(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.root, symbol, interval)
+
+    def partitions(self, symbol: str, interval: str) -> List[str]:
+        """Stored months for a series, oldest first"""
+        series_dir = self._series_dir(symbol, interval)
+        if not os.path.isdir(series_dir):
+            return []
+        return sorted(name for name in os.listdir(series_dir)
+                      if os.path.exists(os.path.join(series_dir, name, 'timestamp.npy')))
+
+    def _load_partition(self, symbol, interval, month, columns, mmap_mode='r'):
+        partition_dir = os.path.join(self._series_dir(symbol, interval), month)
+        return {column: np.load(os.path.join(partition_dir, f"{column}.npy"), mmap_mode=mmap_mode)
+                for column in columns}
+
+    def write(self, symbol: str, interval: str, df: pd.DataFrame) -> None:
+        """
+        Merge candles into their monthly partitions.
+
+        Rows with an open time already stored replace the stored row. Each
+        partition is rewritten into a temporary directory and swapped in, so
+        readers never see a half-written month.
+        """
+        if df is None or df.empty:
+            return
+        incoming = {column: (_to_epoch_ms(df[column]) if column in TIME_COLUMNS
+                             else df[column].to_numpy(dtype=dtype))
+                    for column, dtype in COLUMN_DTYPES.items()}
+        months = _month_key(incoming['timestamp'])
+
+        for month in np.unique(months):
+            mask = months == month
+            data = {column: values[mask] for column, values in incoming.items()}
+            partition_dir = os.path.join(self._series_dir(symbol, interval), month)
+
+            if os.path.exists(os.path.join(partition_dir, 'timestamp.npy')):
+                existing = self._load_partition(symbol, interval, month, COLUMN_DTYPES, mmap_mode=None)
+                data = {column: np.concatenate([existing[column], data[column]]) for column in data}
+
+            # Keep the last occurrence of each open time, sorted
+            reversed_ts = data['timestamp'][::-1]
+            _, first_in_reversed = np.unique(reversed_ts, return_index=True)
+            keep = len(reversed_ts) - 1 - first_in_reversed
+            data = {column: values[keep] for column, values in data.items()}
+
+            tmp_dir = f"{partition_dir}.tmp"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            for column, values in data.items():
+                np.save(os.path.join(tmp_dir, f"{column}.npy"),
+                        np.ascontiguousarray(values, dtype=COLUMN_DTYPES[column]))
+            old_dir = f"{partition_dir}.old"
+            if os.path.exists(partition_dir):
+                os.replace(partition_dir, old_dir)
+            os.replace(tmp_dir, partition_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+
+    def read(self, symbol: str, interval: str, start: Optional[int] = None,
+             end: Optional[int] = None, columns: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Read candles with open time in [start, end) as column arrays
+
+        Only partitions overlapping the range and the requested columns are
+        opened. Arrays from a single partition are read-only memmap views.
+        """
+        columns = list(columns or COLUMN_DTYPES)
+        wanted = ['timestamp'] + [column for column in columns if column != 'timestamp']
+        start_month = _month_key(np.array([start]))[0] if start is not None else None
+        end_month = _month_key(np.array([end - 1]))[0] if end is not None else None
+
+        pieces = []
+        for month in self.partitions(symbol, interval):
+            if (start_month and month < start_month) or (end_month and month > end_month):
+                continue
+            data = self._load_partition(symbol, interval, month, wanted)
+            timestamps = data['timestamp']
+            lo = np.searchsorted(timestamps, start) if start is not None else 0
+            hi = np.searchsorted(timestamps, end) if end is not None else len(timestamps)
+            if hi > lo:
+                pieces.append({column: data[column][lo:hi] for column in columns})
+
+        if not pieces:
+            return {column: np.empty(0, dtype=COLUMN_DTYPES[column]) for column in columns}
+        if len(pieces) == 1:
+            return pieces[0]
+        return {column: np.concatenate([piece[column] for piece in pieces]) for column in columns}
+
+    def read_frame(self, symbol: str, interval: str, start: Optional[int] = None,
+                   end: Optional[int] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """read() as a DataFrame with datetime timestamp/close_time columns"""
+        data = self.read(symbol, interval, start, end, columns)
+        df = pd.DataFrame(data)
+        for column in TIME_COLUMNS:
+            if column in df:
+                df[column] = pd.to_datetime(df[column], unit='ms')
+        return df
@@ -1,53 +1,281 @@
 # Moving content from historical-data-source.py
 from binance.client import Client
+from binance.helpers import date_to_milliseconds, interval_to_milliseconds
 import pandas as pd
 from datetime import datetime, timedelta
+import glob
+import json
 import os
+import time
+from .columnar_store import ColumnarCandleStore
+from .resampler import bucket_start, resample_ohlcv
+
+KLINE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume',
+                 'close_time', 'quote_asset_volume', 'number_of_trades',
+                 'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore']
+
+NUMERIC_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'quote_asset_volume',
+                   'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume']
+
+
+def klines_to_dataframe(klines):
+    """Convert raw Binance klines to a typed DataFrame"""
+    df = pd.DataFrame(klines, columns=KLINE_COLUMNS)
+
+    # Convert timestamp columns
+    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
+
+    # Convert numeric columns
+    df[NUMERIC_COLUMNS] = df[NUMERIC_COLUMNS].apply(pd.to_numeric)
+    return df
+
+
+def to_milliseconds(value):
+    """Accept epoch ms, datetimes or Binance date strings ("1 Jan, 2024", "30 days ago UTC")"""
+    if value is None:
+        return int(time.time() * 1000)
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        return int(pd.Timestamp(value).timestamp() * 1000)
+    return date_to_milliseconds(value)
+
+
+def merge_ranges(ranges):
+    """Merge overlapping or touching [start, end) ranges"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def find_gaps(covered, start, end):
+    """Parts of [start, end) not inside any covered range"""
+    gaps = []
+    cursor = start
+    for covered_start, covered_end in covered:
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            gaps.append([cursor, covered_start])
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        gaps.append([cursor, end])
+    return gaps
+
 
 class HistoricalDataManager:
-    def __init__(self, api_key, api_secret, base_path='data/historical'):
-        self.client = Client(api_key, api_secret)
+    """
+    Local kline store that only downloads what it does not already hold.
+
+    A coverage manifest records which open-time ranges are complete for each
+    (storage format, symbol, interval). Requests fully inside covered ranges
+    are answered from disk; otherwise only the gaps are fetched and merged in.
+    Both formats share one base_path and manifest, so coverage is kept per
+    format: data held as CSV does not count as covered for the columnar store.
+
+    storage_format='columnar' (default) keeps candles as memory-mapped
+    per-column .npy files partitioned by month (see ColumnarCandleStore);
+    storage_format='csv' keeps one deduplicated CSV per (symbol, interval).
+    migrate_csv_to_columnar() converts existing CSV data.
+    """
+
+    def __init__(self, api_key, api_secret, base_path='data/historical',
+                 storage_format='columnar', client=None):
+        if storage_format not in ('columnar', 'csv'):
+            raise ValueError(f"Unknown storage format: {storage_format}")
+        self.client = client or Client(api_key, api_secret)
         self.base_path = base_path
+        self.storage_format = storage_format
+        self.manifest_path = os.path.join(base_path, 'coverage.json')
         os.makedirs(base_path, exist_ok=True)
-        
-    def fetch_historical_data(self, symbol, interval, start_date, end_date=None):
-        """
-        Fetch historical data from Binance and save to CSV
-        """
-        klines = self.client.get_historical_klines(
-            symbol, 
-            interval,
-            start_date,
-            end_date
-        )
-        
-        df = pd.DataFrame(klines, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume',
-                                         'close_time', 'quote_asset_volume', 'number_of_trades',
-                                         'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume', 'ignore'])
-        
-        # Convert timestamp columns
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df['close_time'] = pd.to_datetime(df['close_time'], unit='ms')
-        
-        # Convert numeric columns
-        numeric_cols = ['open', 'high', 'low', 'close', 'volume', 'quote_asset_volume',
-                       'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume']
-        df[numeric_cols] = df[numeric_cols].apply(pd.to_numeric)
-        
-        # Save to CSV
-        filename = f"{symbol}_{interval}_{start_date.replace(' ', '_')}.csv"
-        filepath = os.path.join(self.base_path, filename)
-        df.to_csv(filepath, index=False)
-        
-        return df
-    
-    def load_historical_data(self, symbol, interval, start_date):
-        """
-        Load historical data from CSV if it exists
-        """
-        filename = f"{symbol}_{interval}_{start_date.replace(' ', '_')}.csv"
-        filepath = os.path.join(self.base_path, filename)
-        
+        self.columnar = ColumnarCandleStore(os.path.join(base_path, 'columnar'))
+        self.coverage = self._load_manifest()
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        return {}
+
+    def _save_manifest(self):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.coverage, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    @staticmethod
+    def _store_key(symbol, interval):
+        return f"{symbol}_{interval}"
+
+    def _coverage_key(self, symbol, interval, storage_format=None):
+        return f"{storage_format or self.storage_format}:{self._store_key(symbol, interval)}"
+
+    def _store_path(self, symbol, interval):
+        return os.path.join(self.base_path, f"{self._store_key(symbol, interval)}.csv")
+
+    def _read_store(self, symbol, interval):
+        filepath = self._store_path(symbol, interval)
         if os.path.exists(filepath):
             return pd.read_csv(filepath, parse_dates=['timestamp', 'close_time'])
         return None
+
+    def _write_store(self, symbol, interval, df):
+        filepath = self._store_path(symbol, interval)
+        tmp_path = f"{filepath}.tmp"
+        df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, filepath)
+
+    def _requested_range(self, interval, start_date, end_date):
+        """Align a request to whole candles: [first open time, last open time + interval)"""
+        step = interval_to_milliseconds(interval)
+        start = to_milliseconds(start_date) // step * step
+        end = -(-to_milliseconds(end_date) // step) * step
+        return start, end, step
+
+    def missing_ranges(self, symbol, interval, start_date, end_date=None):
+        """Open-time ranges in the request that are not stored locally yet"""
+        start, end, _ = self._requested_range(interval, start_date, end_date)
+        covered = self.coverage.get(self._coverage_key(symbol, interval), [])
+        return find_gaps(covered, start, end)
+
+    def merge_into_store(self, symbol, interval, df, covered_start, covered_end):
+        """
+        Merge downloaded candles into the store and mark [covered_start,
+        covered_end) as complete. Duplicate open times keep the newest row.
+        """
+        self.merge_pages(symbol, interval, df, [[covered_start, covered_end]])
+
+    def merge_pages(self, symbol, interval, df, covered):
+        """
+        Merge candles from several downloads with one store write, then mark
+        every [start, end) in `covered` complete with one manifest save
+        """
+        if self.storage_format == 'columnar':
+            self.columnar.write(symbol, interval, df)
+        else:
+            existing = self._read_store(symbol, interval)
+            if existing is not None and not existing.empty:
+                df = pd.concat([existing, df], ignore_index=True)
+            df = (df.drop_duplicates(subset='timestamp', keep='last')
+                    .sort_values('timestamp')
+                    .reset_index(drop=True))
+            self._write_store(symbol, interval, df)
+
+        covered = [[start, end] for start, end in covered if end > start]
+        if covered:
+            key = self._coverage_key(symbol, interval)
+            self.coverage[key] = merge_ranges(self.coverage.get(key, []) + covered)
+            self._save_manifest()
+
+    def _read_range(self, symbol, interval, start, end, columns=None):
+        if self.storage_format == 'columnar':
+            return self.columnar.read_frame(symbol, interval, start, end, columns)
+        df = self._read_store(symbol, interval)
+        if df is None:
+            return klines_to_dataframe([])
+        start_ts = pd.to_datetime(start, unit='ms')
+        end_ts = pd.to_datetime(end, unit='ms')
+        mask = (df['timestamp'] >= start_ts) & (df['timestamp'] < end_ts)
+        df = df.loc[mask].reset_index(drop=True)
+        return df[columns] if columns else df
+
+    def read_columns(self, symbol, interval, start_date, end_date=None, columns=None):
+        """
+        Zero-copy column arrays for a stored range (columnar storage only)
+
+        Returns a dict of memory-mapped NumPy arrays with epoch-ms timestamps;
+        nothing is downloaded.
+        """
+        start, end, _ = self._requested_range(interval, start_date, end_date)
+        return self.columnar.read(symbol, interval, start, end, columns)
+
+    def fetch_historical_data(self, symbol, interval, start_date, end_date=None):
+        """
+        Return klines for the requested range, downloading only missing ranges
+
+        start_date/end_date accept Binance date strings, datetimes or epoch ms.
+        The still-open candle is returned but never marked as covered, so it
+        is refreshed on the next call.
+        """
+        start, end, step = self._requested_range(interval, start_date, end_date)
+        current_open = int(time.time() * 1000) // step * step
+
+        for gap_start, gap_end in self.missing_ranges(symbol, interval, start, end):
+            klines = self.client.get_historical_klines(symbol, interval, gap_start, gap_end - 1)
+            self.merge_into_store(symbol, interval, klines_to_dataframe(klines),
+                                  gap_start, min(gap_end, current_open))
+
+        return self._read_range(symbol, interval, start, end)
+
+    def fetch_resampled_data(self, symbol, interval, start_date, end_date=None, base_interval='1m'):
+        """
+        Build `interval` candles locally from stored `base_interval` candles
+
+        Only the base interval is ever requested from the exchange; the range
+        is widened to whole `interval` candles before fetching.
+        """
+        start = int(bucket_start([to_milliseconds(start_date)], interval)[0])
+        base = self.fetch_historical_data(symbol, base_interval, start, end_date)
+        return resample_ohlcv(base, interval, base_interval)
+
+    def load_historical_data(self, symbol, interval, start_date, end_date=None, columns=None):
+        """
+        Load historical data from the local store if the range is covered
+
+        The still-open candle is not required for the range to count as covered.
+        """
+        start, end, step = self._requested_range(interval, start_date, end_date)
+        current_open = int(time.time() * 1000) // step * step
+        if self.missing_ranges(symbol, interval, start, min(end, current_open)):
+            return None
+        return self._read_range(symbol, interval, start, end, columns)
+
+    def migrate_csv_to_columnar(self, remove_csv=False):
+        """
+        Convert CSV data under base_path into the columnar store
+
+        Handles both the per-series store files and the older
+        {symbol}_{interval}_{start_date}.csv downloads. A store file's CSV
+        coverage carries over to the columnar store. Older downloads were
+        complete when written, so their span (minus the last, possibly open,
+        candle) is added to the columnar coverage.
+
+        Returns:
+            List of migrated CSV paths
+        """
+        migrated = []
+        for filepath in sorted(glob.glob(os.path.join(self.base_path, '*.csv'))):
+            parts = os.path.basename(filepath)[:-len('.csv')].split('_')
+            if len(parts) < 2:
+                continue
+            symbol, interval = parts[0], parts[1]
+            df = pd.read_csv(filepath, parse_dates=['timestamp', 'close_time'])
+            if df.empty:
+                continue
+            self.columnar.write(symbol, interval, df)
+
+            key = self._coverage_key(symbol, interval, 'columnar')
+            if len(parts) > 2:
+                first_open = int(df['timestamp'].min().timestamp() * 1000)
+                last_open = int(df['timestamp'].max().timestamp() * 1000)
+                covered = [[first_open, last_open]]
+            else:
+                covered = self.coverage.get(self._coverage_key(symbol, interval, 'csv'), [])
+            self.coverage[key] = merge_ranges(self.coverage.get(key, []) + covered)
+            migrated.append(filepath)
+            if remove_csv and len(parts) == 2:
+                # The CSV store is going away, and its coverage with it
+                self.coverage.pop(self._coverage_key(symbol, interval, 'csv'), None)
+
+        self._save_manifest()
+        if remove_csv:
+            for filepath in migrated:
+                os.remove(filepath)
+        return migrated
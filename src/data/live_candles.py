@@ -0,0 +1,182 @@
+"""
+Live OHLCV candles built from aggTrade streams.
+
+LiveCandleBuilder folds trades into bars for any set of intervals and
+notifies subscribers with partial (still-open) and closed bars, so bots no
+longer need to poll REST klines. A bar closes when a trade for a later bar
+arrives or when flush() is called after its close time.
+
+Trades can be missed (reconnects, dropped frames), so each closed bar is
+queued for reconciliation: reconcile_loop() fetches the exchange's kline a
+few seconds after the close and, if it differs, replaces the bar and
+notifies subscribers again with revised=True.
+
+Intervals with no trades produce no bar.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict, deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from .resampler import bucket_end, bucket_start
+from ..streaming.fast_decode import peek_symbol, peek_trade
+
+logger = logging.getLogger(__name__)
+
+OHLCV_FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+
+def normalize_symbol(symbol: str) -> str:
+    """'BTC/USDT' or 'btcusdt' -> 'BTCUSDT'"""
+    return symbol.replace('/', '').upper()
+
+
+def bar_to_ohlcv(bar: dict) -> list:
+    """Bar dict -> [timestamp, open, high, low, close, volume] (the ccxt row format)"""
+    return [bar['timestamp'], bar['open'], bar['high'], bar['low'], bar['close'], bar['volume']]
+
+
+class LiveCandleBuilder:
+    """
+    Example:
+        builder = LiveCandleBuilder(['1m', '1h'])
+        builder.subscribe(on_candle, symbol='BTCUSDT', interval='1m')
+        stream.subscribe_raw('btcusdt@aggTrade', builder.raw_handler)
+
+    Subscribers are called as callback(bar, closed) where bar is a dict with
+    symbol, interval, timestamp (open time, epoch ms), close_time, OHLCV,
+    quote_volume, trades and revised.
+    """
+
+    def __init__(self, intervals: Iterable[str], emit_partial: bool = True, reconcile_delay: float = 2.0):
+        """
+        Args:
+            intervals: Kline intervals to build, e.g. ['1m', '5m', '1h']
+            emit_partial: Notify subscribers on every trade, not only on close
+            reconcile_delay: Seconds after a close before the REST kline is checked
+        """
+        self.intervals = list(intervals)
+        self.emit_partial = emit_partial
+        self.reconcile_delay = reconcile_delay
+        self.bars: Dict[Tuple[str, str], dict] = {}
+        self.subscribers: Dict[Tuple[Optional[str], Optional[str]], List[Callable]] = defaultdict(list)
+        self.closed_through: Dict[Tuple[str, str], int] = {}
+        self.pending_reconcile = deque()
+        self.trades = 0
+        self.late_trades = 0
+        self.revisions = 0
+
+    def subscribe(self, callback: Callable, symbol: Optional[str] = None, interval: Optional[str] = None) -> None:
+        """Call callback(bar, closed) for one symbol/interval, or all when None"""
+        key = (normalize_symbol(symbol) if symbol else None, interval)
+        self.subscribers[key].append(callback)
+
+    def _emit(self, bar: dict, closed: bool) -> None:
+        for key in ((bar['symbol'], bar['interval']), (bar['symbol'], None),
+                    (None, bar['interval']), (None, None)):
+            for callback in self.subscribers.get(key, ()):
+                try:
+                    callback(bar, closed)
+                except Exception as e:
+                    logger.error(f"Candle subscriber failed on {bar['symbol']} {bar['interval']}: {e}")
+
+    def _new_bar(self, symbol, interval, timestamp, price, quantity):
+        start = int(bucket_start(np.array([timestamp]), interval)[0])
+        end = int(bucket_end(np.array([start]), interval)[0])
+        return {'symbol': symbol, 'interval': interval, 'timestamp': start, 'close_time': end - 1,
+                'open': price, 'high': price, 'low': price, 'close': price, 'volume': quantity,
+                'quote_volume': price * quantity, 'trades': 1, 'revised': False}
+
+    def _close(self, bar: dict) -> None:
+        self.closed_through[(bar['symbol'], bar['interval'])] = bar['close_time']
+        self._emit(bar, True)
+        self.pending_reconcile.append(bar)
+
+    def add_trade(self, symbol: str, timestamp: int, price: float, quantity: float) -> None:
+        """Fold one trade (timestamp in epoch ms) into every interval"""
+        symbol = normalize_symbol(symbol)
+        self.trades += 1
+        for interval in self.intervals:
+            key = (symbol, interval)
+            bar = self.bars.get(key)
+            if bar is not None and timestamp <= bar['close_time']:
+                if timestamp < bar['timestamp']:
+                    # Belongs to a bar that has already closed; reconciliation picks it up
+                    self.late_trades += 1
+                    continue
+                if price > bar['high']:
+                    bar['high'] = price
+                elif price < bar['low']:
+                    bar['low'] = price
+                bar['close'] = price
+                bar['volume'] += quantity
+                bar['quote_volume'] += price * quantity
+                bar['trades'] += 1
+            else:
+                if timestamp <= self.closed_through.get(key, -1):
+                    self.late_trades += 1
+                    continue
+                if bar is not None:
+                    self._close(bar)
+                bar = self.bars[key] = self._new_bar(symbol, interval, timestamp, price, quantity)
+            if self.emit_partial:
+                self._emit(bar, False)
+
+    def raw_handler(self, message) -> None:
+        """CombinedStream.subscribe_raw handler for aggTrade/trade frames"""
+        trade = peek_trade(message)
+        if trade is not None and trade[3] is not None:
+            price, quantity, _, trade_time = trade
+            self.add_trade(peek_symbol(message), trade_time, price, quantity)
+
+    def flush(self, now: Optional[int] = None) -> None:
+        """Close every bar whose close time is before `now` (epoch ms)"""
+        now = int(time.time() * 1000) if now is None else now
+        for key, bar in list(self.bars.items()):
+            if bar['close_time'] < now:
+                del self.bars[key]
+                self._close(bar)
+
+    def apply_kline(self, bar: dict, kline: Optional[list]) -> bool:
+        """
+        Compare a closed bar with the exchange kline ([timestamp, o, h, l, c, v, ...])
+
+        Replaces the bar's OHLCV and re-notifies subscribers when they differ.
+        Returns True if the bar was revised.
+        """
+        if not kline or int(kline[0]) != bar['timestamp']:
+            return False
+        rest = dict(zip(OHLCV_FIELDS, (float(value) for value in kline[1:6])))
+        if all(abs(bar[field] - rest[field]) <= 1e-9 * max(1.0, abs(rest[field])) for field in OHLCV_FIELDS):
+            return False
+        bar.update(rest)
+        bar['revised'] = True
+        self.revisions += 1
+        self._emit(bar, True)
+        return True
+
+    async def reconcile_loop(self, fetch_kline: Callable, period: float = 1.0) -> None:
+        """
+        Flush idle bars and reconcile closed ones with REST, forever
+
+        fetch_kline(symbol, interval, open_time) is a blocking call returning
+        one kline row or None; it runs in a worker thread so the event loop
+        keeps processing trades.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(period)
+            now = int(time.time() * 1000)
+            self.flush(now)
+            while self.pending_reconcile and \
+                    self.pending_reconcile[0]['close_time'] + self.reconcile_delay * 1000 <= now:
+                bar = self.pending_reconcile.popleft()
+                try:
+                    kline = await loop.run_in_executor(None, fetch_kline, bar['symbol'],
+                                                       bar['interval'], bar['timestamp'])
+                except Exception as e:
+                    logger.error(f"Reconcile failed for {bar['symbol']} {bar['interval']}: {e}")
+                    continue
+                self.apply_kline(bar, kline)
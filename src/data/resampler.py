@@ -0,0 +1,157 @@
+"""
+In-process OHLCV resampling.
+
+Builds higher timeframes (5m, 1h, 4h, 1d, 1w, 1M, ...) from stored 1m candles
+so only one base-interval feed per symbol has to come from the exchange.
+Whole histories are aggregated with np.*.reduceat over sorted timestamps;
+CandleResampler rolls bars up incrementally as new base candles arrive.
+"""
+
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from binance.helpers import interval_to_milliseconds
+
+# Binance weekly candles open on Monday; the epoch was a Thursday
+WEEK_OFFSET_MS = 4 * 24 * 60 * 60 * 1000
+
+SUM_COLUMNS = ('volume', 'quote_asset_volume', 'number_of_trades',
+               'taker_buy_base_asset_volume', 'taker_buy_quote_asset_volume')
+
+
+def bucket_start(timestamps: np.ndarray, interval: str) -> np.ndarray:
+    """Open time (epoch ms) of the `interval` candle each timestamp falls in"""
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if interval == '1M':
+        months = timestamps.astype('datetime64[ms]').astype('datetime64[M]')
+        return months.astype('datetime64[ms]').astype(np.int64)
+    step = interval_to_milliseconds(interval)
+    offset = WEEK_OFFSET_MS if interval.endswith('w') else 0
+    return (timestamps - offset) // step * step + offset
+
+
+def bucket_end(starts: np.ndarray, interval: str) -> np.ndarray:
+    """Open time of the candle after each bucket"""
+    if interval == '1M':
+        months = starts.astype('datetime64[ms]').astype('datetime64[M]') + 1
+        return months.astype('datetime64[ms]').astype(np.int64)
+    return starts + interval_to_milliseconds(interval)
+
+
+def resample_arrays(columns: Dict[str, np.ndarray], interval: str,
+                    base_interval: str = '1m', drop_incomplete: bool = False) -> Dict[str, np.ndarray]:
+    """
+    Aggregate sorted base candles (epoch-ms 'timestamp' plus OHLCV arrays)
+
+    open/close take the first/last base candle of each bucket, high/low the
+    max/min, and volume-like columns are summed. With drop_incomplete the
+    last bucket is dropped when the base data ends before it closes.
+    """
+    timestamps = np.asarray(columns['timestamp'], dtype=np.int64)
+    if len(timestamps) == 0:
+        return {name: np.asarray(values)[:0] for name, values in columns.items()}
+
+    buckets = bucket_start(timestamps, interval)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.concatenate((starts[1:], [len(timestamps)])) - 1
+
+    result = {'timestamp': buckets[starts]}
+    if 'open' in columns:
+        result['open'] = np.asarray(columns['open'])[starts]
+    if 'high' in columns:
+        result['high'] = np.maximum.reduceat(np.asarray(columns['high']), starts)
+    if 'low' in columns:
+        result['low'] = np.minimum.reduceat(np.asarray(columns['low']), starts)
+    if 'close' in columns:
+        result['close'] = np.asarray(columns['close'])[ends]
+    for name in SUM_COLUMNS:
+        if name in columns:
+            result[name] = np.add.reduceat(np.asarray(columns[name]), starts)
+    if 'close_time' in columns:
+        result['close_time'] = bucket_end(result['timestamp'], interval) - 1
+
+    if drop_incomplete:
+        base_end = timestamps[-1] + interval_to_milliseconds(base_interval)
+        if bucket_end(result['timestamp'][-1:], interval)[0] > base_end:
+            result = {name: values[:-1] for name, values in result.items()}
+    return result
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str, base_interval: str = '1m',
+                   drop_incomplete: bool = False) -> pd.DataFrame:
+    """
+    Resample an OHLCV DataFrame (datetime or epoch-ms 'timestamp') to `interval`
+
+    The input must be sorted by timestamp; timestamp columns come back in the
+    same representation they went in.
+    """
+    datetime_columns = [name for name in ('timestamp', 'close_time')
+                        if name in df and pd.api.types.is_datetime64_any_dtype(df[name])]
+    columns = {}
+    for name in ('timestamp', 'open', 'high', 'low', 'close', 'close_time') + SUM_COLUMNS:
+        if name in df:
+            values = df[name].to_numpy()
+            if name in datetime_columns:
+                values = values.astype('datetime64[ms]').astype(np.int64)
+            columns[name] = values
+
+    result = pd.DataFrame(resample_arrays(columns, interval, base_interval, drop_incomplete))
+    for name in datetime_columns:
+        result[name] = pd.to_datetime(result[name], unit='ms')
+    return result
+
+
+class CandleResampler:
+    """
+    Incremental roll-up of base candles into one higher timeframe.
+
+    update() takes each base candle as a dict (timestamp in epoch ms plus any
+    of open/high/low/close and the volume columns). Sending the same base
+    timestamp again revises that candle, so still-open 1m bars can be fed
+    repeatedly. Returns (partial_bar, closed_bar); closed_bar is the
+    previous higher-timeframe candle when this update starts a new one.
+    """
+
+    def __init__(self, interval: str):
+        self.interval = interval
+        self.bucket = None
+        self._prefix = None   # aggregate of earlier base candles in the bucket
+        self._last = None     # latest base candle, kept separate so it can be revised
+
+    @staticmethod
+    def _combine(first: Optional[dict], second: dict) -> dict:
+        if first is None:
+            return dict(second)
+        combined = dict(first)
+        combined['high'] = max(first['high'], second['high'])
+        combined['low'] = min(first['low'], second['low'])
+        combined['close'] = second['close']
+        for name in SUM_COLUMNS:
+            if name in second:
+                combined[name] = first.get(name, 0) + second[name]
+        return combined
+
+    @property
+    def partial(self) -> Optional[dict]:
+        if self._last is None:
+            return None
+        bar = self._combine(self._prefix, self._last)
+        bar['timestamp'] = self.bucket
+        bar['close_time'] = int(bucket_end(np.array([self.bucket]), self.interval)[0]) - 1
+        return bar
+
+    def update(self, candle: dict) -> Tuple[dict, Optional[dict]]:
+        bucket = int(bucket_start(np.array([candle['timestamp']]), self.interval)[0])
+        closed = None
+
+        if self._last is not None and candle['timestamp'] < self._last['timestamp']:
+            raise ValueError("Candles must arrive in time order")
+        if self.bucket is not None and bucket > self.bucket:
+            closed = self.partial
+            self._prefix = self._last = None
+        self.bucket = bucket
+
+        if self._last is not None and candle['timestamp'] != self._last['timestamp']:
+            self._prefix = self._combine(self._prefix, self._last)
+        self._last = dict(candle)
+        return self.partial, closed
@@ -4,6 +4,7 @@ from typing import Dict, Optional
 from eth_account import Account
 import aiohttp
 from ..config import EXCHANGE_API_KEY, EXCHANGE_SECRET_KEY
+from ..streaming.order_book import HyperliquidBookStream
 
 class HyperLiquidExchange:
     """HyperLiquid DEX interface as specified in PRD section 3.1"""
@@ -14,6 +15,8 @@ class HyperLiquidExchange:
         self.account = Account.from_key(EXCHANGE_SECRET_KEY)
         self.session = None
         self.ws = None
+        self.books = HyperliquidBookStream(self.ws_url)
+        self._books_task = None
         
     async def connect(self):
         """Establish connections to REST and WebSocket APIs"""
@@ -22,11 +25,18 @@ class HyperLiquidExchange:
             lambda: self.ws_url,
             self.ws_url.replace('wss://', '')
         )
+        self._books_task = asyncio.create_task(self.books.run())
         
     async def get_orderbook(self, symbol: str) -> Dict:
         """
         Retrieve L2 order book data as specified in PRD 3.1.1
+        
+        Served from a local book kept current over the l2Book WebSocket once
+        it is in sync; REST is only used for the first request per symbol.
         """
+        book = self.books.add(symbol)
+        if book.synced:
+            return book.to_dict()
         async with self.session.get(f"{self.base_url}/orderbook/{symbol}") as response:
             return await response.json()
             
@@ -54,6 +64,8 @@ class HyperLiquidExchange:
         
     async def close(self):
         """Clean up connections"""
+        if self._books_task:
+            self._books_task.cancel()
         if self.session:
             await self.session.close()
         if self.ws:
@@ -1,11 +1,12 @@
 import asyncio
-import json
-import csv
 from datetime import datetime
 from typing import Optional
 import websockets
 from colorama import Fore, Style, init
 from ..config import BINANCE_MIN_LIQUIDATION_SIZE_USD
+from ..utils.batch_writer import batch_writer
+from ..streaming.combined_stream import FUTURES_STREAM_URL
+from ..streaming.fast_decode import loads, max_notional
 
 # Initialize colorama for cross-platform color support
 init()
@@ -16,7 +17,7 @@ class LiquidationMonitor:
     """
     
     def __init__(self, csv_path: str = "data/liquidations.csv"):
-        self.ws_url = "wss://fstream.binance.com/ws/!forceOrder@arr"
+        self.ws_url = f"{FUTURES_STREAM_URL}/ws/!forceOrder@arr"
         self.csv_path = csv_path
         self.running = False
         self.total_liquidations = 0
@@ -37,10 +38,16 @@ class LiquidationMonitor:
     async def handle_messages(self, websocket):
         """
         Process incoming messages as specified in PRD 3.2.2
+        
+        Frames whose largest price * quantity is below the threshold are
+        skipped without being decoded.
         """
         async for message in websocket:
-            data = json.loads(message)
-            for event in data.get('data', []):
+            if max_notional(message) < BINANCE_MIN_LIQUIDATION_SIZE_USD:
+                continue
+            data = loads(message)
+            events = data.get('data', data)
+            for event in (events if isinstance(events, list) else [events]):
                 if self.is_significant_liquidation(event):
                     await self.process_liquidation(event)
                     
@@ -76,20 +83,18 @@ class LiquidationMonitor:
     def log_liquidation(self, timestamp, symbol, side, size, price, size_usd):
         """
         Log liquidation data to CSV as specified in PRD 3.2.4
+        
+        Rows are queued to the shared batch writer so disk I/O never blocks
+        the receive loop.
         """
-        try:
-            with open(self.csv_path, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    timestamp.isoformat(),
-                    symbol,
-                    side,
-                    size,
-                    price,
-                    size_usd
-                ])
-        except Exception as e:
-            print(f"{Fore.RED}Error logging liquidation: {e}{Style.RESET_ALL}")
+        batch_writer.write_row(self.csv_path, [
+            timestamp.isoformat(),
+            symbol,
+            side,
+            size,
+            price,
+            size_usd
+        ])
             
     async def start(self):
         """Start monitoring"""
@@ -1,10 +1,13 @@
 import asyncio
 import json
-import csv
 from datetime import datetime
 from typing import List, Dict
 import websockets
 from colorama import Fore, Style, init
+from ..utils.batch_writer import batch_writer
+from ..streaming.combined_stream import FUTURES_STREAM_URL
+from ..streaming.fast_decode import loads, peek_symbol, peek_trade
+from ..analysis.order_flow import OrderFlowTracker
 
 # Initialize colorama for cross-platform color support
 init()
@@ -14,10 +17,19 @@ class TradeMonitor:
     Cryptocurrency recent trade monitor as specified in PRD section 3.3
     """
     
-    def __init__(self, symbols: List[str], csv_path: str = "data/trades.csv"):
+    def __init__(self, symbols: List[str], csv_path: str = "data/trades.csv",
+                 min_trade_size_usd: float = 0):
+        """
+        Args:
+            min_trade_size_usd: Trades below this notional are dropped before
+                the frame is decoded (0 keeps every trade)
+        """
         self.symbols = symbols
         self.csv_path = csv_path
-        self.ws_url = "wss://fstream.binance.com/ws"
+        self.min_trade_size_usd = min_trade_size_usd
+        # Rolling order-flow windows per symbol, e.g. order_flow.window('BTCUSDT', '1m')
+        self.order_flow = OrderFlowTracker()
+        self.ws_url = f"{FUTURES_STREAM_URL}/ws"
         self.running = False
         
     def get_subscribe_message(self) -> Dict:
@@ -48,7 +60,15 @@ class TradeMonitor:
         Process incoming trade messages
         """
         async for message in websocket:
-            data = json.loads(message)
+            trade = peek_trade(message)
+            if trade is None:
+                continue
+            # Every trade feeds the order-flow windows before the size filter
+            price, quantity, is_buyer_maker, trade_time = trade
+            self.order_flow.update(peek_symbol(message), trade_time, price, quantity, is_buyer_maker)
+            if self.min_trade_size_usd and price * quantity < self.min_trade_size_usd:
+                continue
+            data = loads(message)
             if 'e' in data and data['e'] == 'trade':
                 await self.process_trade(data)
                 
@@ -77,20 +97,18 @@ class TradeMonitor:
     def log_trade(self, timestamp, symbol, side, size, price, value_usd):
         """
         Log trade data to CSV as specified in PRD 3.3.4
+        
+        Rows are queued to the shared batch writer so disk I/O never blocks
+        the receive loop.
         """
-        try:
-            with open(self.csv_path, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    timestamp.isoformat(),
-                    symbol,
-                    side,
-                    size,
-                    price,
-                    value_usd
-                ])
-        except Exception as e:
-            print(f"{Fore.RED}Error logging trade: {e}{Style.RESET_ALL}")
+        batch_writer.write_row(self.csv_path, [
+            timestamp.isoformat(),
+            symbol,
+            side,
+            size,
+            price,
+            value_usd
+        ])
             
     async def start(self):
         """Start monitoring"""
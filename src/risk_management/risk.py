@@ -134,8 +134,7 @@ def kill_switch(symbol=symbol):
         kill_size = int(kill_size)
         
         # Get current market prices
-        ask = ask_bid(symbol)[0]
-        bid = ask_bid(symbol)[1]
+        ask, bid = ask_bid(symbol)
 
         # Place appropriate closing order based on position direction
         if long == False:
@@ -31,6 +31,11 @@ import pandas as pd
 import datetime 
 import schedule 
 import requests 
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+from src.streaming.order_book import hyperliquid_book
 
 symbol='WIF'  # Default trading symbol
 
@@ -38,12 +43,21 @@ def ask_bid(symbol):
     """
     Retrieves the current ask and bid prices from HyperLiquid's order book.
     
+    Prices come from a locally maintained book kept current over the l2Book
+    WebSocket; the REST endpoint is only used while that book is not in sync.
+    
     Args:
         symbol (str): Trading pair symbol
         
     Returns:
         tuple: (ask_price, bid_price, full_orderbook_data)
     """
+    book = hyperliquid_book(symbol)
+    top = book.ask_bid() if book is not None else None
+    if top is not None:
+        ask, bid = top
+        return ask, bid, book.levels
+
     url = 'https://api.hyperliquid.xyz/info'
     headers = {'Content-Type': 'application/json'}
 
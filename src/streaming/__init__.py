@@ -0,0 +1,31 @@
+from .combined_stream import (
+    CombinedStream,
+    chunk_streams,
+    FUTURES_STREAM_URL,
+    SPOT_STREAM_URL,
+    MAX_STREAMS_PER_CONNECTION,
+)
+from .pipeline import Pipeline, Stage, StageQueue, OVERFLOW_POLICIES
+from .order_book import L2Book, BinanceDepthBook, HyperliquidBook, HyperliquidBookStream
+from .sharded import ShardedStream, TradeEvents
+from .universe import fetch_perpetual_symbols, shard_symbols
+
+__all__ = [
+    'CombinedStream',
+    'chunk_streams',
+    'FUTURES_STREAM_URL',
+    'SPOT_STREAM_URL',
+    'MAX_STREAMS_PER_CONNECTION',
+    'Pipeline',
+    'Stage',
+    'StageQueue',
+    'OVERFLOW_POLICIES',
+    'L2Book',
+    'BinanceDepthBook',
+    'HyperliquidBook',
+    'HyperliquidBookStream',
+    'ShardedStream',
+    'TradeEvents',
+    'fetch_perpetual_symbols',
+    'shard_symbols',
+]
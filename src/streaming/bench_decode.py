@@ -0,0 +1,94 @@
+"""
+Decode throughput benchmark: full json.loads per frame vs filter-before-parse.
+
+Generates synthetic combined-stream aggTrade frames whose notional sizes
+follow a log-normal distribution (most trades are small, as on the live
+feed) and measures messages per second for both paths at a threshold.
+
+Usage:
+    python -m src.streaming.bench_decode --messages 500000 --threshold 14999
+"""
+
+import argparse
+import json
+import random
+import time
+from .fast_decode import JSON_BACKEND, loads, notional_above, stream_name
+
+SYMBOLS = {'btcusdt': 60000.0, 'ethusdt': 3000.0, 'solusdt': 150.0, 'dogeusdt': 0.15}
+
+
+def synthetic_frames(count: int, seed: int = 7):
+    """aggTrade frames as sent on /stream, with log-normal USD sizes (median ~$600)"""
+    rng = random.Random(seed)
+    symbols = list(SYMBOLS)
+    frames = []
+    event_time = 1_700_000_000_000
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        price = SYMBOLS[symbol] * (1 + rng.uniform(-0.001, 0.001))
+        quantity = rng.lognormvariate(6.4, 1.8) / price
+        event_time += rng.randint(0, 3)
+        data = {'e': 'aggTrade', 'E': event_time, 'a': 100000 + i, 's': symbol.upper(),
+                'p': f"{price:.2f}", 'q': f"{quantity:.6f}", 'f': 1, 'l': 1,
+                'T': event_time, 'm': rng.random() < 0.5}
+        frames.append(json.dumps({'stream': f"{symbol}@aggTrade", 'data': data}, separators=(',', ':')))
+    return frames
+
+
+def full_parse(frames, threshold):
+    """What the monitors did before: decode everything, then check size"""
+    passed = 0
+    for message in frames:
+        data = json.loads(message)['data']
+        price = float(data['p'])
+        quantity = float(data['q'])
+        int(data['T'])
+        data['m']
+        if price * quantity > threshold:
+            passed += 1
+    return passed
+
+
+def filter_then_parse(frames, threshold):
+    """Route and size-check from raw text; decode only frames that pass"""
+    prefilter = notional_above(threshold)
+    passed = 0
+    for message in frames:
+        stream_name(message)
+        if not prefilter(message):
+            continue
+        data = loads(message)['data']
+        float(data['p'])
+        float(data['q'])
+        passed += 1
+    return passed
+
+
+def run(messages: int, threshold: float) -> dict:
+    frames = synthetic_frames(messages)
+    results = {}
+    for name, func in (('full_parse', full_parse), ('filter_then_parse', filter_then_parse)):
+        start = time.perf_counter()
+        passed = func(frames, threshold)
+        elapsed = time.perf_counter() - start
+        results[name] = {'msgs_per_sec': messages / elapsed, 'passed': passed}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=500_000)
+    parser.add_argument('--threshold', type=float, default=14999)
+    args = parser.parse_args()
+
+    results = run(args.messages, args.threshold)
+    print(f"{args.messages:,} frames, threshold ${args.threshold:,.0f}, JSON backend: {JSON_BACKEND}")
+    for name, result in results.items():
+        print(f"{name:<18} {result['msgs_per_sec']:>12,.0f} msgs/s   passed {result['passed']:,}")
+    speedup = results['filter_then_parse']['msgs_per_sec'] / results['full_parse']['msgs_per_sec']
+    print(f"speedup: {speedup:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
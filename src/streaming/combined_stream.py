@@ -0,0 +1,160 @@
+"""
+Multiplexed Binance combined-stream client.
+
+Instead of one WebSocket per symbol, every subscribed stream is carried over
+Binance's combined endpoint:
+
+    wss://fstream.binance.com/stream?streams=btcusdt@aggTrade/ethusdt@markPrice/...
+
+Each frame arrives wrapped as {"stream": <name>, "data": <payload>} and is
+routed to the handlers registered for that stream name. Streams are packed
+into as few connections as the per-connection limit allows, so the number of
+sockets stays constant as the symbol list grows.
+
+Handlers may register a prefilter that inspects the raw frame text (see
+fast_decode); frames every handler's prefilter rejects are never decoded.
+Raw handlers (subscribe_raw) receive the undecoded frame for every message,
+for consumers that only need a few fields.
+
+Socket readers only enqueue raw frames onto a bounded StageQueue; a separate
+task decodes and dispatches them, so slow handlers never delay reads. The
+queue's overflow policy decides what happens when dispatch falls behind.
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+from websockets import connect
+from .fast_decode import loads, stream_name
+from .pipeline import StageQueue
+
+logger = logging.getLogger(__name__)
+
+# Overridable so monitors can be pointed at a local replay server (see replay.py)
+FUTURES_STREAM_URL = os.getenv('BINANCE_FUTURES_STREAM_URL', 'wss://fstream.binance.com')
+SPOT_STREAM_URL = os.getenv('BINANCE_SPOT_STREAM_URL', 'wss://stream.binance.com:9443')
+
+# Binance futures accepts up to 200 streams per connection
+MAX_STREAMS_PER_CONNECTION = 200
+
+
+def chunk_streams(streams: List[str], size: int = MAX_STREAMS_PER_CONNECTION) -> List[List[str]]:
+    """Split stream names into groups that fit on one connection"""
+    return [streams[i:i + size] for i in range(0, len(streams), size)]
+
+
+class CombinedStream:
+    """
+    Routes frames from combined-stream connections to per-stream handlers.
+
+    Handlers take the unwrapped payload dict and may be plain functions or
+    coroutines. An exception in one handler is logged and does not affect
+    other streams on the same connection.
+
+    Example:
+        stream = CombinedStream()
+        stream.subscribe('btcusdt@aggTrade', on_trade)
+        stream.subscribe('!forceOrder@arr', on_liquidation)
+        await stream.run()
+    """
+
+    def __init__(self, base_url: str = FUTURES_STREAM_URL,
+                 max_streams_per_connection: int = MAX_STREAMS_PER_CONNECTION,
+                 max_backoff: float = 60.0, queue_size: int = 10_000,
+                 overflow: str = 'block', key: Optional[Callable] = None):
+        """
+        Args:
+            queue_size: Raw frames buffered between the sockets and dispatch
+            overflow: 'block', 'drop_oldest' or 'coalesce' (see pipeline.StageQueue)
+            key: Coalesce key for raw frames; defaults to the stream name, so
+                only the latest frame per stream is kept while dispatch is behind
+        """
+        self.base_url = base_url.rstrip('/')
+        self.max_streams_per_connection = max_streams_per_connection
+        self.max_backoff = max_backoff
+        self.handlers: Dict[str, List[Tuple[Callable, Optional[Callable]]]] = defaultdict(list)
+        self.raw_handlers: Dict[str, List[Callable]] = defaultdict(list)
+        self.messages = 0
+        self.filtered = 0
+        self.reconnects = 0
+        if overflow == 'coalesce' and key is None:
+            key = stream_name
+        self.frames = StageQueue(queue_size, overflow, key, name='frames')
+
+    @property
+    def streams(self) -> List[str]:
+        return list(dict.fromkeys([*self.handlers, *self.raw_handlers]))
+
+    def subscribe(self, stream: str, handler: Callable, prefilter: Optional[Callable] = None) -> None:
+        """
+        Register a handler for a stream name, e.g. 'btcusdt@aggTrade'
+
+        prefilter(raw_frame) -> bool, if given, decides from the undecoded
+        frame whether the handler wants it.
+        """
+        self.handlers[stream].append((handler, prefilter))
+
+    def subscribe_raw(self, stream: str, handler: Callable) -> None:
+        """Register a handler called with every undecoded frame of a stream"""
+        self.raw_handlers[stream].append(handler)
+
+    def connection_urls(self) -> List[str]:
+        return [f"{self.base_url}/stream?streams={'/'.join(group)}"
+                for group in chunk_streams(self.streams, self.max_streams_per_connection)]
+
+    async def dispatch(self, message) -> None:
+        """Unwrap one combined-stream frame and call its handlers"""
+        self.messages += 1
+        name = stream_name(message)
+        for handler in self.raw_handlers.get(name, ()):
+            try:
+                handler(message)
+            except Exception as e:
+                logger.error(f"Raw handler error on {name}: {e}")
+        handlers = [handler for handler, prefilter in self.handlers.get(name, ())
+                    if prefilter is None or prefilter(message)]
+        if not handlers:
+            self.filtered += 1
+            return
+        frame = loads(message)
+        for handler in handlers:
+            try:
+                result = handler(frame['data'])
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Handler error on {frame['stream']}: {e}")
+
+    async def _run_connection(self, url: str) -> None:
+        backoff = 1
+        while True:
+            try:
+                async with connect(url, max_size=None) as websocket:
+                    backoff = 1
+                    async for message in websocket:
+                        await self.frames.put(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.reconnects += 1
+                logger.error(f"Stream connection error: {e}. Reconnecting in {backoff}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+
+    async def _dispatch_frames(self) -> None:
+        while True:
+            message = await self.frames.get()
+            try:
+                await self.dispatch(message)
+            except (ValueError, KeyError) as e:
+                logger.error(f"Malformed frame: {e}")
+
+    async def run(self) -> None:
+        """Open one connection per group of streams and process frames forever"""
+        if not self.streams:
+            raise ValueError("No streams subscribed")
+        urls = self.connection_urls()
+        logger.info(f"Subscribing to {len(self.streams)} streams over {len(urls)} connection(s)")
+        await asyncio.gather(self._dispatch_frames(), *(self._run_connection(url) for url in urls))
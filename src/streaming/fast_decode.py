@@ -0,0 +1,112 @@
+"""
+Filter-before-parse decoding for high-volume WebSocket frames.
+
+Most aggTrade and forceOrder frames are discarded as below a notional
+threshold right after being fully decoded. The helpers here read only the
+fields a threshold check needs ("p", "q", "m", "T") straight from the raw
+text with precompiled patterns, so rejected frames are never passed to a JSON
+parser. Frames that pass are decoded with orjson when it is installed and
+the standard library json otherwise.
+
+See bench_decode.py for a before/after throughput comparison.
+"""
+
+import json
+import re
+from typing import Callable, Optional, Tuple
+
+try:
+    import orjson
+    loads = orjson.loads
+    JSON_BACKEND = 'orjson'
+except ImportError:
+    loads = json.loads
+    JSON_BACKEND = 'json'
+
+# Binance sends prices and quantities as quoted decimal strings. The leading
+# quote keeps "p" from matching inside "ap" (average price) in forceOrder.
+_PRICE = re.compile(r'"p":"([^"]*)"')
+_QUANTITY = re.compile(r'"q":"([^"]*)"')
+_BUYER_MAKER = re.compile(r'"m":(true|false)')
+_TRADE_TIME = re.compile(r'"T":(\d+)')
+_STREAM_KEY = '"stream":"'
+_SYMBOL_KEY = '"s":"'
+_PRICE_KEY = '"p":"'
+_QUANTITY_KEY = '"q":"'
+
+
+def _text(message):
+    return message.decode() if isinstance(message, (bytes, bytearray)) else message
+
+
+def stream_name(message) -> Optional[str]:
+    """Stream name of a combined-stream frame without decoding it"""
+    text = _text(message)
+    start = text.find(_STREAM_KEY)
+    if start < 0:
+        return None
+    start += len(_STREAM_KEY)
+    return text[start:text.find('"', start)]
+
+
+def peek_symbol(message) -> Optional[str]:
+    """First "s" (symbol) field of a frame without decoding it"""
+    text = _text(message)
+    start = text.find(_SYMBOL_KEY)
+    if start < 0:
+        return None
+    start += len(_SYMBOL_KEY)
+    return text[start:text.find('"', start)]
+
+
+def peek_trade(message) -> Optional[Tuple[float, float, Optional[bool], Optional[int]]]:
+    """
+    (price, quantity, is_buyer_maker, trade_time) of a single-trade frame
+
+    Returns None if the frame has no price/quantity; is_buyer_maker and
+    trade_time are None when absent (e.g. forceOrder has no "m").
+    """
+    text = _text(message)
+    price = _PRICE.search(text)
+    quantity = _QUANTITY.search(text)
+    if price is None or quantity is None:
+        return None
+    buyer_maker = _BUYER_MAKER.search(text)
+    trade_time = _TRADE_TIME.search(text)
+    return (float(price.group(1)), float(quantity.group(1)),
+            buyer_maker.group(1) == 'true' if buyer_maker else None,
+            int(trade_time.group(1)) if trade_time else None)
+
+
+def max_notional(message) -> float:
+    """Largest price * quantity in a frame (0.0 if it has none)"""
+    text = _text(message)
+    best = 0.0
+    p = text.find(_PRICE_KEY)
+    q = text.find(_QUANTITY_KEY)
+    # The n-th "p" pairs with the n-th "q" (one of each per trade/order)
+    while p >= 0 and q >= 0:
+        p += len(_PRICE_KEY)
+        q += len(_QUANTITY_KEY)
+        p_end = text.find('"', p)
+        q_end = text.find('"', q)
+        notional = float(text[p:p_end]) * float(text[q:q_end])
+        if notional > best:
+            best = notional
+        p = text.find(_PRICE_KEY, p_end)
+        q = text.find(_QUANTITY_KEY, q_end)
+    return best
+
+
+def notional_above(threshold: float) -> Callable[[object], bool]:
+    """Prefilter passing frames with any price * quantity > threshold"""
+    def prefilter(message) -> bool:
+        return max_notional(message) > threshold
+    return prefilter
+
+
+def notional_at_least(threshold: float) -> Callable[[object], bool]:
+    """Prefilter passing frames with any price * quantity >= threshold"""
+    def prefilter(message) -> bool:
+        return max_notional(message) >= threshold
+    return prefilter
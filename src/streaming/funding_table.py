@@ -0,0 +1,214 @@
+"""
+In-memory funding table fed by one persistent mark-price stream.
+
+FundingTable subscribes to Binance's all-market `!markPrice@arr` stream,
+which carries every perpetual's mark price and current funding rate in one
+frame every few seconds, and keeps the latest reading per symbol in a dict.
+Lookups never touch the network, so any symbol's funding is available
+instantly and at most one update old.
+
+A cold start fills the whole table from a single bulk premiumIndex REST
+call, so lookups work before the first frame arrives. Snapshots of the
+whole table are appended to a CSV file on a schedule through the shared
+background writer.
+
+Annualized rates use each symbol's funding interval: 8 hours unless the
+fundingInfo endpoint lists a shorter one.
+
+Example:
+    table = FundingTable(snapshot_path='funding_snapshots.csv')
+    asyncio.create_task(table.run())
+    await table.wait_ready()
+    table.get('btcusdt')['annualized']
+"""
+
+import asyncio
+import csv
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+import requests
+from .combined_stream import CombinedStream
+from .universe import FUTURES_REST_URL
+from ..utils.batch_writer import batch_writer
+
+logger = logging.getLogger(__name__)
+
+MARK_PRICE_STREAM = '!markPrice@arr'
+DEFAULT_FUNDING_HOURS = 8
+SNAPSHOT_HEADER = ['Timestamp', 'Symbol', 'Funding Rate', 'Yearly Rate', 'Mark Price', 'Index Price',
+                   'Next Funding Time']
+
+
+def annualize(funding_rate: float, interval_hours: float = DEFAULT_FUNDING_HOURS) -> float:
+    """Funding rate per interval as a yearly percentage"""
+    return funding_rate * (24 / interval_hours) * 365 * 100
+
+
+def fetch_premium_index(base_url: str = FUTURES_REST_URL) -> List[dict]:
+    """Mark price, index price and funding of every perpetual in one request"""
+    response = requests.get(f"{base_url}/premiumIndex", timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+def fetch_funding_intervals(base_url: str = FUTURES_REST_URL) -> Dict[str, float]:
+    """Funding interval in hours for symbols that differ from the 8h default"""
+    response = requests.get(f"{base_url}/fundingInfo", timeout=10)
+    response.raise_for_status()
+    return {info['symbol']: float(info['fundingIntervalHours']) for info in response.json()
+            if info.get('fundingIntervalHours')}
+
+
+class FundingTable:
+    """
+    Latest funding per symbol, kept current from the mark price stream.
+
+    Entries are dicts keyed by uppercase symbol:
+        {'symbol', 'funding_rate', 'annualized', 'mark_price', 'index_price',
+         'next_funding_time', 'time'}
+    with times in epoch ms. Entries are replaced, never mutated, so a
+    reference returned by get() is a consistent reading.
+    """
+
+    def __init__(self, stream: Optional[CombinedStream] = None, snapshot_path: Optional[str] = None,
+                 snapshot_interval: float = 3600.0, base_url: str = FUTURES_REST_URL):
+        """
+        Args:
+            stream: CombinedStream to subscribe on; a dedicated one (latest frame wins) by default
+            snapshot_path: CSV file that receives a snapshot of the whole table every
+                `snapshot_interval` seconds; None disables snapshots
+        """
+        self._own_stream = stream is None
+        self.stream = stream or CombinedStream(overflow='coalesce')
+        self.stream.subscribe(MARK_PRICE_STREAM, self.on_mark_prices)
+        self.snapshot_path = snapshot_path
+        self.snapshot_interval = snapshot_interval
+        self.base_url = base_url
+        self.rates: Dict[str, dict] = {}
+        self.intervals: Dict[str, float] = {}
+        self._ready = asyncio.Event()
+        self.updates = 0
+        self.snapshots = 0
+
+    def get(self, symbol: str) -> Optional[dict]:
+        """Latest entry for a symbol ('btcusdt', 'BTCUSDT'), or None if unknown"""
+        return self.rates.get(symbol.upper())
+
+    def annualized(self, symbol: str) -> Optional[float]:
+        entry = self.rates.get(symbol.upper())
+        return entry['annualized'] if entry is not None else None
+
+    def age(self, symbol: str, now: Optional[float] = None) -> Optional[float]:
+        """Seconds since a symbol's entry was last updated"""
+        entry = self.rates.get(symbol.upper())
+        if entry is None:
+            return None
+        return (now if now is not None else time.time()) - entry['time'] / 1000
+
+    def _update(self, symbol: str, funding_rate: float, mark_price: float, index_price: float,
+                next_funding_time: int, event_time: int) -> None:
+        self.rates[symbol] = {
+            'symbol': symbol,
+            'funding_rate': funding_rate,
+            'annualized': annualize(funding_rate, self.intervals.get(symbol, DEFAULT_FUNDING_HOURS)),
+            'mark_price': mark_price,
+            'index_price': index_price,
+            'next_funding_time': next_funding_time,
+            'time': event_time,
+        }
+
+    def on_mark_prices(self, data: list) -> None:
+        """Handler for `!markPrice@arr` payloads (a list of markPriceUpdate events)"""
+        for event in data:
+            funding_rate = event.get('r')
+            if not funding_rate:
+                # Delivery contracts carry no funding
+                continue
+            self._update(event['s'], float(funding_rate), float(event['p']), float(event['i']),
+                         int(event['T']), int(event['E']))
+        self.updates += 1
+        self._ready.set()
+
+    def load(self, premium_index: List[dict]) -> None:
+        """Fill the table from a premiumIndex response, keeping newer stream readings"""
+        for item in premium_index:
+            funding_rate = item.get('lastFundingRate')
+            if not funding_rate:
+                continue
+            current = self.rates.get(item['symbol'])
+            if current is not None and current['time'] >= int(item['time']):
+                continue
+            self._update(item['symbol'], float(funding_rate), float(item['markPrice']),
+                         float(item['indexPrice']), int(item['nextFundingTime']), int(item['time']))
+        self._ready.set()
+
+    async def cold_start(self) -> None:
+        """Fetch funding intervals and every symbol's current funding over REST"""
+        loop = asyncio.get_running_loop()
+        try:
+            self.intervals = await loop.run_in_executor(None, fetch_funding_intervals, self.base_url)
+        except Exception as e:
+            logger.warning(f"Funding intervals unavailable, assuming {DEFAULT_FUNDING_HOURS}h: {e}")
+        try:
+            self.load(await loop.run_in_executor(None, fetch_premium_index, self.base_url))
+            logger.info(f"Funding table loaded {len(self.rates)} symbols from premiumIndex")
+        except Exception as e:
+            logger.error(f"Funding cold start failed, waiting for the stream: {e}")
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the table has been filled once (REST or stream); False on timeout"""
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def snapshot(self) -> List[dict]:
+        """Every entry, sorted by symbol"""
+        return [self.rates[symbol] for symbol in sorted(self.rates)]
+
+    def write_snapshot(self, path: str) -> int:
+        """Append the whole table to a CSV file via the background writer"""
+        csv_path = Path(path)
+        if not csv_path.exists():
+            with open(csv_path, 'w', newline='') as f:
+                csv.writer(f).writerow(SNAPSHOT_HEADER)
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        entries = self.snapshot()
+        for entry in entries:
+            batch_writer.write_row(str(csv_path), [
+                timestamp,
+                entry['symbol'],
+                f"{entry['funding_rate']:.6f}",
+                f"{entry['annualized']:.2f}%",
+                entry['mark_price'],
+                entry['index_price'],
+                entry['next_funding_time'],
+            ])
+        self.snapshots += 1
+        return len(entries)
+
+    async def _snapshot_forever(self) -> None:
+        await self._ready.wait()
+        while True:
+            self.write_snapshot(self.snapshot_path)
+            await asyncio.sleep(self.snapshot_interval)
+
+    async def run(self) -> None:
+        """Cold start, then keep the table current (and snapshotted) forever"""
+        await self.cold_start()
+        tasks = []
+        if self._own_stream:
+            tasks.append(self.stream.run())
+        if self.snapshot_path:
+            tasks.append(self._snapshot_forever())
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    def stats(self) -> dict:
+        ages = [self.age(symbol) for symbol in self.rates]
+        return {'symbols': len(self.rates), 'updates': self.updates, 'snapshots': self.snapshots,
+                'max_age': max(ages) if ages else None}
@@ -0,0 +1,486 @@
+"""
+Synthetic firehose load test for the stream monitors.
+
+A stand-in Binance stream server runs in a child process (the replay
+server's protocol: /stream, /ws/<stream>, /ws + SUBSCRIBE) and generates
+synthetic aggTrade/trade and forceOrder traffic following a rate schedule:
+a ramp of steps, each at a fixed message rate, with optional periodic
+bursts on top. Notional sizes are drawn from a log-normal or Pareto
+distribution so size thresholds filter a realistic share of frames.
+
+The target under test runs unmodified in this process, connected to the
+stand-in server. Every frame carries its send time ("_sent"); the time a
+frame finishes processing is taken when the target's socket loop asks for
+the next frame (monitors reading a websocket directly) or when dispatch of
+the frame returns (CombinedStream based scripts). Per step the report gives
+offered and processed rates, end-to-end latency percentiles and resident
+memory; the sustained rate is the highest step with every frame processed
+and p99 latency under the limit.
+
+Reports are printed and written as JSON (with commit, host and settings)
+to compare runs.
+
+Usage:
+    python -m src.streaming.loadtest liqs --rates 1000 5000 20000 50000 --step-seconds 10
+    python -m src.streaming.loadtest trade_aggregator --burst-every 5 --burst-factor 10 --sizes pareto
+"""
+
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import io
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from .replay import ReplayServer
+
+REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+SENT_KEY = '"_sent":'
+# Stands in for E/T in templates until the frame is sent
+EVENT_TIME_MARK = '<event time>'
+SYMBOL_PRICES = {'btcusdt': 60000.0, 'ethusdt': 3000.0, 'solusdt': 150.0, 'bnbusdt': 550.0,
+                 'dogeusdt': 0.15, 'xrpusdt': 0.6, 'wifusdt': 2.5}
+LIQUIDATION_STREAM = '!forceOrder@arr'
+
+
+# --- Synthetic traffic -------------------------------------------------------
+
+def draw_notional(rng: random.Random, sizes: str) -> float:
+    """USD size: log-normal (median ~$600, long tail) or Pareto (alpha 1.2, min $100)"""
+    if sizes == 'pareto':
+        return 100.0 * rng.paretovariate(1.2)
+    return rng.lognormvariate(6.4, 1.8)
+
+
+def frame_templates(kind: str, count: int, sizes: str, seed: int = 7) -> List[tuple]:
+    """
+    Pre-rendered frames split around the time fields: (stream, parts, suffix)
+
+    kind is 'aggTrade', 'trade' or 'liquidation'. The event and trade times
+    (E/T) go between `parts` and the send time between `parts` and
+    `suffix`; only those are formatted per frame while serving, so the
+    targets see current exchange timestamps.
+    """
+    rng = random.Random(seed)
+    symbols = list(SYMBOL_PRICES)
+    templates = []
+    for i in range(count):
+        symbol = symbols[i % len(symbols)]
+        price = SYMBOL_PRICES[symbol] * (1 + rng.uniform(-0.001, 0.001))
+        quantity = draw_notional(rng, sizes) / price
+        event_time = EVENT_TIME_MARK
+        if kind == 'liquidation':
+            side = 'SELL' if rng.random() < 0.5 else 'BUY'
+            data = {'e': 'forceOrder', 'E': event_time,
+                    'o': {'s': symbol.upper(), 'S': side, 'o': 'LIMIT', 'f': 'IOC', 'q': f"{quantity:.3f}",
+                          'p': f"{price:.2f}", 'ap': f"{price:.2f}", 'X': 'FILLED', 'l': f"{quantity:.3f}",
+                          'z': f"{quantity:.3f}", 'T': event_time}}
+            stream = LIQUIDATION_STREAM
+        else:
+            data = {'e': kind, 'E': event_time, 's': symbol.upper(), 'p': f"{price:.2f}",
+                    'q': f"{quantity:.6f}", 'T': event_time, 'm': rng.random() < 0.5}
+            data['a' if kind == 'aggTrade' else 't'] = 100000 + i
+            stream = f"{symbol}@{kind}"
+        text = json.dumps({'stream': stream, 'data': data}, separators=(',', ':'))
+        # "_sent" goes last inside "data", just before the two closing braces
+        parts = tuple((text[:-2] + ',' + SENT_KEY).split(json.dumps(EVENT_TIME_MARK)))
+        templates.append((stream, parts, text[-2:]))
+    return templates
+
+
+class Schedule:
+    """Ramp of (rate, seconds) steps starting at `start`, with optional bursts"""
+
+    def __init__(self, rates: List[float], step_seconds: float, start: float,
+                 burst_every: float = 0.0, burst_seconds: float = 0.5, burst_factor: float = 1.0):
+        self.rates = rates
+        self.step_seconds = step_seconds
+        self.start = start
+        self.burst_every = burst_every
+        self.burst_seconds = burst_seconds
+        self.burst_factor = burst_factor
+        self.boundaries = [start + step_seconds * i for i in range(len(rates) + 1)]
+
+    @property
+    def end(self) -> float:
+        return self.boundaries[-1]
+
+    def step(self, t: float) -> int:
+        """Index of the step `t` falls in (-1 before the start, len(rates) after the end)"""
+        return bisect_right(self.boundaries, t) - 1
+
+    def rate(self, t: float) -> float:
+        step = self.step(t)
+        if step < 0 or step >= len(self.rates):
+            return 0.0
+        rate = self.rates[step]
+        if self.burst_every and (t - self.start) % self.burst_every < self.burst_seconds:
+            rate *= self.burst_factor
+        return rate
+
+
+class SyntheticServer(ReplayServer):
+    """Replay server that generates frames on a schedule instead of reading a recording"""
+
+    def __init__(self, templates: List[tuple], schedule: Schedule, port: int, stats):
+        super().__init__(None, speed=0, port=port, wait_clients=1)
+        self.templates = templates
+        self.schedule = schedule
+        self.stats = stats
+        self.sent_per_step = [0] * len(schedule.rates)
+
+    async def play(self) -> None:
+        tick = 0.001
+        owed = 0.0
+        i = 0
+        count = len(self.templates)
+        last = time.time()
+        if last < self.schedule.start:
+            await asyncio.sleep(self.schedule.start - last)
+            last = time.time()
+        while last < self.schedule.end:
+            await asyncio.sleep(tick)
+            now = time.time()
+            owed += self.schedule.rate(now) * (now - last)
+            last = now
+            due = int(owed)
+            owed -= due
+            step = self.schedule.step(now)
+            if step >= len(self.sent_per_step):
+                break
+            for _ in range(due):
+                stream, parts, suffix = self.templates[i % count]
+                i += 1
+                sent = time.time()
+                frame = f"{str(int(sent * 1000)).join(parts)}{sent:.6f}{suffix}"
+                for client in self.clients:
+                    client.offer(stream, frame)
+            self.sent_per_step[step] += due
+            self.frames += due
+        dropped = sum(client.dropped for client in self.clients)
+        self.stats.put({'sent_per_step': self.sent_per_step, 'server_dropped': dropped})
+
+
+def _serve(templates, schedule, port, stats) -> None:
+    server = SyntheticServer(templates, schedule, port, stats)
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(server.run())
+
+
+# --- Measurement -------------------------------------------------------------
+
+def sent_time(message) -> Optional[float]:
+    """Send time stamped into a synthetic frame (None for other frames, e.g. SUBSCRIBE replies)"""
+    if isinstance(message, (bytes, bytearray)):
+        message = message.decode()
+    start = message.rfind(SENT_KEY)
+    if start < 0:
+        return None
+    start += len(SENT_KEY)
+    end = start
+    while message[end] not in ',}':
+        end += 1
+    return float(message[start:end])
+
+
+class Probe:
+    """Collects (send time, latency) for every processed frame"""
+
+    def __init__(self):
+        self.sent = array('d')
+        self.latency = array('d')
+
+    def observe(self, message) -> None:
+        sent = sent_time(message)
+        if sent is None:
+            return
+        self.sent.append(sent)
+        self.latency.append(time.time() - sent)
+
+    def wrap(self, websocket):
+        """Websocket proxy timing each frame when the consumer asks for the next one"""
+        probe = self
+
+        class Proxy:
+            def __getattr__(self, name):
+                return getattr(websocket, name)
+
+            async def __aiter__(self):
+                previous = None
+                async for message in websocket:
+                    if previous is not None:
+                        probe.observe(previous)
+                    previous = message
+                    yield message
+                if previous is not None:
+                    probe.observe(previous)
+
+        return Proxy()
+
+
+def rss_bytes() -> int:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+async def sample_memory(samples: list, interval: float = 0.5) -> None:
+    while True:
+        samples.append((time.time(), rss_bytes()))
+        await asyncio.sleep(interval)
+
+
+# --- Targets -----------------------------------------------------------------
+
+def _load_script(name: str):
+    """Import a Datastreams script as a module (its CSV files land in the cwd)"""
+    path = REPO_ROOT / 'Datastreams' / f"{name}.py"
+    spec = importlib.util.spec_from_file_location(f"loadtest_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _probed_stream(url: str, probe: Probe):
+    from .combined_stream import CombinedStream
+    stream = CombinedStream(base_url=url)
+    dispatch = stream.dispatch
+
+    async def probed_dispatch(message):
+        await dispatch(message)
+        probe.observe(message)
+
+    stream.dispatch = probed_dispatch
+    return stream
+
+
+async def run_liquidation_monitor(url: str, probe: Probe) -> None:
+    from ..monitors.liquidation_monitor import LiquidationMonitor
+
+    class ProbedMonitor(LiquidationMonitor):
+        async def handle_messages(self, websocket):
+            await super().handle_messages(probe.wrap(websocket))
+
+    monitor = ProbedMonitor(csv_path='liquidations.csv')
+    monitor.ws_url = f"{url}/ws/{LIQUIDATION_STREAM}"
+    await monitor.start()
+
+
+async def run_trade_monitor(url: str, probe: Probe) -> None:
+    from ..monitors.trade_monitor import TradeMonitor
+
+    class ProbedMonitor(TradeMonitor):
+        async def handle_messages(self, websocket):
+            await super().handle_messages(probe.wrap(websocket))
+
+    monitor = ProbedMonitor([symbol.upper() for symbol in SYMBOL_PRICES], csv_path='trades.csv')
+    monitor.ws_url = f"{url}/ws"
+    await monitor.start()
+
+
+async def run_trade_aggregator(url: str, probe: Probe) -> None:
+    module = _load_script('huge_trades')
+    module.renderer.stream = io.StringIO()
+    aggregator = module.TradeAggregator()
+    stream = _probed_stream(url, probe)
+    handle_trade = module.trade_handler(aggregator)
+    for symbol in SYMBOL_PRICES:
+        stream.subscribe(f"{symbol}@aggTrade", handle_trade)
+    await asyncio.gather(module.monitor_trades(aggregator), module.renderer.run(), stream.run())
+
+
+async def run_liqs(url: str, probe: Probe) -> None:
+    module = _load_script('liqs')
+    module.renderer.stream = io.StringIO()
+    stream = _probed_stream(url, probe)
+    stream.subscribe(module.stream_name, module.handle_liquidation)
+    await asyncio.gather(module.renderer.run(), stream.run())
+
+
+async def run_big_liqs(url: str, probe: Probe) -> None:
+    from .fast_decode import notional_at_least
+    module = _load_script('big_liqs')
+    module.renderer.stream = io.StringIO()
+    stream = _probed_stream(url, probe)
+    stream.subscribe(module.STREAM_NAME, module.handle_liquidation,
+                     prefilter=notional_at_least(module.MIN_SIZE_USD))
+    await asyncio.gather(module.renderer.run(), stream.run())
+
+
+# name: (traffic kind, runner)
+TARGETS: Dict[str, tuple] = {
+    'liquidation_monitor': ('liquidation', run_liquidation_monitor),
+    'trade_monitor': ('trade', run_trade_monitor),
+    'trade_aggregator': ('aggTrade', run_trade_aggregator),
+    'liqs': ('liquidation', run_liqs),
+    'big_liqs': ('liquidation', run_big_liqs),
+}
+
+
+# --- Run and report ----------------------------------------------------------
+
+def summarize(probe: Probe, schedule: Schedule, sent_per_step: List[int], memory: list,
+              latency_limit: float) -> dict:
+    sent = np.frombuffer(probe.sent, dtype=np.float64)
+    latency = np.frombuffer(probe.latency, dtype=np.float64) * 1000
+    steps = []
+    sustained = 0.0
+    for i, rate in enumerate(schedule.rates):
+        begin, end = schedule.boundaries[i], schedule.boundaries[i + 1]
+        mask = (sent >= begin) & (sent < end)
+        step_latency = latency[mask]
+        processed = int(mask.sum())
+        offered = sent_per_step[i] if i < len(sent_per_step) else 0
+        rss = [value for t, value in memory if begin <= t < end]
+        percentiles = (np.percentile(step_latency, [50, 95, 99]).tolist()
+                       if processed else [math.nan] * 3)
+        step = {
+            'target_rate': rate,
+            'offered': offered,
+            'processed': processed,
+            'offered_rate': offered / (end - begin),
+            'processed_rate': processed / (end - begin),
+            'latency_ms': {'p50': percentiles[0], 'p95': percentiles[1], 'p99': percentiles[2],
+                           'max': float(step_latency.max()) if processed else math.nan},
+            'rss_mb': {'start': rss[0] / 1e6 if rss else math.nan, 'end': rss[-1] / 1e6 if rss else math.nan},
+        }
+        steps.append(step)
+        if offered and processed >= offered and percentiles[2] <= latency_limit:
+            sustained = max(sustained, step['offered_rate'])
+    rss_all = [value for _, value in memory]
+    return {
+        'steps': steps,
+        'sustained_rate': sustained,
+        'rss_mb': {'start': rss_all[0] / 1e6 if rss_all else math.nan,
+                   'peak': max(rss_all) / 1e6 if rss_all else math.nan,
+                   'end': rss_all[-1] / 1e6 if rss_all else math.nan},
+    }
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ''
+    return {'commit': commit, 'python': platform.python_version(), 'platform': platform.platform(),
+            'cpus': os.cpu_count()}
+
+
+async def run_target(runner: Callable, url: str, probe: Probe, schedule: Schedule, drain: float,
+                     memory: list) -> None:
+    sampler = asyncio.create_task(sample_memory(memory))
+    target = asyncio.create_task(runner(url, probe))
+    try:
+        await asyncio.sleep(max(0.0, schedule.end + drain - time.time()))
+        if target.done():
+            target.result()
+    finally:
+        for task in (target, sampler):
+            task.cancel()
+        await asyncio.gather(target, sampler, return_exceptions=True)
+
+
+def run(target: str, rates: List[float], step_seconds: float, sizes: str = 'lognormal',
+        burst_every: float = 0.0, burst_seconds: float = 0.5, burst_factor: float = 1.0,
+        latency_limit: float = 250.0, drain: float = 5.0, port: int = 8766, templates: int = 50_000,
+        out: Optional[str] = 'loadtest_reports') -> dict:
+    kind, runner = TARGETS[target]
+    schedule = Schedule(rates, step_seconds, time.time() + 3.0, burst_every, burst_seconds, burst_factor)
+    stats = multiprocessing.Queue()
+    server = multiprocessing.Process(target=_serve, daemon=True,
+                                     args=(frame_templates(kind, templates, sizes), schedule, port, stats))
+    server.start()
+
+    probe = Probe()
+    memory: list = []
+    cwd = os.getcwd()
+    # Targets write their CSVs into the working directory
+    with tempfile.TemporaryDirectory(prefix='loadtest-') as workdir:
+        os.chdir(workdir)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                asyncio.run(run_target(runner, f"ws://127.0.0.1:{port}", probe, schedule, drain, memory))
+        finally:
+            os.chdir(cwd)
+    try:
+        server_stats = stats.get(timeout=drain + 5)
+    except Exception:
+        server_stats = {'sent_per_step': [], 'server_dropped': None}
+    server.terminate()
+
+    report = {
+        'target': target,
+        'started': datetime.fromtimestamp(schedule.start).isoformat(timespec='seconds'),
+        'settings': {'rates': rates, 'step_seconds': step_seconds, 'sizes': sizes,
+                     'burst_every': burst_every, 'burst_seconds': burst_seconds, 'burst_factor': burst_factor,
+                     'latency_limit_ms': latency_limit},
+        'environment': environment(),
+        'server_dropped': server_stats['server_dropped'],
+        **summarize(probe, schedule, server_stats['sent_per_step'], memory, latency_limit),
+    }
+    if out:
+        Path(out).mkdir(parents=True, exist_ok=True)
+        path = Path(out) / f"{target}-{datetime.fromtimestamp(schedule.start):%Y%m%d-%H%M%S}.json"
+        path.write_text(json.dumps(report, indent=2))
+        report['path'] = str(path)
+    return report
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{report['target']}  (commit {report['environment']['commit'] or '?'}, "
+          f"{report['settings']['sizes']} sizes)")
+    print(f"{'target/s':>10} {'offered/s':>10} {'done/s':>10} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'rss MB':>8}")
+    for step in report['steps']:
+        latency = step['latency_ms']
+        print(f"{step['target_rate']:>10,.0f} {step['offered_rate']:>10,.0f} {step['processed_rate']:>10,.0f} "
+              f"{latency['p50']:>8.1f} {latency['p95']:>8.1f} {latency['p99']:>8.1f} {latency['max']:>8.1f} "
+              f"{step['rss_mb']['end']:>8.1f}")
+    rss = report['rss_mb']
+    print(f"Sustained: {report['sustained_rate']:,.0f} msgs/s "
+          f"(p99 <= {report['settings']['latency_limit_ms']:g} ms, nothing left behind)")
+    print(f"RSS: {rss['start']:.1f} MB -> peak {rss['peak']:.1f} MB -> {rss['end']:.1f} MB")
+    if report.get('server_dropped'):
+        print(f"Server dropped {report['server_dropped']:,} frames the client could not take")
+    if 'path' in report:
+        print(f"Report: {report['path']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('target', choices=sorted(TARGETS))
+    parser.add_argument('--rates', type=float, nargs='+', default=[1000, 5000, 10000, 20000, 50000])
+    parser.add_argument('--step-seconds', type=float, default=10.0)
+    parser.add_argument('--sizes', choices=['lognormal', 'pareto'], default='lognormal')
+    parser.add_argument('--burst-every', type=float, default=0.0, help='Seconds between bursts (0 = none)')
+    parser.add_argument('--burst-seconds', type=float, default=0.5)
+    parser.add_argument('--burst-factor', type=float, default=5.0)
+    parser.add_argument('--latency-limit', type=float, default=250.0, help='p99 ms allowed for "sustained"')
+    parser.add_argument('--drain', type=float, default=5.0, help='Seconds to keep consuming after the last step')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--out', default='loadtest_reports')
+    args = parser.parse_args()
+    print_report(run(args.target, args.rates, args.step_seconds, args.sizes,
+                     args.burst_every if args.burst_factor != 1 else 0.0, args.burst_seconds, args.burst_factor,
+                     args.latency_limit, args.drain, args.port, out=args.out))
+
+
+if __name__ == '__main__':
+    main()
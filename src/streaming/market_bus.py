@@ -0,0 +1,324 @@
+"""
+Shared-memory market data bus.
+
+One ingestion process holds the exchange connections and publishes
+normalized trades, candles and book tops into a fixed-size ring of records
+in a named shared-memory block. Any number of local strategy processes
+attach to the block by name and read it without sockets, parsing or copies.
+
+Every record carries a sequence number (1, 2, 3, ...); the header holds the
+last one published. A reader keeps its own cursor, so readers never block the
+writer or each other. A reader that falls more than `capacity` records
+behind has been lapped: the overwritten records are skipped and counted in
+`overruns`, and `lag` shows how close a reader is to that point.
+
+Records are written field by field and stamped with their sequence number
+last, after the slot's old number has been cleared. Readers use seqlock
+ordering: they copy the records first, then re-read the head, and drop any
+record whose slot the writer could have started rewriting in the meantime
+(and any whose number no longer matches). Those count as overruns, so a
+copied record is never torn. Zero-copy views get the same check when
+returned but can still be overwritten afterwards.
+
+Usage:
+    python -m src.streaming.market_bus --symbols btcusdt ethusdt --intervals 1m 5m
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Optional
+import numpy as np
+import requests
+from .fast_decode import loads, peek_symbol, peek_trade
+
+logger = logging.getLogger(__name__)
+
+FUTURES_KLINES_URL = 'https://fapi.binance.com/fapi/v1/klines'
+SPOT_KLINES_URL = 'https://api.binance.com/api/v3/klines'
+
+DEFAULT_BUS_NAME = 'market_bus'
+DEFAULT_CAPACITY = 1 << 16
+
+# Record kinds
+TRADE, CANDLE, BOOK_TOP = 1, 2, 3
+
+# Values per kind:
+#   TRADE     price, quantity, is_buyer_maker
+#   CANDLE    open, high, low, close, volume (closed flag and interval set)
+#   BOOK_TOP  bid, bid size, ask, ask size
+RECORD_DTYPE = np.dtype([
+    ('seq', np.uint64),
+    ('kind', np.uint8),
+    ('closed', np.uint8),
+    ('interval', 'S4'),
+    ('symbol', 'S20'),
+    ('timestamp', np.int64),
+    ('values', np.float64, 5),
+])
+
+HEADER_DTYPE = np.dtype([('head', np.uint64), ('capacity', np.uint64), ('record_size', np.uint64)])
+HEADER_SIZE = 64
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without letting this process's exit unlink it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 registers attached blocks with the resource tracker,
+        # which would destroy the bus when the first reader exits
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, 'shared_memory')
+        return shm
+
+
+class MarketBusWriter:
+    """
+    Single producer side of the bus.
+
+    Example:
+        bus = MarketBusWriter()
+        bus.publish_trade('BTCUSDT', trade_time, price, quantity, is_buyer_maker)
+        ...
+        bus.close()
+    """
+
+    def __init__(self, name: str = DEFAULT_BUS_NAME, capacity: int = DEFAULT_CAPACITY):
+        self.name = name
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * RECORD_DTYPE.itemsize
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by a writer that did not shut down cleanly
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.header = np.ndarray((), HEADER_DTYPE, self.shm.buf)
+        self.ring = np.ndarray((capacity,), RECORD_DTYPE, self.shm.buf, offset=HEADER_SIZE)
+        self.ring['seq'] = 0
+        self.header['capacity'] = capacity
+        self.header['record_size'] = RECORD_DTYPE.itemsize
+        self.header['head'] = 0
+        self.seq = 0
+        # Per-field views; element writes are far cheaper than record assignment
+        self._seq, self._kind, self._closed, self._interval, self._symbol, self._timestamp, self._values = \
+            (self.ring[field] for field in RECORD_DTYPE.names)
+
+    def publish(self, kind: int, symbol: str, timestamp: int, values, interval: str = '',
+                closed: bool = False) -> int:
+        """Append one record and return its sequence number"""
+        seq = self.seq + 1
+        index = seq % self.capacity
+        self._seq[index] = 0
+        self._kind[index] = kind
+        self._closed[index] = closed
+        self._interval[index] = interval
+        self._symbol[index] = symbol
+        self._timestamp[index] = timestamp
+        row = self._values[index]
+        row[:] = 0.0
+        row[:len(values)] = values
+        self._seq[index] = seq
+        self.header['head'] = seq
+        self.seq = seq
+        return seq
+
+    def publish_trade(self, symbol: str, timestamp: int, price: float, quantity: float,
+                      is_buyer_maker: bool) -> int:
+        return self.publish(TRADE, symbol, timestamp, (price, quantity, float(is_buyer_maker)))
+
+    def publish_candle(self, bar: dict, closed: bool) -> int:
+        """Publish a LiveCandleBuilder bar; usable directly as a builder subscriber"""
+        return self.publish(CANDLE, bar['symbol'], bar['timestamp'],
+                            (bar['open'], bar['high'], bar['low'], bar['close'], bar['volume']),
+                            interval=bar['interval'], closed=closed)
+
+    def publish_book_top(self, symbol: str, timestamp: int, bid: float, bid_size: float,
+                         ask: float, ask_size: float) -> int:
+        return self.publish(BOOK_TOP, symbol, timestamp, (bid, bid_size, ask, ask_size))
+
+    def close(self, unlink: bool = True) -> None:
+        del self.header, self.ring, self._seq, self._kind, self._closed, self._interval, \
+            self._symbol, self._timestamp, self._values
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class MarketBusReader:
+    """
+    One consumer's cursor over the bus.
+
+    poll() returns a NumPy view of RECORD_DTYPE records straight out of
+    shared memory (no copy). A view is only checked as it is returned;
+    consume it before the writer can lap the reader (see `lag`), or pass
+    copy=True for records that are guaranteed intact.
+
+    Example:
+        bus = MarketBusReader()
+        while True:
+            for record in bus.poll():
+                ...
+    """
+
+    def __init__(self, name: str = DEFAULT_BUS_NAME, start: str = 'latest', slow_fraction: float = 0.5):
+        """
+        Args:
+            start: 'latest' to read only new records, 'oldest' to replay what is still in the ring
+            slow_fraction: lag (as a fraction of capacity) above which `slow` is True
+        """
+        self.shm = _attach(name)
+        self.header = np.ndarray((), HEADER_DTYPE, self.shm.buf)
+        if int(self.header['record_size']) != RECORD_DTYPE.itemsize:
+            raise ValueError(f"Bus {name} was created with a different record layout")
+        self.capacity = int(self.header['capacity'])
+        self.ring = np.ndarray((self.capacity,), RECORD_DTYPE, self.shm.buf, offset=HEADER_SIZE)
+        self.slow_threshold = int(self.capacity * slow_fraction)
+        head = self.head
+        self.cursor = head + 1 if start == 'latest' else max(1, head - self.capacity + 2)
+        self.received = 0
+        self.overruns = 0
+
+    @property
+    def head(self) -> int:
+        """Sequence number of the latest published record"""
+        return int(self.header['head'])
+
+    @property
+    def lag(self) -> int:
+        """Records published but not yet read"""
+        return max(0, self.head - self.cursor + 1)
+
+    @property
+    def slow(self) -> bool:
+        return self.lag > self.slow_threshold
+
+    def _skip_overwritten(self, head: int) -> None:
+        # The slot being written next may already be partly overwritten
+        oldest = head - self.capacity + 2
+        if self.cursor < oldest:
+            self.overruns += oldest - self.cursor
+            logger.warning(f"Market bus reader lapped; skipped {oldest - self.cursor} records")
+            self.cursor = oldest
+
+    def poll(self, max_records: Optional[int] = None, copy: bool = False) -> np.ndarray:
+        """Records published since the last poll, oldest first (up to the ring's end)"""
+        head = self.head
+        self._skip_overwritten(head)
+        if self.cursor > head:
+            return self.ring[:0]
+        start = self.cursor % self.capacity
+        count = min(head - self.cursor + 1, self.capacity - start)
+        if max_records is not None:
+            count = min(count, max_records)
+        records = self.ring[start:start + count]
+        if copy:
+            records = records.copy()
+
+        # Seqlock: only after reading the records can we tell which slots the writer reached.
+        # With the head at h it may be rewriting the slot of h + 1 - capacity, and it
+        # overwrites oldest first, so the untrustworthy records are a prefix.
+        expected = np.arange(self.cursor, self.cursor + count, dtype=np.uint64)
+        first_safe = max(0, self.head - self.capacity + 2)
+        bad = np.flatnonzero((records['seq'] != expected) | (expected < first_safe))
+        if len(bad):
+            skipped = int(bad[-1]) + 1
+            self.overruns += skipped
+            logger.warning(f"Market bus reader lapped; skipped {skipped} records")
+            records = records[skipped:]
+            self.cursor += skipped
+        self.cursor += len(records)
+        self.received += len(records)
+        return records
+
+    async def stream(self, idle_sleep: float = 0.001):
+        """Yield record batches as they are published (copies, so they stay valid while awaited)"""
+        while True:
+            records = self.poll(copy=True)
+            if len(records):
+                yield records
+            else:
+                await asyncio.sleep(idle_sleep)
+
+    def stats(self) -> dict:
+        return {'cursor': self.cursor, 'head': self.head, 'lag': self.lag,
+                'received': self.received, 'overruns': self.overruns, 'slow': self.slow}
+
+    def close(self) -> None:
+        del self.header, self.ring
+        self.shm.close()
+
+
+def record_to_bar(record) -> dict:
+    """CANDLE record -> bar dict in LiveCandleBuilder form"""
+    open_, high, low, close, volume = record['values'].tolist()
+    return {'symbol': record['symbol'].decode(), 'interval': record['interval'].decode(),
+            'timestamp': int(record['timestamp']), 'open': open_, 'high': high, 'low': low,
+            'close': close, 'volume': volume}
+
+
+def fetch_binance_kline(symbol: str, interval: str, open_time: int, url: str = FUTURES_KLINES_URL):
+    """REST kline opening at `open_time`, or None"""
+    response = requests.get(url, params={'symbol': symbol, 'interval': interval,
+                                         'startTime': open_time, 'limit': 1}, timeout=10)
+    response.raise_for_status()
+    klines = response.json()
+    return klines[0] if klines else None
+
+
+async def run_ingestion(symbols: List[str], intervals: List[str], name: str = DEFAULT_BUS_NAME,
+                        capacity: int = DEFAULT_CAPACITY, futures: bool = True) -> None:
+    """Publish trades, live candles and book tops for `symbols` until cancelled"""
+    from ..data.live_candles import LiveCandleBuilder
+    from .combined_stream import CombinedStream, FUTURES_STREAM_URL, SPOT_STREAM_URL
+
+    bus = MarketBusWriter(name, capacity)
+    builder = LiveCandleBuilder(intervals)
+    builder.subscribe(bus.publish_candle)
+    stream = CombinedStream(FUTURES_STREAM_URL if futures else SPOT_STREAM_URL)
+
+    def on_trade(message):
+        trade = peek_trade(message)
+        if trade is None or trade[3] is None:
+            return
+        price, quantity, is_buyer_maker, trade_time = trade
+        symbol = peek_symbol(message)
+        bus.publish_trade(symbol, trade_time, price, quantity, is_buyer_maker)
+        builder.add_trade(symbol, trade_time, price, quantity)
+
+    def on_book_top(message):
+        data = loads(message)['data']
+        bus.publish_book_top(data['s'], data.get('E', int(time.time() * 1000)), float(data['b']),
+                             float(data['B']), float(data['a']), float(data['A']))
+
+    for symbol in symbols:
+        stream.subscribe_raw(f"{symbol.lower()}@aggTrade", on_trade)
+        stream.subscribe_raw(f"{symbol.lower()}@bookTicker", on_book_top)
+    logger.info(f"Publishing {len(symbols)} symbols to shared memory bus '{name}'")
+    klines_url = FUTURES_KLINES_URL if futures else SPOT_KLINES_URL
+    try:
+        await asyncio.gather(stream.run(), builder.reconcile_loop(
+            lambda symbol, interval, open_time: fetch_binance_kline(symbol, interval, open_time, klines_url)))
+    finally:
+        bus.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--symbols', nargs='+', default=['btcusdt', 'ethusdt', 'solusdt'])
+    parser.add_argument('--intervals', nargs='+', default=['1m'])
+    parser.add_argument('--name', default=DEFAULT_BUS_NAME)
+    parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY)
+    parser.add_argument('--spot', action='store_true', help='Binance spot instead of USD-M futures')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(run_ingestion(args.symbols, args.intervals, args.name, args.capacity, not args.spot))
+
+
+if __name__ == '__main__':
+    main()
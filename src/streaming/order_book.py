@@ -0,0 +1,395 @@
+"""
+Locally maintained L2 order books.
+
+Instead of a REST round trip for the top of book before every order, each
+book is loaded once from a snapshot and then kept current from WebSocket
+updates:
+
+- BinanceDepthBook applies `<symbol>@depth@100ms` diffs on top of a REST
+  depth snapshot, following Binance's buffering rules. Every diff must
+  continue the previous one (pu == previous u on futures, U == previous u + 1
+  on spot); a gap marks the book unsynced and triggers a fresh snapshot.
+- HyperliquidBook takes HyperLiquid `l2Book` pushes, which are full snapshots
+  of the top levels; stale pushes (older "time") are ignored.
+
+Levels are kept in sorted parallel lists (bid prices stored negated so both
+sides sort ascending from the touch), updated with bisect. Best bid/ask is
+an index lookup and depth queries walk only the levels they need, so reads
+take microseconds.
+
+Synchronous scripts can use hyperliquid_book(), which keeps books on a
+shared background event loop.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import requests
+from websockets import connect
+
+logger = logging.getLogger(__name__)
+
+FUTURES_DEPTH_URL = 'https://fapi.binance.com/fapi/v1/depth'
+SPOT_DEPTH_URL = 'https://api.binance.com/api/v3/depth'
+HYPERLIQUID_WS_URL = 'wss://api.hyperliquid.xyz/ws'
+
+
+class L2Book:
+    """Price levels for one symbol in sorted array form"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._bid_keys: List[float] = []   # negated prices, ascending
+        self._bid_sizes: List[float] = []
+        self._ask_keys: List[float] = []   # prices, ascending
+        self._ask_sizes: List[float] = []
+        self.synced = False
+        self.updated = 0.0
+        self.updates = 0
+        self.resyncs = 0
+        self._ready = threading.Event()
+
+    def clear(self) -> None:
+        self._bid_keys, self._bid_sizes = [], []
+        self._ask_keys, self._ask_sizes = [], []
+
+    def load(self, bids: Iterable, asks: Iterable) -> None:
+        """Replace both sides with (price, size) levels in any order"""
+        bids = sorted(((-float(price), float(size)) for price, size in bids if float(size) > 0))
+        asks = sorted(((float(price), float(size)) for price, size in asks if float(size) > 0))
+        self._bid_keys = [key for key, _ in bids]
+        self._bid_sizes = [size for _, size in bids]
+        self._ask_keys = [key for key, _ in asks]
+        self._ask_sizes = [size for _, size in asks]
+        self._touch()
+
+    @staticmethod
+    def _set(keys: List[float], sizes: List[float], key: float, size: float) -> None:
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            if size > 0:
+                sizes[i] = size
+            else:
+                del keys[i], sizes[i]
+        elif size > 0:
+            keys.insert(i, key)
+            sizes.insert(i, size)
+
+    def apply(self, bids: Iterable, asks: Iterable) -> None:
+        """Apply absolute level sizes; a size of 0 removes the level"""
+        for price, size in bids:
+            self._set(self._bid_keys, self._bid_sizes, -float(price), float(size))
+        for price, size in asks:
+            self._set(self._ask_keys, self._ask_sizes, float(price), float(size))
+        self._touch()
+
+    def _touch(self) -> None:
+        self.updated = time.time()
+        self.updates += 1
+
+    def _mark_synced(self, synced: bool) -> None:
+        self.synced = synced
+        if synced:
+            self._ready.set()
+        else:
+            self._ready.clear()
+
+    def wait_synced(self, timeout: Optional[float] = None) -> bool:
+        """Block (from another thread) until the book is in sync"""
+        return self._ready.wait(timeout)
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        if not self._bid_keys:
+            return None
+        return -self._bid_keys[0], self._bid_sizes[0]
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        if not self._ask_keys:
+            return None
+        return self._ask_keys[0], self._ask_sizes[0]
+
+    def ask_bid(self) -> Optional[Tuple[float, float]]:
+        """(best ask, best bid) prices, or None while either side is empty"""
+        if not self._ask_keys or not self._bid_keys:
+            return None
+        return self._ask_keys[0], -self._bid_keys[0]
+
+    def mid(self) -> Optional[float]:
+        top = self.ask_bid()
+        return (top[0] + top[1]) / 2 if top is not None else None
+
+    def spread(self) -> Optional[float]:
+        top = self.ask_bid()
+        return top[0] - top[1] if top is not None else None
+
+    def depth(self, levels: int = 10) -> Dict[str, List[Tuple[float, float]]]:
+        """Top `levels` (price, size) pairs per side, best first"""
+        return {
+            'bids': [(-key, size) for key, size in zip(self._bid_keys[:levels], self._bid_sizes[:levels])],
+            'asks': list(zip(self._ask_keys[:levels], self._ask_sizes[:levels])),
+        }
+
+    def size_within(self, pct: float) -> Tuple[float, float]:
+        """Resting (bid, ask) size within pct percent of the mid"""
+        mid = self.mid()
+        if mid is None:
+            return 0.0, 0.0
+        bid_end = bisect_left(self._bid_keys, -mid * (1 - pct / 100) + 1e-12)
+        ask_end = bisect_left(self._ask_keys, mid * (1 + pct / 100) + 1e-12)
+        return sum(self._bid_sizes[:bid_end]), sum(self._ask_sizes[:ask_end])
+
+    def impact_price(self, side: str, quantity: float) -> Optional[float]:
+        """Average fill price of a market order of `quantity`; None if the book is too thin"""
+        if side == 'buy':
+            prices, sizes = self._ask_keys, self._ask_sizes
+        else:
+            prices, sizes = [-key for key in self._bid_keys], self._bid_sizes
+        remaining, cost = quantity, 0.0
+        for price, size in zip(prices, sizes):
+            take = min(size, remaining)
+            cost += take * price
+            remaining -= take
+            if remaining <= 0:
+                return cost / quantity
+        return None
+
+
+def fetch_binance_snapshot(symbol: str, limit: int = 1000, url: str = FUTURES_DEPTH_URL) -> dict:
+    """REST depth snapshot: {'lastUpdateId', 'bids', 'asks'}"""
+    response = requests.get(url, params={'symbol': symbol.upper(), 'limit': limit}, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+class BinanceDepthBook(L2Book):
+    """
+    Binance book kept in sync from depth diffs.
+
+    Example:
+        book = BinanceDepthBook('BTCUSDT')
+        stream.subscribe('btcusdt@depth@100ms', book.on_diff)
+        await stream.run()
+        ...
+        ask, bid = book.ask_bid()
+    """
+
+    def __init__(self, symbol: str, futures: bool = True, limit: int = 1000,
+                 fetch_snapshot: Optional[Callable] = None, max_buffer: int = 10_000):
+        """
+        Args:
+            futures: USD-M futures sequencing (pu field) and snapshot URL; spot otherwise
+            fetch_snapshot: Blocking fetch_snapshot(symbol, limit) -> depth snapshot dict
+        """
+        super().__init__(symbol.upper())
+        self.futures = futures
+        self.limit = limit
+        url = FUTURES_DEPTH_URL if futures else SPOT_DEPTH_URL
+        self.fetch_snapshot = fetch_snapshot or (lambda symbol, limit: fetch_binance_snapshot(symbol, limit, url))
+        self.last_update_id: Optional[int] = None
+        self.gaps = 0
+        self._buffer = deque(maxlen=max_buffer)
+        self._resync_task: Optional[asyncio.Task] = None
+
+    @property
+    def stream(self) -> str:
+        return f"{self.symbol.lower()}@depth@100ms"
+
+    def _continues(self, event: dict) -> bool:
+        if 'pu' in event:
+            return event['pu'] == self.last_update_id
+        return event['U'] == self.last_update_id + 1
+
+    def _superseded(self, event: dict) -> bool:
+        """Whether a buffered diff is already contained in the loaded snapshot"""
+        if self.futures:
+            # Futures: drop u < lastUpdateId; the bridging event may end exactly at it
+            return event['u'] < self.last_update_id
+        # Spot: drop u <= lastUpdateId
+        return event['u'] <= self.last_update_id
+
+    def _bridges(self, event: dict) -> bool:
+        """Whether the first diff applied after a snapshot covers lastUpdateId"""
+        if self.futures:
+            return event['U'] <= self.last_update_id <= event['u']
+        return event['U'] <= self.last_update_id + 1 <= event['u']
+
+    def on_diff(self, event: dict) -> None:
+        """CombinedStream handler for depthUpdate payloads"""
+        if not self.synced:
+            self._buffer.append(event)
+            if self._resync_task is None or self._resync_task.done():
+                self._resync_task = asyncio.get_running_loop().create_task(self.resync())
+            return
+        if not self._continues(event):
+            self.gaps += 1
+            logger.warning(f"{self.symbol} depth gap after {self.last_update_id} "
+                           f"(U={event['U']} u={event['u']}); resyncing")
+            self._mark_synced(False)
+            self._buffer.clear()
+            self.on_diff(event)
+            return
+        self.apply(event['b'], event['a'])
+        self.last_update_id = event['u']
+
+    async def resync(self) -> None:
+        """Load a REST snapshot, then replay the diffs buffered since"""
+        loop = asyncio.get_running_loop()
+        while not self.synced:
+            try:
+                snapshot = await loop.run_in_executor(None, self.fetch_snapshot, self.symbol, self.limit)
+            except Exception as e:
+                logger.error(f"{self.symbol} depth snapshot failed: {e}")
+                await asyncio.sleep(1)
+                continue
+            self.resyncs += 1
+            self.load(snapshot['bids'], snapshot['asks'])
+            self.last_update_id = snapshot['lastUpdateId']
+
+            buffered = []
+            for _ in range(100):
+                # Trim on every pass so a slow resync does not keep growing the buffer
+                while self._buffer and self._superseded(self._buffer[0]):
+                    self._buffer.popleft()
+                buffered = list(self._buffer)
+                if buffered:
+                    break
+                # Snapshot is ahead of every diff so far; wait for more
+                await asyncio.sleep(0.05)
+            if not buffered or not self._bridges(buffered[0]):
+                # Diffs start after the snapshot (it is too old) or never arrived
+                await asyncio.sleep(0.5)
+                continue
+            self._buffer.clear()
+            self.apply(buffered[0]['b'], buffered[0]['a'])
+            self.last_update_id = buffered[0]['u']
+            self._mark_synced(True)
+            for event in buffered[1:]:
+                self.on_diff(event)
+
+
+class HyperliquidBook(L2Book):
+    """HyperLiquid book replaced by each l2Book push"""
+
+    def __init__(self, coin: str):
+        super().__init__(coin)
+        self.time = 0
+        self.levels: list = [[], []]
+
+    def on_message(self, data: dict) -> None:
+        """Handle the data of an l2Book channel message"""
+        if data['time'] <= self.time:
+            return
+        self.time = data['time']
+        self.levels = data['levels']
+        bids, asks = data['levels']
+        self.load(((level['px'], level['sz']) for level in bids),
+                  ((level['px'], level['sz']) for level in asks))
+        self._mark_synced(True)
+
+    def to_dict(self) -> dict:
+        """Same shape as the REST l2Book response"""
+        return {'coin': self.symbol, 'time': self.time, 'levels': self.levels}
+
+
+class HyperliquidBookStream:
+    """
+    Keeps HyperliquidBooks current over one WebSocket.
+
+    Coins can be added while running. On reconnect every book is marked
+    unsynced until its next snapshot arrives.
+    """
+
+    def __init__(self, url: str = HYPERLIQUID_WS_URL, max_backoff: float = 60.0):
+        self.url = url
+        self.max_backoff = max_backoff
+        self.books: Dict[str, HyperliquidBook] = {}
+        self.reconnects = 0
+        self._websocket = None
+
+    @staticmethod
+    def _subscription(coin: str) -> str:
+        return json.dumps({'method': 'subscribe', 'subscription': {'type': 'l2Book', 'coin': coin}})
+
+    def add(self, coin: str) -> HyperliquidBook:
+        """Book for `coin`, subscribing to it if new; call from the stream's event loop"""
+        book = self.books.get(coin)
+        if book is None:
+            book = self.books[coin] = HyperliquidBook(coin)
+            if self._websocket is not None:
+                asyncio.get_running_loop().create_task(self._websocket.send(self._subscription(coin)))
+        return book
+
+    def dispatch(self, message) -> None:
+        frame = json.loads(message)
+        if frame.get('channel') != 'l2Book':
+            return
+        book = self.books.get(frame['data']['coin'])
+        if book is not None:
+            book.on_message(frame['data'])
+
+    async def run(self) -> None:
+        backoff = 1
+        while True:
+            try:
+                async with connect(self.url, max_size=None) as websocket:
+                    self._websocket = websocket
+                    backoff = 1
+                    for coin in list(self.books):
+                        await websocket.send(self._subscription(coin))
+                    async for message in websocket:
+                        try:
+                            self.dispatch(message)
+                        except (ValueError, KeyError) as e:
+                            logger.error(f"Malformed l2Book frame: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.reconnects += 1
+                logger.error(f"l2Book connection error: {e}. Reconnecting in {backoff}s")
+            finally:
+                self._websocket = None
+                for book in self.books.values():
+                    book._mark_synced(False)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+
+_background: Optional[Tuple[asyncio.AbstractEventLoop, HyperliquidBookStream]] = None
+_background_lock = threading.Lock()
+
+
+def _start_background() -> Tuple[asyncio.AbstractEventLoop, HyperliquidBookStream]:
+    global _background
+    with _background_lock:
+        if _background is None:
+            loop = asyncio.new_event_loop()
+            stream = HyperliquidBookStream()
+            threading.Thread(target=loop.run_forever, name='l2book', daemon=True).start()
+            asyncio.run_coroutine_threadsafe(stream.run(), loop)
+            _background = loop, stream
+        return _background
+
+
+def hyperliquid_book(coin: str, timeout: float = 5.0) -> Optional[HyperliquidBook]:
+    """
+    Synced local book for `coin` from blocking code, or None if it is not in
+    sync (callers then fall back to REST).
+
+    The first call for a coin starts its subscription on a shared background
+    event loop and waits up to `timeout` seconds for the first snapshot.
+    Later calls never wait: while the book is out of sync (e.g. after a
+    dropped connection) they return None immediately.
+    """
+    loop, stream = _start_background()
+    book = stream.books.get(coin)
+    if book is None:
+        async def add():
+            return stream.add(coin)
+        book = asyncio.run_coroutine_threadsafe(add(), loop).result()
+        return book if book.wait_synced(timeout) else None
+    return book if book.synced else None
@@ -0,0 +1,235 @@
+"""
+Bounded asyncio pipeline between socket readers and processors.
+
+A slow consumer inside the receive loop delays socket reads until the
+exchange disconnects us. Here each stage (decode, aggregate, sink, ...) runs
+in its own task and reads from a bounded StageQueue, so the socket reader
+only ever waits on an enqueue. What happens when a stage falls behind is a
+per-stage overflow policy:
+
+    'block'        put() waits for room (backpressure to the stage before it)
+    'drop_oldest'  the oldest queued item is discarded to make room
+    'coalesce'     items with the same key replace the queued one, e.g. keep
+                   only the latest mark price per symbol
+
+Queue depth, high-water mark and drop/coalesce counts are exposed per stage.
+
+Example:
+    pipeline = Pipeline()
+    pipeline.add_stage('decode', decode, maxsize=10_000, policy='block')
+    pipeline.add_stage('sink', print_alert, maxsize=1_000, policy='drop_oldest')
+    pipeline.start()
+    await pipeline.put(raw_frame)
+    pipeline.depths()  # {'decode': 3, 'sink': 0}
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ('block', 'drop_oldest', 'coalesce')
+
+
+class StageQueue:
+    """
+    Bounded FIFO with a configurable overflow policy.
+
+    put_nowait() never waits: it drops or coalesces according to the policy
+    and raises asyncio.QueueFull only for 'block'. With 'coalesce', key(item)
+    identifies items that supersede each other; a replaced item keeps its
+    place in the queue.
+    """
+
+    def __init__(self, maxsize: int = 10_000, policy: str = 'block',
+                 key: Optional[Callable] = None, name: str = ''):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        if policy == 'coalesce' and key is None:
+            raise ValueError("The coalesce policy needs a key function")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.key = key
+        self.name = name
+        self._items = OrderedDict() if policy == 'coalesce' else deque()
+        self._getters = deque()
+        self._putters = deque()
+        self.put_count = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def empty(self) -> bool:
+        return not self._items
+
+    def full(self) -> bool:
+        return len(self._items) >= self.maxsize
+
+    @staticmethod
+    def _wakeup_next(waiters):
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    async def _wait(self, waiters, ready: Callable[[], bool]):
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except BaseException:
+            waiter.cancel()
+            try:
+                waiters.remove(waiter)
+            except ValueError:
+                pass
+            if ready() and not waiter.cancelled():
+                # Woken just before being cancelled: hand the wakeup on (as asyncio.Queue does)
+                self._wakeup_next(waiters)
+            raise
+
+    def put_nowait(self, item) -> None:
+        if self.policy == 'coalesce':
+            key = self.key(item)
+            if key in self._items:
+                self._items[key] = item
+                self.coalesced += 1
+                return
+        if self.full():
+            if self.policy == 'block':
+                raise asyncio.QueueFull
+            if self.policy == 'coalesce':
+                self._items.popitem(last=False)
+            else:
+                self._items.popleft()
+            self.dropped += 1
+
+        if self.policy == 'coalesce':
+            self._items[key] = item
+        else:
+            self._items.append(item)
+        self.put_count += 1
+        self.high_water = max(self.high_water, len(self._items))
+        self._wakeup_next(self._getters)
+
+    async def put(self, item) -> None:
+        """Enqueue; only the 'block' policy can wait here"""
+        while self.policy == 'block' and self.full():
+            await self._wait(self._putters, lambda: not self.full())
+        self.put_nowait(item)
+
+    def get_nowait(self):
+        if not self._items:
+            raise asyncio.QueueEmpty
+        if self.policy == 'coalesce':
+            item = self._items.popitem(last=False)[1]
+        else:
+            item = self._items.popleft()
+        self._wakeup_next(self._putters)
+        return item
+
+    async def get(self):
+        while not self._items:
+            await self._wait(self._getters, lambda: not self.empty())
+        return self.get_nowait()
+
+    def stats(self) -> dict:
+        return {
+            'depth': len(self._items),
+            'maxsize': self.maxsize,
+            'policy': self.policy,
+            'high_water': self.high_water,
+            'put': self.put_count,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+        }
+
+
+class Stage:
+    """One pipeline step: a StageQueue drained by `workers` tasks calling func"""
+
+    def __init__(self, name: str, func: Callable, queue: StageQueue, workers: int = 1):
+        self.name = name
+        self.func = func
+        self.queue = queue
+        self.workers = workers
+        self.next: Optional['Stage'] = None
+        self.processed = 0
+        self.errors = 0
+
+    async def run(self) -> None:
+        while True:
+            item = await self.queue.get()
+            try:
+                result = self.func(item)
+                if asyncio.iscoroutine(result):
+                    result = await result
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Stage {self.name} failed: {e}")
+                continue
+            self.processed += 1
+            # None means "consumed"; anything else moves on to the next stage
+            if result is not None and self.next is not None:
+                await self.next.queue.put(result)
+
+
+class Pipeline:
+    """
+    Chain of stages connected by bounded queues.
+
+    Each stage function receives one item and may be sync or async. Its
+    return value is passed to the next stage unless it is None.
+    """
+
+    def __init__(self):
+        self.stages: List[Stage] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add_stage(self, name: str, func: Callable, maxsize: int = 10_000, policy: str = 'block',
+                  key: Optional[Callable] = None, workers: int = 1) -> Stage:
+        stage = Stage(name, func, StageQueue(maxsize, policy, key, name), workers)
+        if self.stages:
+            self.stages[-1].next = stage
+        self.stages.append(stage)
+        return stage
+
+    def stage(self, name: str) -> Stage:
+        return next(stage for stage in self.stages if stage.name == name)
+
+    def start(self) -> List[asyncio.Task]:
+        """Start the worker tasks (inside a running event loop)"""
+        for stage in self.stages:
+            for i in range(stage.workers):
+                self._tasks.append(asyncio.create_task(stage.run(), name=f"{stage.name}-{i}"))
+        return self._tasks
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def put(self, item) -> None:
+        """Feed the first stage (waits only if its policy is 'block')"""
+        await self.stages[0].queue.put(item)
+
+    def put_nowait(self, item) -> None:
+        self.stages[0].queue.put_nowait(item)
+
+    async def join(self) -> None:
+        """Run until the stage tasks stop; a failing task propagates its error"""
+        await asyncio.gather(*self._tasks)
+
+    def depths(self) -> Dict[str, int]:
+        return {stage.name: stage.queue.qsize() for stage in self.stages}
+
+    def stats(self) -> Dict[str, dict]:
+        return {stage.name: dict(stage.queue.stats(), processed=stage.processed, errors=stage.errors)
+                for stage in self.stages}
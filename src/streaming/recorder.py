@@ -0,0 +1,170 @@
+"""
+Raw WebSocket frame recorder.
+
+Captures combined-stream frames exactly as received, each with its receive
+time, into gzip-compressed chunk files so monitors can later be replayed
+(replay.py) and profiled against real, bursty traffic offline.
+
+Each chunk is named frames-<UTC start>.txt.gz and holds one frame per line:
+
+    <receive time, epoch seconds>\t<raw frame text>
+
+Frames are buffered in memory and compressed/written from a worker thread
+once per flush interval; a new chunk starts every `chunk_seconds`.
+
+Usage:
+    python -m src.streaming.recorder --out recordings
+    python -m src.streaming.recorder --symbols btcusdt ethusdt --streams aggTrade markPrice --minutes 30
+"""
+
+import argparse
+import asyncio
+import gzip
+import logging
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, List, Tuple
+from .combined_stream import CombinedStream
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYMBOLS = ['btcusdt', 'ethusdt', 'solusdt', 'bnbusdt', 'dogeusdt', 'wifiusdt', 'xrpusdt']
+DEFAULT_STREAMS = ['aggTrade', 'markPrice']
+LIQUIDATION_STREAM = '!forceOrder@arr'
+CHUNK_PATTERN = 'frames-*.txt.gz'
+
+
+class FrameRecorder:
+    """
+    Example:
+        recorder = FrameRecorder('recordings')
+        stream.subscribe_raw('btcusdt@aggTrade', recorder.record)
+        await asyncio.gather(stream.run(), recorder.run())
+    """
+
+    def __init__(self, directory: str, chunk_seconds: float = 300.0, flush_interval: float = 1.0,
+                 compresslevel: int = 6):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.chunk_seconds = chunk_seconds
+        self.flush_interval = flush_interval
+        self.compresslevel = compresslevel
+        self._pending: List[str] = []
+        self._chunk = None
+        self._chunk_started = 0.0
+        self.frames = 0
+        self.chunks = 0
+        self.bytes_in = 0
+
+    def record(self, message) -> None:
+        """Raw handler: stamp and buffer one frame"""
+        if isinstance(message, (bytes, bytearray)):
+            message = message.decode()
+        self._pending.append(f"{time.time():.6f}\t{message}\n")
+        self.frames += 1
+        self.bytes_in += len(message)
+
+    def _write(self, lines: List[str], now: float) -> None:
+        if self._chunk is None or now - self._chunk_started >= self.chunk_seconds:
+            self._close_chunk()
+            stamp = datetime.fromtimestamp(now, timezone.utc).strftime('%Y%m%d-%H%M%S')
+            path = self.directory / f"frames-{stamp}.txt.gz"
+            self._chunk = gzip.open(path, 'at', encoding='utf-8', compresslevel=self.compresslevel)
+            self._chunk_started = now
+            self.chunks += 1
+            logger.info(f"Recording to {path}")
+        self._chunk.writelines(lines)
+
+    def _close_chunk(self) -> None:
+        if self._chunk is not None:
+            self._chunk.close()
+            self._chunk = None
+
+    def flush(self) -> None:
+        """Write everything buffered (synchronously)"""
+        lines, self._pending = self._pending, []
+        if lines:
+            self._write(lines, time.time())
+
+    def close(self) -> None:
+        self.flush()
+        self._close_chunk()
+
+    async def run(self) -> None:
+        """Write buffered frames every flush interval, forever"""
+        loop = asyncio.get_running_loop()
+        writing = None
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                lines, self._pending = self._pending, []
+                if lines:
+                    writing = loop.run_in_executor(None, self._write, lines, time.time())
+                    # Shielded: cancelling the task must not abandon a write still running in the thread
+                    await asyncio.shield(writing)
+        finally:
+            if writing is not None and not writing.done():
+                # Let the in-flight write finish before close() touches the same chunk
+                await asyncio.wait([writing])
+            self.close()
+
+
+def recording_files(path: str) -> List[Path]:
+    """Chunk files of a recording directory (or a single chunk) in time order"""
+    path = Path(path)
+    return [path] if path.is_file() else sorted(path.glob(CHUNK_PATTERN))
+
+
+def iter_frames(path: str) -> Iterator[Tuple[float, str]]:
+    """(receive time, raw frame) for every frame of a recording, oldest first"""
+    for chunk in recording_files(path):
+        with gzip.open(chunk, 'rt', encoding='utf-8') as f:
+            for line in f:
+                received, _, frame = line.rstrip('\n').partition('\t')
+                yield float(received), frame
+
+
+async def record(streams: List[str], directory: str, chunk_seconds: float, minutes: float = 0) -> FrameRecorder:
+    stream = CombinedStream()
+    recorder = FrameRecorder(directory, chunk_seconds)
+    for name in streams:
+        stream.subscribe_raw(name, recorder.record)
+    tasks = asyncio.gather(stream.run(), recorder.run())
+    try:
+        if minutes:
+            await asyncio.wait_for(tasks, minutes * 60)
+        else:
+            await tasks
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        recorder.close()
+    return recorder
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--out', default='recordings')
+    parser.add_argument('--symbols', nargs='+', default=DEFAULT_SYMBOLS)
+    parser.add_argument('--streams', nargs='+', default=DEFAULT_STREAMS, help='Per-symbol stream types')
+    parser.add_argument('--no-liquidations', action='store_true', help=f'Skip {LIQUIDATION_STREAM}')
+    parser.add_argument('--chunk-seconds', type=float, default=300.0)
+    parser.add_argument('--minutes', type=float, default=0, help='Stop after this long (0 = until interrupted)')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    streams = [f"{symbol.lower()}@{kind}" for symbol in args.symbols for kind in args.streams]
+    if not args.no_liquidations:
+        streams.append(LIQUIDATION_STREAM)
+    started = time.time()
+    try:
+        recorder = asyncio.run(record(streams, args.out, args.chunk_seconds, args.minutes))
+        print(f"Recorded {recorder.frames:,} frames ({recorder.bytes_in / 1e6:.1f} MB raw) "
+              f"in {recorder.chunks} chunk(s) over {time.time() - started:.0f}s")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
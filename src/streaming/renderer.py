@@ -0,0 +1,75 @@
+"""
+Fixed-rate terminal renderer for monitor alerts.
+
+Handlers call emit(), which only appends to an in-memory buffer. A render
+task wakes up `fps` times per second, takes a snapshot of the events queued
+since the last frame and writes them in a single call from a worker thread,
+so ingestion never waits on terminal I/O. Emphasis that used to be done by
+printing a line several times with sleeps in between (the liquidation
+"blink") is drawn in one frame instead.
+
+If the terminal cannot keep up, frames simply grow; if the buffer reaches
+max_pending the oldest undrawn events are dropped and counted.
+"""
+
+import asyncio
+import sys
+from collections import deque
+from typing import List, Optional
+from termcolor import colored
+
+DEFAULT_FPS = 10
+DEFAULT_MAX_PENDING = 2000
+
+
+class TerminalRenderer:
+    def __init__(self, fps: float = DEFAULT_FPS, max_pending: int = DEFAULT_MAX_PENDING, stream=None):
+        self.interval = 1.0 / fps
+        self.stream = stream or sys.stdout
+        self._pending = deque(maxlen=max_pending)
+        self.emitted = 0
+        self.dropped = 0
+        self.frames = 0
+
+    def emit(self, text: str, color: Optional[str] = None, on_color: Optional[str] = None,
+             attrs: Optional[List[str]] = None, repeat: int = 1) -> None:
+        """Queue a line for the next frame; never blocks"""
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append((text, color, on_color, attrs, repeat))
+        self.emitted += 1
+
+    def snapshot(self) -> List[tuple]:
+        """Take (and clear) the events queued since the last frame"""
+        events = list(self._pending)
+        self._pending.clear()
+        return events
+
+    @staticmethod
+    def format_frame(events) -> str:
+        lines = []
+        for text, color, on_color, attrs, repeat in events:
+            line = colored(text, color, on_color, attrs=attrs) if (color or on_color or attrs) else text
+            lines.extend([line] * repeat)
+        return '\n'.join(lines) + '\n' if lines else ''
+
+    def _write(self, frame: str) -> None:
+        self.stream.write(frame)
+        self.stream.flush()
+
+    def flush(self) -> None:
+        """Draw anything pending synchronously (e.g. on shutdown)"""
+        frame = self.format_frame(self.snapshot())
+        if frame:
+            self._write(frame)
+
+    async def run(self) -> None:
+        """Render pending events at a fixed frame rate, forever"""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            frame = self.format_frame(self.snapshot())
+            if frame:
+                await loop.run_in_executor(None, self._write, frame)
+                self.frames += 1
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
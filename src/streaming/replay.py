@@ -0,0 +1,194 @@
+"""
+Local WebSocket replay of recorded frames.
+
+Serves a recording (see recorder.py) from a local server that speaks enough
+of Binance's futures stream protocol for the monitors and Datastreams
+scripts to connect unchanged:
+
+    /stream?streams=a/b/c   combined frames ({"stream": ..., "data": ...})
+    /ws/<stream>            raw payloads of one stream (LiquidationMonitor)
+    /ws + SUBSCRIBE         raw payloads of the subscribed streams (TradeMonitor)
+
+Point them at it with BINANCE_FUTURES_STREAM_URL=ws://127.0.0.1:8765.
+
+Playback starts once `wait_clients` clients are connected and follows the
+recorded receive times, compressed by `speed` (1 = real time, 10 = ten times
+faster, 0 = as fast as possible). Every client gets its own bounded send
+queue; frames a slow client cannot take are dropped and counted instead of
+stalling the replay for everyone.
+
+Usage:
+    python -m src.streaming.replay recordings --speed 10
+    python -m src.streaming.replay recordings/frames-20240101-000000.txt.gz --speed 0 --loop
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from typing import Optional, Set
+from urllib.parse import parse_qs, urlparse
+from websockets import serve
+from .fast_decode import stream_name
+from .recorder import iter_frames
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+DATA_KEY = '"data":'
+
+
+def unwrap(frame: str) -> str:
+    """Payload text of a combined-stream frame, without re-encoding it"""
+    start = frame.find(DATA_KEY)
+    return frame[start + len(DATA_KEY):frame.rstrip().rfind('}')] if start >= 0 else frame
+
+
+class ReplayClient:
+    def __init__(self, websocket, streams: Set[str], combined: bool, queue_size: int):
+        self.websocket = websocket
+        self.streams = streams
+        self.combined = combined
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self.sent = 0
+        self.dropped = 0
+
+    def offer(self, name: str, frame: str) -> None:
+        if name not in self.streams:
+            return
+        try:
+            self.queue.put_nowait(frame if self.combined else unwrap(frame))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def send_forever(self) -> None:
+        while True:
+            message = await self.queue.get()
+            await self.websocket.send(message)
+            self.sent += 1
+
+
+class ReplayServer:
+    def __init__(self, recording: str, speed: float = 1.0, host: str = '127.0.0.1', port: int = DEFAULT_PORT,
+                 wait_clients: int = 1, loop: bool = False, queue_size: int = 100_000):
+        self.recording = recording
+        self.speed = speed
+        self.host = host
+        self.port = port
+        self.wait_clients = wait_clients
+        self.loop = loop
+        self.queue_size = queue_size
+        self.clients: Set[ReplayClient] = set()
+        self._connected = asyncio.Event()
+        self.frames = 0
+        self.behind = 0.0
+
+    def _check_ready(self) -> None:
+        # Clients count once they have streams, so /ws clients do not miss frames before SUBSCRIBE
+        if sum(1 for client in self.clients if client.streams) >= self.wait_clients:
+            self._connected.set()
+
+    @staticmethod
+    def _path(websocket, path: Optional[str]) -> str:
+        if path is not None:
+            return path
+        request = getattr(websocket, 'request', None)
+        return request.path if request is not None else websocket.path
+
+    async def _subscriptions(self, client: ReplayClient) -> None:
+        """Handle SUBSCRIBE/UNSUBSCRIBE requests on /ws connections"""
+        async for message in client.websocket:
+            try:
+                request = json.loads(message)
+            except ValueError:
+                continue
+            params = set(request.get('params', []))
+            if request.get('method') == 'SUBSCRIBE':
+                client.streams |= params
+                self._check_ready()
+            elif request.get('method') == 'UNSUBSCRIBE':
+                client.streams -= params
+            await client.websocket.send(json.dumps({'result': None, 'id': request.get('id')}))
+
+    async def handler(self, websocket, path: Optional[str] = None) -> None:
+        url = urlparse(self._path(websocket, path))
+        if url.path.startswith('/stream'):
+            streams = set(parse_qs(url.query).get('streams', [''])[0].split('/')) - {''}
+            client = ReplayClient(websocket, streams, True, self.queue_size)
+        else:
+            stream = url.path[len('/ws'):].strip('/')
+            client = ReplayClient(websocket, {stream} if stream else set(), False, self.queue_size)
+        self.clients.add(client)
+        self._check_ready()
+        logger.info(f"Client connected: {url.path} ({len(client.streams)} streams)")
+        tasks = [asyncio.ensure_future(client.send_forever()), asyncio.ensure_future(self._subscriptions(client))]
+        try:
+            # Either side ends when the connection closes
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.clients.discard(client)
+            logger.info(f"Client disconnected after {client.sent:,} frames ({client.dropped:,} dropped)")
+
+    async def play(self) -> None:
+        """Broadcast the recording once, paced by the recorded receive times"""
+        started = first = None
+        for received, frame in iter_frames(self.recording):
+            if started is None:
+                started, first = time.perf_counter(), received
+            if self.speed > 0:
+                delay = (received - first) / self.speed - (time.perf_counter() - started)
+                if delay > 0.001:
+                    await asyncio.sleep(delay)
+                else:
+                    self.behind = max(self.behind, -delay)
+            name = stream_name(frame)
+            for client in list(self.clients):
+                client.offer(name, frame)
+            self.frames += 1
+            if self.frames % 1000 == 0:
+                # Let client senders run even at max speed
+                await asyncio.sleep(0)
+
+    async def run(self) -> None:
+        async with serve(self.handler, self.host, self.port, max_size=None):
+            logger.info(f"Replaying {self.recording} on ws://{self.host}:{self.port} at "
+                        f"{'max' if self.speed <= 0 else f'{self.speed:g}x'} speed; "
+                        f"waiting for {self.wait_clients} client(s)")
+            await self._connected.wait()
+            while True:
+                started = time.perf_counter()
+                await self.play()
+                elapsed = time.perf_counter() - started
+                logger.info(f"Replayed {self.frames:,} frames in {elapsed:.1f}s "
+                            f"({self.frames / max(elapsed, 1e-9):,.0f}/s, max {self.behind:.3f}s behind schedule)")
+                if not self.loop:
+                    break
+                self.frames = 0
+            # Give clients time to drain their queues
+            while any(not client.queue.empty() for client in self.clients):
+                await asyncio.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('recording', help='Recording directory or chunk file')
+    parser.add_argument('--speed', type=float, default=1.0, help='Playback speed multiplier (0 = max)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--wait-clients', type=int, default=1)
+    parser.add_argument('--loop', action='store_true', help='Start over at the end of the recording')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(ReplayServer(args.recording, args.speed, args.host, args.port,
+                                 args.wait_clients, args.loop).run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
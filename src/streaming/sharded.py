@@ -0,0 +1,228 @@
+"""
+Multi-process sharded ingestion with an ordered merge.
+
+A single event loop decodes every frame on one core, which stops scaling
+somewhere past a few dozen busy symbols. ShardedStream gives each worker
+process its own CombinedStream over a shard of the streams; the worker
+decodes frames with a processor (e.g. TradeEvents) and ships the resulting
+events to the parent in batches.
+
+Events are tuples whose first element is an exchange timestamp in epoch ms.
+Along with each batch a worker sends a watermark (its clock minus
+`max_delay`): a promise that later events from that shard are newer. The
+parent holds events in a heap and releases them once they are older than
+every shard's watermark, so consumers see one stream in timestamp order
+across all shards. Events that arrive after their slot has passed are
+still delivered, immediately, and counted in `late`.
+
+A shard whose process has died, or whose watermark has fallen more than
+`STALE_BATCHES` batch intervals behind the newest one, no longer holds the
+merge back: it is left out of the minimum (until it catches up, if alive),
+so one stuck worker cannot stall the stream or grow the heap without bound.
+Staleness is judged on the workers' clocks rather than on arrival times, so
+a parent that falls behind reading batches does not mistake it for a stall.
+
+Example:
+    stream = ShardedStream([f"{s}@aggTrade" for s in symbols], TradeEvents(), workers=4)
+    async for event in stream.events():
+        trade_time, symbol, price, quantity, is_buyer_maker, data = event
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import time
+from typing import List, Optional
+from .combined_stream import CombinedStream, FUTURES_STREAM_URL
+from .fast_decode import loads, peek_symbol, peek_trade
+
+logger = logging.getLogger(__name__)
+
+# Batch intervals a shard's watermark may lag the newest before it is ignored
+STALE_BATCHES = 20
+
+
+class TradeEvents:
+    """
+    Processor turning aggTrade frames into
+    (trade_time, symbol, price, quantity, is_buyer_maker, data) events
+
+    Only fields needed for every trade are read from the raw text; `data`
+    is the fully decoded payload for trades with notional above
+    `decode_above`, and None otherwise. Trades at or below `min_notional`
+    are dropped in the worker.
+    """
+
+    def __init__(self, min_notional: float = 0.0, decode_above: float = math.inf):
+        self.min_notional = min_notional
+        self.decode_above = decode_above
+
+    def process(self, message) -> Optional[list]:
+        trade = peek_trade(message)
+        if trade is None or trade[3] is None:
+            return None
+        price, quantity, is_buyer_maker, trade_time = trade
+        notional = price * quantity
+        if notional <= self.min_notional:
+            return None
+        data = loads(message)['data'] if notional > self.decode_above else None
+        return [(trade_time, peek_symbol(message), price, quantity, is_buyer_maker, data)]
+
+    def flush(self, now: int) -> list:
+        """Events for aggregates completed by `now`; TradeEvents holds none"""
+        return []
+
+
+def _run_worker(shard: int, streams: List[str], base_url: str, processor, output,
+                batch_interval: float, max_delay: float) -> None:
+    async def run():
+        stream = CombinedStream(base_url)
+        batch = []
+
+        def on_frame(message):
+            events = processor.process(message)
+            if events:
+                batch.extend(events)
+
+        for name in streams:
+            stream.subscribe_raw(name, on_frame)
+
+        async def ship():
+            while True:
+                await asyncio.sleep(batch_interval)
+                now = int(time.time() * 1000)
+                batch.extend(processor.flush(now))
+                events = batch[:]
+                batch.clear()
+                output.put((shard, now - int(max_delay * 1000), events))
+
+        await asyncio.gather(stream.run(), ship())
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+class ShardedStream:
+    """Streams split over worker processes, merged back into one ordered event stream"""
+
+    def __init__(self, streams: List[str], processor, workers: Optional[int] = None,
+                 base_url: str = FUTURES_STREAM_URL, batch_interval: float = 0.05, max_delay: float = 0.5,
+                 shards: Optional[List[List[str]]] = None):
+        """
+        Args:
+            processor: Picklable object with process(raw_frame) -> events and flush(now_ms) -> events
+            workers: Worker processes; defaults to the CPU count
+            batch_interval: Seconds between batches from each worker
+            max_delay: Allowed exchange-to-worker delay before an event counts as late
+            shards: Explicit stream groups (e.g. volume-balanced); overrides `workers`
+        """
+        workers = workers or os.cpu_count() or 1
+        if shards is None:
+            shards = [streams[i::workers] for i in range(min(workers, len(streams)))]
+        self.shards = [shard for shard in shards if shard]
+        self.processor = processor
+        self.base_url = base_url
+        self.batch_interval = batch_interval
+        self.max_delay = max_delay
+        self.received = 0
+        self.released = 0
+        self.late = 0
+        self.dead = set()
+        self.stale = set()
+        self._first_watermark = math.inf
+        self._processes: List[multiprocessing.Process] = []
+
+    def start(self) -> multiprocessing.Queue:
+        output = multiprocessing.Queue()
+        for shard, streams in enumerate(self.shards):
+            process = multiprocessing.Process(
+                target=_run_worker, name=f"shard-{shard}", daemon=True,
+                args=(shard, streams, self.base_url, self.processor, output, self.batch_interval, self.max_delay))
+            process.start()
+            self._processes.append(process)
+        logger.info(f"Started {len(self.shards)} shard workers for "
+                    f"{sum(len(shard) for shard in self.shards)} streams")
+        return output
+
+    def stop(self) -> None:
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join(timeout=5)
+        self._processes.clear()
+
+    async def events(self):
+        """Merged events from every shard in timestamp order, forever"""
+        output = self.start()
+        loop = asyncio.get_running_loop()
+        watermarks = [-math.inf] * len(self.shards)
+        heap = []
+        counter = 0
+        last_released = -math.inf
+        try:
+            while True:
+                try:
+                    shard, watermark, events = await loop.run_in_executor(
+                        None, output.get, True, self.batch_interval * 4)
+                    watermarks[shard] = max(watermarks[shard], watermark)
+                    self.received += len(events)
+                except queue.Empty:
+                    events = ()
+                for event in events:
+                    if event[0] < last_released:
+                        # Its place in the merged order has already passed
+                        self.late += 1
+                        self.released += 1
+                        yield event
+                        continue
+                    heapq.heappush(heap, (event[0], counter, event))
+                    counter += 1
+                released_through = self._released_through(watermarks)
+                while heap and heap[0][0] <= released_through:
+                    timestamp, _, event = heapq.heappop(heap)
+                    last_released = timestamp
+                    self.released += 1
+                    yield event
+        finally:
+            self.stop()
+
+    def _released_through(self, watermarks: List[float]) -> float:
+        """Oldest watermark among shards that are alive and keeping up"""
+        reported = [watermark for watermark in watermarks if watermark > -math.inf]
+        if not reported:
+            return -math.inf
+        # A shard that has not reported yet counts from the first report of any shard
+        self._first_watermark = min(self._first_watermark, *reported)
+        stale_before = max(reported) - self.batch_interval * STALE_BATCHES * 1000
+        live = []
+        for shard, process in enumerate(self._processes):
+            if not process.is_alive():
+                if shard not in self.dead:
+                    self.dead.add(shard)
+                    logger.error(f"Shard {shard} worker exited (code {process.exitcode}); "
+                                 f"merging without its {len(self.shards[shard])} streams")
+                continue
+            if max(watermarks[shard], self._first_watermark) < stale_before:
+                if shard not in self.stale:
+                    self.stale.add(shard)
+                    logger.error(f"Shard {shard} is more than {STALE_BATCHES} batches behind; "
+                                 f"ignoring its watermark until it catches up")
+                continue
+            if shard in self.stale:
+                self.stale.discard(shard)
+                logger.info(f"Shard {shard} resumed")
+            live.append(watermarks[shard])
+        # With no shard left to wait for, release everything held
+        return min(live) if live else math.inf
+
+    def stats(self) -> dict:
+        return {'shards': len(self.shards), 'received': self.received,
+                'released': self.released, 'late': self.late,
+                'alive': sum(process.is_alive() for process in self._processes),
+                'dead': sorted(self.dead), 'stale': sorted(self.stale)}
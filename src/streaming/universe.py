@@ -0,0 +1,61 @@
+"""
+Symbol universe discovery and shard planning.
+
+Monitors can run on "all perpetuals" instead of a hardcoded list: the symbol
+list comes from the futures exchangeInfo endpoint, and symbols are spread
+over shards by 24h quote volume so busy markets do not pile up in one
+worker. Each shard's streams are then packed onto connections within the
+per-connection stream limit by CombinedStream.
+"""
+
+from typing import Dict, List, Optional
+import requests
+
+FUTURES_REST_URL = 'https://fapi.binance.com/fapi/v1'
+
+
+def fetch_perpetual_symbols(quote_asset: str = 'USDT', base_url: str = FUTURES_REST_URL) -> List[str]:
+    """Lowercase symbols of every trading USD-M perpetual settled in `quote_asset`"""
+    response = requests.get(f"{base_url}/exchangeInfo", timeout=10)
+    response.raise_for_status()
+    return sorted(
+        info['symbol'].lower() for info in response.json()['symbols']
+        if info.get('contractType') == 'PERPETUAL'
+        and info.get('status') == 'TRADING'
+        and info.get('quoteAsset') == quote_asset
+    )
+
+
+def fetch_quote_volumes(base_url: str = FUTURES_REST_URL) -> Dict[str, float]:
+    """24h quote volume per lowercase symbol"""
+    response = requests.get(f"{base_url}/ticker/24hr", timeout=10)
+    response.raise_for_status()
+    return {ticker['symbol'].lower(): float(ticker['quoteVolume']) for ticker in response.json()}
+
+
+def shard_symbols(symbols: List[str], shards: int,
+                  weights: Optional[Dict[str, float]] = None) -> List[List[str]]:
+    """
+    Split symbols into `shards` groups with similar total weight
+
+    Greedy: heaviest symbol first, each into the currently lightest shard.
+    Without weights every symbol counts the same (round-robin).
+    """
+    shards = max(1, min(shards, len(symbols)))
+    groups: List[List[str]] = [[] for _ in range(shards)]
+    if not weights:
+        for i, symbol in enumerate(symbols):
+            groups[i % shards].append(symbol)
+        return groups
+    loads = [0.0] * shards
+    for symbol in sorted(symbols, key=lambda s: weights.get(s, 0.0), reverse=True):
+        lightest = loads.index(min(loads))
+        groups[lightest].append(symbol)
+        # Unknown symbols still take a slot's worth of work
+        loads[lightest] += max(weights.get(symbol, 0.0), 1.0)
+    return groups
+
+
+def resolve_symbols(default: List[str], argv: List[str]) -> List[str]:
+    """`default`, or every USDT perpetual when '--all' is on the command line"""
+    return fetch_perpetual_symbols() if '--all' in argv else default
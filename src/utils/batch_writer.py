@@ -0,0 +1,218 @@
+"""
+Shared background CSV writer.
+
+The monitors used to open, append to and close their CSV file for every
+message inside the event loop. BatchWriter takes rows on an unbounded queue
+(put never blocks), groups them into batches by size or age on a background
+thread, keeps file handles open between batches and fsyncs on a
+configurable policy. Ingestion therefore never waits on disk, even during
+liquidation cascades.
+
+Write lag (time from write_row() to the row reaching the OS) is tracked in
+stats().
+"""
+
+import atexit
+import csv
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_FLUSH_INTERVAL = 0.5   # seconds a row may wait for its batch to fill
+DEFAULT_FSYNC_INTERVAL = 5.0   # seconds between fsyncs with fsync='interval'
+
+# 'never': leave durability to the OS, 'batch': fsync after every batch,
+# 'interval': fsync at most every fsync_interval seconds
+FSYNC_POLICIES = ('never', 'batch', 'interval')
+
+_STOP = object()
+
+
+class BatchWriter:
+    """
+    Background thread that appends queued rows to CSV files in batches.
+
+    Rows are sequences written with csv.writer; lines are pre-formatted
+    strings written as-is. Rows for the same file keep their order.
+    The thread starts on the first write and is drained at interpreter exit.
+    """
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 fsync: str = 'interval', fsync_interval: float = DEFAULT_FSYNC_INTERVAL):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._queue = queue.SimpleQueue()
+        self._files: Dict[str, tuple] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._last_fsync = time.monotonic()
+        self.rows_written = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.errors = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='batch-writer', daemon=True)
+                self._thread.start()
+
+    def write_row(self, path: str, row: Sequence) -> None:
+        """Queue one CSV row for `path`; returns immediately"""
+        # Also restarts a writer thread that has died
+        self.start()
+        self._queue.put((path, row, False, time.monotonic()))
+
+    def write_line(self, path: str, line: str) -> None:
+        """Queue a pre-formatted line (a trailing newline is added if missing)"""
+        self.start()
+        if not line.endswith('\n'):
+            line += '\n'
+        self._queue.put((path, line, True, time.monotonic()))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is written; False on timeout"""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Drain the queue, fsync and close every file"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self) -> dict:
+        return {
+            'pending': self._queue.qsize(),
+            'rows_written': self.rows_written,
+            'batches': self.batches,
+            'fsyncs': self.fsyncs,
+            'errors': self.errors,
+            'open_files': len(self._files),
+            'last_lag': self.last_lag,
+            'max_lag': self.max_lag,
+        }
+
+    def _handle(self, path):
+        if path not in self._files:
+            f = open(path, 'a', newline='')
+            self._files[path] = (f, csv.writer(f))
+        return self._files[path]
+
+    @staticmethod
+    def _is_control(item):
+        return item is _STOP or isinstance(item, threading.Event)
+
+    def _next_batch(self):
+        """Wait for a first item, then collect until batch_size or flush_interval"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size and not self._is_control(batch[-1]):
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(self, batch):
+        touched = set()
+        oldest = None
+        for path, payload, is_line, queued_at in batch:
+            try:
+                f, writer = self._handle(path)
+                if is_line:
+                    f.write(payload)
+                else:
+                    writer.writerow(payload)
+                touched.add(path)
+                self.rows_written += 1
+            except OSError as e:
+                self.errors += 1
+                logger.error(f"Error writing to {path}: {e}")
+                self._close_file(path)
+            except Exception as e:
+                # A malformed row must not take the writer thread down
+                self.errors += 1
+                logger.error(f"Dropped unwritable row for {path}: {e}")
+            if oldest is None:
+                oldest = queued_at
+
+        now = time.monotonic()
+        sync = self.fsync == 'batch' or (self.fsync == 'interval' and now - self._last_fsync >= self.fsync_interval)
+        for path in touched:
+            self._flush_file(path, sync)
+        if sync:
+            self._last_fsync = now
+        if oldest is not None:
+            self.batches += 1
+            self.last_lag = time.monotonic() - oldest
+            self.max_lag = max(self.max_lag, self.last_lag)
+
+    def _flush_file(self, path, sync):
+        if path not in self._files:
+            return
+        f = self._files[path][0]
+        try:
+            f.flush()
+            if sync:
+                os.fsync(f.fileno())
+                self.fsyncs += 1
+        except OSError as e:
+            self.errors += 1
+            logger.error(f"Error flushing {path}: {e}")
+            self._close_file(path)
+
+    def _close_file(self, path):
+        entry = self._files.pop(path, None)
+        if entry is not None:
+            try:
+                entry[0].close()
+            except OSError:
+                pass
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            control = batch[-1] if self._is_control(batch[-1]) else None
+            rows = batch[:-1] if control is not None else batch
+            if rows:
+                self._write_batch(rows)
+            if isinstance(control, threading.Event):
+                for path in list(self._files):
+                    self._flush_file(path, self.fsync != 'never')
+                control.set()
+            elif control is _STOP:
+                for path in list(self._files):
+                    self._flush_file(path, self.fsync != 'never')
+                    self._close_file(path)
+                return
+
+
+# Shared instance used by the monitors and Datastreams scripts
+batch_writer = BatchWriter()
+atexit.register(batch_writer.close)
@@ -3,6 +3,7 @@ from binance.client import Client
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from ..analysis.indicator_cache import cached_indicator
 
 def get_historical_klines(client, symbol, interval, start_str, end_str=None):
     """
@@ -24,29 +25,42 @@ def get_historical_klines(client, symbol, interval, start_str, end_str=None):
     
     return df
 
-def calculate_technical_indicators(df):
+def calculate_technical_indicators(df, symbol=None, timeframe=None):
     """
     Calculate common technical indicators
+    
+    When symbol and timeframe are given, series are shared with other
+    consumers through the process-wide indicator cache.
     """
+    def rsi():
+        delta = df['close'].diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        rs = gain / loss
+        return 100 - (100 / (1 + rs))
+    
+    def macd():
+        exp1 = df['close'].ewm(span=12, adjust=False).mean()
+        exp2 = df['close'].ewm(span=26, adjust=False).mean()
+        return exp1 - exp2
+    
     # SMA
-    df['SMA_20'] = df['close'].rolling(window=20).mean()
-    df['SMA_50'] = df['close'].rolling(window=50).mean()
+    df['SMA_20'] = cached_indicator(df, symbol, timeframe, 'sma', (20,),
+                                    lambda: df['close'].rolling(window=20).mean())
+    df['SMA_50'] = cached_indicator(df, symbol, timeframe, 'sma', (50,),
+                                    lambda: df['close'].rolling(window=50).mean())
     
     # EMA
-    df['EMA_20'] = df['close'].ewm(span=20, adjust=False).mean()
+    df['EMA_20'] = cached_indicator(df, symbol, timeframe, 'ema', (20,),
+                                    lambda: df['close'].ewm(span=20, adjust=False).mean())
     
     # RSI
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
+    df['RSI'] = cached_indicator(df, symbol, timeframe, 'rsi', (14,), rsi)
     
     # MACD
-    exp1 = df['close'].ewm(span=12, adjust=False).mean()
-    exp2 = df['close'].ewm(span=26, adjust=False).mean()
-    df['MACD'] = exp1 - exp2
-    df['Signal_Line'] = df['MACD'].ewm(span=9, adjust=False).mean()
+    df['MACD'] = cached_indicator(df, symbol, timeframe, 'macd', (12, 26), macd)
+    df['Signal_Line'] = cached_indicator(df, symbol, timeframe, 'macd_signal', (12, 26, 9),
+                                         lambda: df['MACD'].ewm(span=9, adjust=False).mean())
     
     return df
 
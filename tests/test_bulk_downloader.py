@@ -0,0 +1,147 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip('binance')
+
+from src.data.bulk_downloader import PAGE_LIMIT, BulkKlineDownloader
+from src.data.historical_data import HistoricalDataManager, klines_to_dataframe
+
+MINUTE = 60_000
+START = 1_704_067_200_000  # 2024-01-01 00:00 UTC
+
+
+class StandInServer:
+    """Local klines endpoint; `responses` queues status codes (with headers) served before real data"""
+
+    def __init__(self):
+        self.requests = []
+        self.responses = []
+        self.fail_starts = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+                start, end = int(query['startTime']), int(query['endTime'])
+                server.requests.append((start, end))
+                if server.responses:
+                    status, headers = server.responses.pop(0)
+                elif start in server.fail_starts:
+                    status, headers = 500, {}
+                else:
+                    status, headers = 200, {'X-MBX-USED-WEIGHT-1M': '10'}
+                body = b'{}'
+                if status == 200:
+                    limit = int(query.get('limit', PAGE_LIMIT))
+                    klines = [[t, '1', '2', '0.5', '1.5', '10', t + MINUTE - 1, '15', 3, '5', '7', '0']
+                              for t in range(start, end + 1, MINUTE)][:limit]
+                    body = json.dumps(klines).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = StandInServer()
+    yield server
+    server.close()
+
+
+def make_downloader(tmp_path, server, **kwargs):
+    store = HistoricalDataManager(None, None, base_path=str(tmp_path), client=object())
+    return BulkKlineDownloader(store, base_url=server.url, **kwargs)
+
+
+def test_plan_splits_missing_ranges_into_pages(tmp_path, server):
+    downloader = make_downloader(tmp_path, server)
+    end = START + 2500 * MINUTE
+    pages = downloader.plan([('BTCUSDT', '1m', START, end)])
+    assert [(start, stop) for _, _, start, stop in pages] == [
+        (START, START + 1000 * MINUTE),
+        (START + 1000 * MINUTE, START + 2000 * MINUTE),
+        (START + 2000 * MINUTE, end),
+    ]
+
+    downloader.store.merge_into_store('BTCUSDT', '1m', klines_to_dataframe([]), START, START + 1500 * MINUTE)
+    pages = downloader.plan([('BTCUSDT', '1m', START, end)])
+    assert [(start, stop) for _, _, start, stop in pages] == [
+        (START + 1500 * MINUTE, START + 2500 * MINUTE),
+    ]
+
+
+def test_fetch_page_waits_out_rate_limit(tmp_path, server):
+    downloader = make_downloader(tmp_path, server)
+    server.responses = [(429, {'Retry-After': '0.2'})]
+    klines = downloader.fetch_page('BTCUSDT', '1m', START, START + 10 * MINUTE)
+    assert len(klines) == 10
+    assert len(server.requests) == 2
+    assert downloader.limiter.paused_until > 0
+
+
+def test_fetch_page_retries_server_errors(tmp_path, server):
+    downloader = make_downloader(tmp_path, server)
+    server.responses = [(503, {})]
+    klines = downloader.fetch_page('BTCUSDT', '1m', START, START + 10 * MINUTE)
+    assert len(klines) == 10
+    assert len(server.requests) == 2
+
+
+def test_fetch_page_gives_up_after_max_retries(tmp_path, server):
+    downloader = make_downloader(tmp_path, server, max_retries=1)
+    server.fail_starts.add(START)
+    with pytest.raises(RuntimeError):
+        downloader.fetch_page('BTCUSDT', '1m', START, START + 10 * MINUTE)
+
+
+def test_interrupted_backfill_resumes_from_manifest(tmp_path, server):
+    end = START + 3000 * MINUTE
+    job = ('BTCUSDT', '1m', START, end)
+    downloader = make_downloader(tmp_path, server, max_retries=1, workers=2, flush_pages=2)
+    server.fail_starts.add(START + 1000 * MINUTE)
+    summary = downloader.run([job])
+    assert summary['completed'] == 2 and summary['failed'] == 1
+
+    # A fresh manager reads the checkpoint back from disk and only the failed page is fetched
+    server.fail_starts.clear()
+    server.requests.clear()
+    downloader = make_downloader(tmp_path, server, workers=2)
+    summary = downloader.run([job])
+    assert server.requests == [(START + 1000 * MINUTE, START + 2000 * MINUTE - 1)]
+    assert summary['completed'] == 1
+    assert downloader.store.missing_ranges('BTCUSDT', '1m', START, end) == []
+    assert len(downloader.store.load_historical_data('BTCUSDT', '1m', START, end)) == 3000
+
+
+def test_pages_are_flushed_in_groups(tmp_path, server):
+    downloader = make_downloader(tmp_path, server, flush_pages=3)
+    writes = []
+    merge_pages = downloader.store.merge_pages
+
+    def counting_merge(symbol, interval, df, covered):
+        writes.append(len(covered))
+        merge_pages(symbol, interval, df, covered)
+
+    downloader.store.merge_pages = counting_merge
+    summary = downloader.run([('BTCUSDT', '1m', START, START + 7000 * MINUTE)])
+    assert summary['completed'] == 7
+    assert sorted(writes) == [1, 3, 3]
@@ -0,0 +1,17 @@
+from src.analysis.order_flow import RollingOrderFlow
+
+
+def test_gap_longer_than_ring_clears_old_seconds():
+    flow = RollingOrderFlow()
+    flow.update(0, 100.0, 5.0, False)
+    flow.update(1_000_000, 100.0, 1.0, False)
+    assert flow.window('5m')['buy_volume'] == 1.0
+    assert flow.window('1m')['buy_volume'] == 1.0
+
+
+def test_short_gap_keeps_seconds_in_window():
+    flow = RollingOrderFlow()
+    flow.update(0, 100.0, 5.0, False)
+    flow.update(30_000, 100.0, 1.0, False)
+    assert flow.window('1m')['buy_volume'] == 6.0
+    assert flow.window('10s')['buy_volume'] == 1.0
@@ -0,0 +1,23 @@
+import math
+
+from src.analysis.streaming_indicators import StreamingIndicatorEngine, StreamingRSI, StreamingSMA
+
+
+def test_sma_amend_on_empty_window_appends():
+    sma = StreamingSMA(2)
+    assert math.isnan(sma.amend(1.0))
+    assert list(sma.window) == [1.0]
+    assert sma.update(3.0) == 2.0
+    assert sma.amend(5.0) == 3.0
+
+
+def test_engine_amend_before_first_update():
+    engine = StreamingIndicatorEngine()
+    engine.amend(101.0, 99.0, 100.0, 5.0)
+    engine.update(102.0, 100.0, 101.0, 5.0)
+    assert engine.sma_20.window[0] == 100.0
+
+    rsi = StreamingRSI(2, smoothing='sma')
+    rsi.amend(100.0)
+    rsi.update(101.0)
+    assert rsi.value == 100.0
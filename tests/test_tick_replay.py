@@ -0,0 +1,35 @@
+import random
+
+from src.backtesting.tick_replay import iter_trades, read_agg_trades
+
+HEADER = 'Symbol,Aggregate Trade ID,Price,Quantity,First Trade ID,Last Trade ID,Trade Time,Is Buyer Maker\n'
+
+
+def write_recording(path, times):
+    with open(path, 'w') as f:
+        f.write(HEADER)
+        for i, ts in enumerate(times):
+            f.write(f"BTCUSDT,{i},{100 + i},1.0,{i},{i},{ts},{i % 2 == 0}\n")
+
+
+def test_rows_out_of_order_across_chunks_are_reordered(tmp_path):
+    # Each row lands up to five positions from its place, often in a neighbouring chunk
+    rng = random.Random(7)
+    times = sorted(rng.randrange(1_000, 2_000) for _ in range(500))
+    jittered = sorted(range(len(times)), key=lambda i: i + rng.uniform(-2.5, 2.5))
+    path = tmp_path / 'binance_trades.csv'
+    write_recording(path, [times[i] for i in jittered])
+
+    replayed = [trade[0] for trade in read_agg_trades(str(path), chunksize=7)]
+    assert replayed == times
+
+
+def test_rows_displaced_past_a_chunk_are_dropped(tmp_path, caplog):
+    first, second = tmp_path / 'a.csv', tmp_path / 'b.csv'
+    write_recording(first, [5, 3, 1, 9, 7, 8, 2])
+    write_recording(second, [4, 6, 10, 0])
+    with caplog.at_level('WARNING'):
+        replayed = [trade[0] for trade in iter_trades([str(first), str(second)], chunksize=2)]
+    # 2 arrives two chunks after 3 and 5 were released; 0 is only one chunk late
+    assert replayed == [0, 1, 3, 4, 5, 6, 7, 8, 9, 10]
+    assert 'Dropped 1 out-of-order trades' in caplog.text
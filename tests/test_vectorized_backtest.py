@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('ccxt')
+pytest.importorskip('binance')
+
+from src.bots.ma_crossover_bot import MACrossoverBot
+
+
+def random_walk(n=2000, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    timestamps = 1_704_067_200_000 + 3_600_000 * np.arange(n)
+    return [[float(t), c, c * 1.01, c * 0.99, c, 1.0] for t, c in zip(timestamps, close)]
+
+
+def test_vectorized_matches_per_candle_without_fees():
+    bot = MACrossoverBot(fast_period=5, slow_period=20)
+    candles = random_walk()
+
+    reference = bot.backtest(candles)
+    result = bot.backtest(candles, vectorized=True, fee=0)
+
+    assert len(result['exit_index']) > 10
+    in_position = np.array([row['position'] is not None for row in reference])
+    assert np.array_equal(result['position'].astype(bool), in_position)
+    assert result['balance'] == pytest.approx([row['balance'] for row in reference], rel=1e-9)
+    assert result['amount'][in_position] == pytest.approx(
+        [row['position']['amount'] for row in reference if row['position']], rel=1e-9)
+
+
+def test_short_history_holds():
+    bot = MACrossoverBot(fast_period=5, slow_period=20)
+    assert not bot.calculate_signals_vectorized(random_walk(15)).any()
+    assert bot.calculate_signals(random_walk(15)) == 'hold'